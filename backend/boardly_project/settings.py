@@ -7,6 +7,7 @@ Generated by 'django-admin startproject' using Django 5.0.
 import os
 import warnings
 import dj_database_url
+from corsheaders.defaults import default_headers
 from pathlib import Path
 from django.core.exceptions import ImproperlyConfigured
 
@@ -227,6 +228,17 @@ if CHANNEL_REDIS_URL:
             },
         }
     }
+elif os.getenv('CHANNEL_UNIX_SOCKET'):
+    # Кілька процесів daphne на одному хості без Redis (див. core/channel_layers.py)
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'core.channel_layers.UnixSocketChannelLayer',
+            'CONFIG': {
+                'path': os.getenv('CHANNEL_UNIX_SOCKET'),
+                'embedded_hub': _env_bool('CHANNEL_EMBEDDED_HUB', True),
+            },
+        }
+    }
 else:
     CHANNEL_LAYERS = {
         'default': {
@@ -234,6 +246,28 @@ else:
         }
     }
 
+# Присутність на дошці: 'local' (один процес) або 'channel_layer' (реплікація між процесами;
+# за замовчуванням, коли шар каналів спільний - Redis чи unix-сокет).
+BOARD_PRESENCE_BACKEND = os.getenv(
+    'BOARD_PRESENCE_BACKEND',
+    'channel_layer' if CHANNEL_REDIS_URL or os.getenv('CHANNEL_UNIX_SOCKET') else 'local',
+).strip().lower()
+BOARD_PRESENCE_TTL_SECONDS = _env_int('BOARD_PRESENCE_TTL_SECONDS', 45)
+BOARD_PRESENCE_COALESCE_SECONDS = _env_int('BOARD_PRESENCE_COALESCE_MS', 1000) / 1000
+
+# Префіксний індекс autocomplete (/api/search/suggest/): LRU по користувачах і вік індексу
+SEARCH_PREFIX_INDEX_MAX_USERS = _env_int('SEARCH_PREFIX_INDEX_MAX_USERS', 256)
+SEARCH_PREFIX_INDEX_TTL_SECONDS = _env_int('SEARCH_PREFIX_INDEX_TTL_SECONDS', 300)
+
+# Дробові ключі порядку карток/списків: довжина, після якої контейнер перебудовується
+ORDERING_KEY_REBALANCE_LENGTH = _env_int('ORDERING_KEY_REBALANCE_LENGTH', 32)
+
+# Архівні картки, старші за стільки днів, archive_cold_cards переносить у холодне сховище (ArchivedCard)
+CARD_COLD_STORAGE_DAYS = _env_int('CARD_COLD_STORAGE_DAYS', 30)
+
+# WebSocket-кадри з encoding=deflate стискаються, якщо JSON більший за поріг.
+WS_DEFLATE_THRESHOLD_BYTES = _env_int('WS_DEFLATE_THRESHOLD_BYTES', 1024)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -264,6 +298,9 @@ if extra_csrf:
 
 # Дозволяємо надсилати cookies та заголовки авторизації (важливо для аутентифікації)
 CORS_ALLOW_CREDENTIALS = True 
+# ETag / If-Match для оптимістичних оновлень карток і списків
+CORS_ALLOW_HEADERS = (*default_headers, 'if-match')
+CORS_EXPOSE_HEADERS = ['ETag']
 
 # ----------------------------------------------------------------------
 # SECURITY (PRODUCTION GUARDS)
@@ -1,7 +1,7 @@
 from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
-from django.contrib.auth import get_user_model
 from django.utils.crypto import get_random_string # Імпортуємо генератор рядків
 from core.models import Profile
+from core.services.user_lookup import find_user_by_email
 
 class GoogleAccountAdapter(DefaultSocialAccountAdapter):
     """
@@ -18,12 +18,9 @@ class GoogleAccountAdapter(DefaultSocialAccountAdapter):
         email = sociallogin.account.extra_data.get('email')
         
         if email:
-            User = get_user_model()
-            try:
-                user = User.objects.get(email__iexact=email)
+            user = find_user_by_email(email)
+            if user is not None:
                 sociallogin.connect(request, user)
-            except User.DoesNotExist:
-                pass
 
     def save_user(self, request, sociallogin, form=None):
         """
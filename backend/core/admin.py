@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Profile, Board, Membership, List, Card, CardMember, 
-    Label, CardLabel, Checklist, ChecklistItem, Activity, Attachment, Comment
+    Label, CardLabel, Checklist, ChecklistItem, Activity, Attachment, Comment, DeletionJob, ArchivedCard
 )
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
@@ -29,7 +29,7 @@ class CardMemberInline(admin.TabularInline):
 class ListInline(admin.TabularInline):
     model = List
     extra = 1
-    fields = ('title', 'order', 'color', 'is_archived')
+    fields = ('title', 'position', 'color', 'is_archived')
 
 # Мітки Дошки (для BoardAdmin)
 class LabelInline(admin.TabularInline):
@@ -80,10 +80,9 @@ class BoardAdmin(admin.ModelAdmin):
 
 @admin.register(List)
 class ListAdmin(admin.ModelAdmin):
-    list_display = ('title', 'board', 'order', 'color', 'is_archived')
+    list_display = ('title', 'board', 'position', 'color', 'is_archived')
     list_filter = ('board', 'is_archived')
     search_fields = ('title',)
-    list_editable = ('order',) 
 
 @admin.register(Card)
 class CardAdmin(admin.ModelAdmin):
@@ -112,3 +111,18 @@ class ActivityAdmin(admin.ModelAdmin):
     list_display = ('timestamp', 'user', 'board', 'action_text')
     list_filter = ('board', 'user', 'timestamp')
     search_fields = ('action_text',)
+
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'object_id', 'label', 'status', 'step', 'deleted_rows', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('progress', 'deleted_rows', 'step', 'error', 'created_at', 'updated_at', 'finished_at')
+
+
+@admin.register(ArchivedCard)
+class ArchivedCardAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'board', 'list', 'archived_at', 'stored_at')
+    search_fields = ('title',)
+    raw_id_fields = ('board', 'list')
+    exclude = ('payload',)
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from core.models import Board, Membership, Label, Activity
+from django.db.models import Prefetch
+from core.models import Board, Card, Membership, Label, Activity
+from core.services.ordering import with_order
 from .users import UserSerializer
 import logging
 
@@ -50,17 +52,19 @@ class BoardSerializer(serializers.ModelSerializer):
             'invite_link', 'members', 'lists', 'labels',
             'dev_can_create_cards', 'dev_can_edit_assigned_cards',
             'dev_can_archive_assigned_cards', 'dev_can_join_card',
-            'dev_can_create_lists'
+            'dev_can_create_lists', 'is_template'
         )
         read_only_fields = ('owner', 'invite_link', 'created_at')
 
     def get_lists(self, obj):
         from .cards import ListSerializer
-        queryset = obj.lists.all()
+        queryset = with_order(obj.lists.all()).prefetch_related(
+            Prefetch('cards', queryset=with_order(Card.objects.all()))
+        )
         logger.warning(
-            '[list-move][board-serialize] board_id=%s list_orders=%s',
+            '[list-move][board-serialize] board_id=%s list_positions=%s',
             obj.id,
-            list(queryset.values_list('id', 'title', 'order', 'is_archived')),
+            list(obj.lists.values_list('id', 'title', 'position', 'is_archived')),
         )
         return ListSerializer(queryset, many=True).data
 
@@ -1,5 +1,9 @@
+from django.utils import timezone
 from rest_framework import serializers
 from core.models import List, Card, CardLabel, Label
+from core.services.checklists import default_checklists
+from core.services.ordering import assign_order, new_position, place
+from core.services.versioning import save_versioned
 from .users import UserSerializer
 from .details import ChecklistSerializer, AttachmentSerializer, CommentSerializer
 from .boards import BoardBriefSerializer, LabelSerializer
@@ -9,9 +13,80 @@ class ListBriefSerializer(serializers.ModelSerializer):
         model = List
         fields = ('id', 'title', 'color')
 
-class CardSerializer(serializers.ModelSerializer):
+class OrderField(serializers.IntegerField):
+    """
+    order у API - 1-based номер серед активних сусідів. Його виставляє
+    with_order при завантаженні або серіалізатор (assign_order) - одним
+    запитом на всю вибірку; при записі це бажане місце, з якого
+    серіалізатор обчислює дробовий ключ position.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('required', False)
+        kwargs.setdefault('min_value', 1)
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return instance.order
+
+
+class OrderedListSerializer(serializers.ListSerializer):
+    """
+    many=True: об'єктам без order (не з with_order) він рахується одним
+    запитом на всю вибірку, а не по запиту на об'єкт.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        assign_order([item for item in items if getattr(item, 'order', None) is None])
+        return super().to_representation(items)
+
+
+class PositionedSerializerMixin:
+    """
+    Перетворює order з запиту на position: одне оновлення рядка без перенумерації сусідів.
+    Контейнер - поле container_field (list для карток, board для списків).
+    Оновлення пишуть лише змінені поля одним умовним UPDATE за версією
+    (save_versioned); версія з If-Match приходить у context['if_match'].
+    """
+    container_field = None
+
+    def to_representation(self, instance):
+        if getattr(instance, 'order', None) is None:
+            assign_order([instance])
+        return super().to_representation(instance)
+
+    def create(self, validated_data):
+        index = validated_data.pop('order', None)
+        container = validated_data[self.container_field]
+        validated_data['position'] = new_position(
+            self.Meta.model, {f'{self.container_field}_id': container.id}, index
+        )
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        index = validated_data.pop('order', None)
+        container = validated_data.get(self.container_field)
+        moved = container is not None and container.id != getattr(instance, f'{self.container_field}_id')
+        reorder = moved or (index is not None and not instance.is_archived)
+
+        def prepare(obj, values):
+            # Ключ рахується заново на кожній спробі - контейнер міг змінитися
+            if container is not None:
+                setattr(obj, self.container_field, container)
+            if reorder:
+                values['position'] = place(obj, index)
+
+        return save_versioned(
+            instance, dict(validated_data), if_match=self.context.get('if_match'), prepare=prepare
+        )
+
+
+class CardSerializer(PositionedSerializerMixin, serializers.ModelSerializer):
+    container_field = 'list'
+    order = OrderField()
     due_date = serializers.DateTimeField(required=False, allow_null=True, input_formats=['%Y-%m-%d', 'iso-8601'])
-    checklists = ChecklistSerializer(many=True, read_only=True)
+    checklists = serializers.SerializerMethodField()
     labels = serializers.SerializerMethodField()
     label_ids = serializers.ListField(child=serializers.IntegerField(), write_only=True, required=False)
     board = serializers.IntegerField(source='list.board_id', read_only=True)
@@ -22,16 +97,25 @@ class CardSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Card
+        list_serializer_class = OrderedListSerializer
         fields = (
-            'id', 'title', 'description', 'card_color', 'cover_size', 'order', 'due_date',
+            'id', 'title', 'description', 'card_color', 'cover_size', 'order', 'position', 'version', 'due_date',
             'is_completed', 'is_archived', 'is_public', # <-- ДОДАНО
             'list', 'board', 'board_title',
             'members', 'labels', 'label_ids',
             'checklists', 'attachments', 'comments'
         )
+        read_only_fields = ('position', 'version')
+
+    def get_checklists(self, obj):
+        checklists = ChecklistSerializer(obj.checklists.all(), many=True).data
+        return checklists or default_checklists(obj)
 
     def get_labels(self, obj):
-        labels = Label.objects.filter(cardlabel__card=obj)
+        if 'cardlabel_set' in getattr(obj, '_prefetched_objects_cache', {}):
+            labels = [card_label.label for card_label in obj.cardlabel_set.all()]
+        else:
+            labels = Label.objects.filter(cardlabel__card=obj)
         return LabelSerializer(labels, many=True).data
 
     def _sync_labels(self, card, label_ids):
@@ -56,6 +140,8 @@ class CardSerializer(serializers.ModelSerializer):
         
     def update(self, instance, validated_data):
         label_ids = validated_data.pop('label_ids', None)
+        if validated_data.get('is_archived', instance.is_archived) != instance.is_archived:
+            validated_data['archived_at'] = timezone.now() if validated_data['is_archived'] else None
         card = super().update(instance, validated_data)
         if label_ids is not None:
             self._sync_labels(card, label_ids)
@@ -76,8 +162,12 @@ class MyCardSerializer(serializers.ModelSerializer):
         labels = Label.objects.filter(cardlabel__card=obj)
         return LabelSerializer(labels, many=True).data
 
-class ListSerializer(serializers.ModelSerializer):
+class ListSerializer(PositionedSerializerMixin, serializers.ModelSerializer):
+    container_field = 'board'
+    order = OrderField()
     cards = CardSerializer(many=True, read_only=True)
     class Meta:
         model = List
-        fields = ('id', 'title', 'order', 'is_archived', 'color', 'allow_dev_add_cards', 'board', 'cards')
+        list_serializer_class = OrderedListSerializer
+        fields = ('id', 'title', 'order', 'position', 'version', 'is_archived', 'color', 'allow_dev_add_cards', 'board', 'cards')
+        read_only_fields = ('position', 'version')
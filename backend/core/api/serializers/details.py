@@ -1,9 +1,30 @@
 from rest_framework import serializers
 from core.models import Checklist, ChecklistItem, Attachment, Comment, Card
+from core.services.checklists import DEFAULT_CHECKLIST_TITLE
 from .users import UserSerializer
 
+class ChecklistField(serializers.PrimaryKeyRelatedField):
+    """
+    Від'ємний id - віртуальний стандартний чек-лист картки (core.services.checklists):
+    повертається незбережений Checklist, рядок створює view після перевірки прав.
+    """
+
+    def to_internal_value(self, data):
+        try:
+            value = int(data)
+        except (TypeError, ValueError):
+            return super().to_internal_value(data)
+        if value >= 0:
+            return super().to_internal_value(data)
+        card = Card.objects.select_related('list__board').filter(id=-value).first()
+        # Прибраний віртуальний чек-лист більше не приймає пунктів (якщо справжнього немає)
+        if card is None or not (card.show_default_checklist or card.checklists.exists()):
+            self.fail('does_not_exist', pk_value=data)
+        return Checklist(card=card, title=DEFAULT_CHECKLIST_TITLE)
+
+
 class ChecklistItemSerializer(serializers.ModelSerializer):
-    checklist = serializers.PrimaryKeyRelatedField(queryset=Checklist.objects.all(), write_only=True)
+    checklist = ChecklistField(queryset=Checklist.objects.all(), write_only=True)
 
     class Meta:
         model = ChecklistItem
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from djoser.serializers import UserCreateSerializer as DjoserUserCreateSerializer
 from core.models import Profile, ActivityLog
+from core.services.user_lookup import email_taken, username_taken
 
 class UserCreateSerializer(DjoserUserCreateSerializer):
     class Meta(DjoserUserCreateSerializer.Meta):
@@ -9,7 +10,7 @@ class UserCreateSerializer(DjoserUserCreateSerializer):
 
     def validate_email(self, value):
         # Перевіряємо, чи існує вже користувач з таким email (нечутливо до регістру)
-        if User.objects.filter(email__iexact=value).exists():
+        if email_taken(value):
             raise serializers.ValidationError("Користувач з таким email вже існує.")
         return value
 
@@ -54,14 +55,14 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ('id', 'username', 'first_name', 'last_name', 'email', 'profile')
 
     def validate_email(self, value):
-        if User.objects.filter(email__iexact=value).exclude(pk=self.instance.pk if self.instance else None).exists():
+        if email_taken(value, exclude_pk=self.instance.pk if self.instance else None):
             raise serializers.ValidationError("Користувач з таким email вже існує.")
         return value
 
     def validate_username(self, value):
         if not value:
             raise serializers.ValidationError("Username не може бути порожнім.")
-        if User.objects.filter(username__iexact=value).exclude(pk=self.instance.pk if self.instance else None).exists():
+        if username_taken(value, exclude_pk=self.instance.pk if self.instance else None):
             raise serializers.ValidationError("Користувач з таким username вже існує.")
         return value
 
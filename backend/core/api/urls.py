@@ -4,7 +4,8 @@ from core.api.views import (
     UserViewSet, BoardViewSet, ListViewSet, CardViewSet,
     LabelViewSet, ChecklistViewSet, ChecklistItemViewSet, ActivityViewSet, ActivityLogViewSet,
     GoogleLogin, BoardMemberViewSet, FavoriteBoardViewSet,
-    AttachmentViewSet, CommentViewSet, MyCardsViewSet
+    AttachmentViewSet, CommentViewSet, MyCardsViewSet, SearchViewSet, CalendarViewSet,
+    calendar_feed,
 )
 
 # Створюємо роутер і реєструємо всі ViewSet'и
@@ -23,8 +24,13 @@ router.register(r'attachments', AttachmentViewSet, basename='attachment')
 router.register(r'comments', CommentViewSet, basename='comment')
 router.register(r'activities', ActivityViewSet, basename='activity')
 router.register(r'activity', ActivityLogViewSet, basename='activity-log')
+router.register(r'search', SearchViewSet, basename='search')
+router.register(r'calendar', CalendarViewSet, basename='calendar')
 
 urlpatterns = [
+    # .ics-стрічка термінів: доступ за токеном у посиланні, без DRF-автентифікації
+    path('calendar/feed/<str:token>.ics', calendar_feed, name='calendar_feed'),
+
     # Всі маршрути з роутера
     path('', include(router.urls)),
     
@@ -2,10 +2,13 @@ from .users import UserViewSet, GoogleLogin, ActivityLogViewSet
 from .boards import BoardViewSet, FavoriteBoardViewSet, BoardMemberViewSet, LabelViewSet, ActivityViewSet
 from .cards import ListViewSet, CardViewSet, MyCardsViewSet
 from .details import ChecklistViewSet, ChecklistItemViewSet, AttachmentViewSet, CommentViewSet
+from .search import SearchViewSet
+from .calendar import CalendarViewSet, calendar_feed
 
 __all__ = [
     'UserViewSet', 'GoogleLogin', 'ActivityLogViewSet',
     'BoardViewSet', 'FavoriteBoardViewSet', 'BoardMemberViewSet', 'LabelViewSet', 'ActivityViewSet',
     'ListViewSet', 'CardViewSet', 'MyCardsViewSet',
-    'ChecklistViewSet', 'ChecklistItemViewSet', 'AttachmentViewSet', 'CommentViewSet'
+    'ChecklistViewSet', 'ChecklistItemViewSet', 'AttachmentViewSet', 'CommentViewSet',
+    'SearchViewSet', 'CalendarViewSet', 'calendar_feed',
 ]
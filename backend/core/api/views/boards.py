@@ -1,14 +1,22 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
 
 from core.models import Board, List, Membership, Label, Activity
 from core.api.serializers import BoardSerializer, MembershipSerializer, LabelSerializer, ActivitySerializer
 from core.services.activity_logger import log_activity
+from core.services.batch import apply_batch
+from core.services import cold_storage
+from core.services.copying import clone_board
+from core.services.deletion import job_summary, schedule_board_deletion
+from core.services.member_bulk import add_board_members, parse_ids, parse_members
+from core.services.ordering import spread_keys
 from core.services.permissions import IsOwnerOrReadOnly, ensure_board_admin
+from core.services.prefix_index import index_board, invalidate_user
+from core.services.realtime import notify_role_changed, notify_member_removed
 
 class BoardViewSet(viewsets.ModelViewSet):
     serializer_class = BoardSerializer
@@ -19,7 +27,7 @@ class BoardViewSet(viewsets.ModelViewSet):
         """
         Динамічне визначення прав доступу залежно від дії.
         """
-        if self.action in ['favorite', 'join', 'leave']:
+        if self.action in ['favorite', 'join', 'leave', 'batch', 'clone', 'restore_archived_cards']:
             return [permissions.IsAuthenticated()]
         return super().get_permissions()
 
@@ -27,18 +35,23 @@ class BoardViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.is_anonymous:
             return Board.objects.none()
-        return Board.objects.filter(Q(owner=user) | Q(members=user)).distinct()
+        queryset = Board.objects.filter(Q(owner=user) | Q(members=user), pending_delete=False).distinct()
+        template = self.request.query_params.get('template')
+        if template is not None:
+            queryset = queryset.filter(is_template=template.lower() in ('1', 'true'))
+        return queryset
 
     def perform_create(self, serializer):
         board = serializer.save(owner=self.request.user)
         # Створюємо членство для власника
         Membership.objects.create(user=self.request.user, board=board, role='admin')
         
+        titles = ('To Do', 'In Progress', 'Done')
         List.objects.bulk_create([
-            List(title='To Do', board=board, order=1),
-            List(title='In Progress', board=board, order=2),
-            List(title='Done', board=board, order=3),
+            List(title=title, board=board, position=position)
+            for title, position in zip(titles, spread_keys(len(titles)))
         ])
+        invalidate_user(self.request.user.id)
         log_activity(self.request.user, 'create_board', 'board', board.id, {
             'title': board.title,
             'board_id': board.id,
@@ -50,6 +63,10 @@ class BoardViewSet(viewsets.ModelViewSet):
         prev_archived = previous.is_archived
         prev_title = previous.title
         board = serializer.save()
+        if 'is_archived' in serializer.validated_data and board.is_archived != prev_archived:
+            index_board(board, access_changed=True)
+        elif 'title' in serializer.validated_data:
+            index_board(board)
 
         if 'is_archived' in serializer.validated_data and board.is_archived != prev_archived:
             action = 'archive_board' if board.is_archived else 'unarchive_board'
@@ -71,6 +88,15 @@ class BoardViewSet(viewsets.ModelViewSet):
                     'board_title': board.title
                 })
 
+    def destroy(self, request, *args, **kwargs):
+        """
+        Дошка одразу зникає з усіх вибірок, а її рядки видаляє process_deletions
+        пачками. Відповідь 202 - завдання видалення.
+        """
+        board = self.get_object()
+        job = schedule_board_deletion(board)
+        return Response(job_summary(job), status=202)
+
     @action(detail=True, methods=['post'])
     def favorite(self, request, pk=None):
         board = self.get_object()
@@ -79,6 +105,68 @@ class BoardViewSet(viewsets.ModelViewSet):
         membership.save()
         return Response({'status': 'success', 'is_favorite': membership.is_favorite})
 
+    @action(detail=True, methods=['post'])
+    def batch(self, request, pk=None):
+        """
+        Кілька операцій над картками/списками дошки за один запит.
+        Права перевіряються для кожної операції всередині apply_batch.
+        """
+        board = self.get_object()
+        diff = apply_batch(request.user, board, request.data.get('operations'))
+        return Response(diff)
+
+    @action(detail=True, methods=['post'])
+    def clone(self, request, pk=None):
+        """
+        Нова дошка зі списками, мітками, картками й чек-листами цієї.
+        Шаблон може клонувати будь-який учасник; звичайну дошку і перенесення
+        учасників (include_members) - лише адмін.
+        Відповідь компактна: id нової дошки і кількості скопійованих рядків.
+        """
+        source = self.get_object()
+        include_members = str(request.data.get('include_members', '')).lower() in ('1', 'true')
+        if include_members or not source.is_template:
+            ensure_board_admin(request.user, source, 'Only admins can clone boards.')
+        board, counts = clone_board(request.user, source, request.data.get('title'), include_members)
+
+        invalidate_user(request.user.id)
+        if include_members:
+            for user_id in Membership.objects.filter(board=board).values_list('user_id', flat=True):
+                invalidate_user(user_id)
+        log_activity(request.user, 'create_board', 'board', board.id, {
+            'title': board.title,
+            'board_id': board.id,
+            'board_title': board.title,
+            'original_id': source.id,
+        })
+        return Response({'id': board.id, 'title': board.title, **counts}, status=201)
+
+    @action(detail=True, methods=['get'], url_path='archived-cards')
+    def archived_cards(self, request, pk=None):
+        """
+        Картки з холодного архіву дошки: ?q=...&list=...&limit=...&offset=...
+        Нещодавно архівовані картки ще в гарячих таблицях і приходять разом зі списками.
+        """
+        board = self.get_object()
+        try:
+            limit = max(1, min(int(request.query_params.get('limit') or cold_storage.DEFAULT_LIMIT), cold_storage.MAX_LIMIT))
+            offset = max(0, int(request.query_params.get('offset') or 0))
+            list_id = int(request.query_params['list']) if request.query_params.get('list') else None
+        except ValueError:
+            raise ValidationError({'detail': 'invalid_paging'})
+        query = (request.query_params.get('q') or '').strip()
+        return Response(cold_storage.browse(request.user, board, query, list_id, limit, offset))
+
+    @action(detail=True, methods=['post'], url_path='archived-cards/restore')
+    def restore_archived_cards(self, request, pk=None):
+        """
+        Повертає картки {"cards": [...]} з холодного архіву на дошку розархівованими.
+        """
+        board = self.get_object()
+        card_ids = parse_ids(request.data.get('cards'), 'cards', cold_storage.MAX_LIMIT)
+        restored = cold_storage.unarchive_cards(request.user, board, card_ids)
+        return Response({'board': board.id, 'restored': restored})
+
     @action(detail=False, methods=['post'], url_path='join')
     def join(self, request):
         invite_link = request.data.get('invite_link')
@@ -90,6 +178,7 @@ class BoardViewSet(viewsets.ModelViewSet):
              return Response({'detail': 'already_member'}, status=400)
 
         Membership.objects.create(board=board, user=request.user, role='viewer')
+        invalidate_user(request.user.id)
         serializer = self.get_serializer(board)
         return Response(serializer.data)
 
@@ -101,7 +190,7 @@ class FavoriteBoardViewSet(viewsets.ReadOnlyModelViewSet):
         user = self.request.user
         if user.is_anonymous:
             return Board.objects.none()
-        return Board.objects.filter(membership__user=user, membership__is_favorite=True).distinct()
+        return Board.objects.filter(membership__user=user, membership__is_favorite=True, pending_delete=False).distinct()
 
 # --- ВИПРАВЛЕНИЙ BOARD MEMBER VIEWSET ---
 class BoardMemberViewSet(viewsets.ModelViewSet):
@@ -118,8 +207,10 @@ class BoardMemberViewSet(viewsets.ModelViewSet):
             
         # Запит: Всі мембершипи, які належать дошкам, де поточний юзер є власником АБО учасником
         # Використовуємо distinct(), щоб уникнути дублів
-        accessible_boards = Board.objects.filter(Q(owner=user) | Q(members=user))
-        return Membership.objects.filter(board__in=accessible_boards).select_related('user', 'board')
+        accessible_boards = Board.objects.filter(Q(owner=user) | Q(members=user), pending_delete=False)
+        return Membership.objects.filter(
+            board__in=accessible_boards, user__is_active=True,
+        ).select_related('user', 'board')
 
     def perform_create(self, serializer):
         # Додавання учасника вручну (через API, а не через Join Link)
@@ -133,7 +224,8 @@ class BoardMemberViewSet(viewsets.ModelViewSet):
         if not (is_owner or is_admin):
             raise PermissionDenied('Only admins can add members directly.')
             
-        serializer.save()
+        membership = serializer.save()
+        invalidate_user(membership.user_id)
 
     def perform_update(self, serializer):
         # Зміна ролі учасника
@@ -151,8 +243,13 @@ class BoardMemberViewSet(viewsets.ModelViewSet):
         # Не можна змінювати роль Власника
         if instance.user_id == board.owner_id:
             raise PermissionDenied('Cannot change owner role.')
-            
-        serializer.save()
+
+        prev_role = instance.role
+        membership = serializer.save()
+        if membership.role != prev_role:
+            invalidate_user(membership.user_id)
+            # Переводимо відкриті сокети учасника в нову рольову групу
+            notify_role_changed(membership.board_id, membership.user_id, membership.role)
 
     def perform_destroy(self, instance):
         """
@@ -169,6 +266,8 @@ class BoardMemberViewSet(viewsets.ModelViewSet):
             if board.owner_id == user.id:
                 raise PermissionDenied('Owner cannot leave board. Transfer ownership first.')
             instance.delete()
+            invalidate_user(user.id)
+            notify_member_removed(board.id, user.id)
             return
 
         # Сценарій 2: Видалення іншого користувача
@@ -180,8 +279,27 @@ class BoardMemberViewSet(viewsets.ModelViewSet):
             
         if instance.user_id == board.owner_id:
             raise PermissionDenied('Cannot remove board owner.')
-            
+
+        removed_user_id = instance.user_id
         instance.delete()
+        invalidate_user(removed_user_id)
+        notify_member_removed(board.id, removed_user_id)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Додає кількох користувачів на дошку board_id за один запит:
+        {"board_id": 1, "members": [{"user_id": 2, "role": "developer"}]}
+        або {"board_id": 1, "user_ids": [2, 3], "role": "viewer"}.
+        """
+        try:
+            board_id = int(request.data.get('board_id'))
+        except (TypeError, ValueError):
+            raise ValidationError({'detail': 'board_id_required'})
+        boards = Board.objects.filter(Q(owner=request.user) | Q(members=request.user), pending_delete=False).distinct()
+        board = get_object_or_404(boards, id=board_id)
+        result = add_board_members(request.user, board, parse_members(request.data))
+        return Response(result, status=201)
 
 class LabelViewSet(viewsets.ModelViewSet):
     serializer_class = LabelSerializer
@@ -190,7 +308,7 @@ class LabelViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         queryset = Label.objects.filter(
-            Q(board__owner=user) | Q(board__members=user)
+            Q(board__owner=user) | Q(board__members=user), board__pending_delete=False
         ).distinct()
         board_id = self.request.query_params.get('board_id')
         if board_id:
@@ -237,7 +355,7 @@ class ActivityViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         user = self.request.user
         queryset = Activity.objects.filter(
-            Q(board__owner=user) | Q(board__members=user)
+            Q(board__owner=user) | Q(board__members=user), board__pending_delete=False
         ).distinct().select_related('user', 'board')
         board_id = self.request.query_params.get('board_id')
         user_id = self.request.query_params.get('user_id')
@@ -0,0 +1,60 @@
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.services.calendar import FEED_SCOPES, calendar, feed_cards, feed_etag, feed_token, feed_user, ics_stream
+
+
+class CalendarViewSet(viewsets.ViewSet):
+    """
+    Картки з терміном на всіх доступних дошках, згруповані за днями:
+    /api/calendar/?from=2026-10-01&to=2026-10-31&boards=1,2&tz=Europe/Kyiv&assigned=me
+    Посилання на .ics-стрічку: GET /api/calendar/feed/ (POST - новий токен).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        params = request.query_params
+        return Response(calendar(
+            request.user, params.get('from'), params.get('to'),
+            boards=params.get('boards'), tz=params.get('tz'), assigned=params.get('assigned') == 'me',
+        ))
+
+    @action(detail=False, methods=['get', 'post'])
+    def feed(self, request):
+        token = feed_token(request.user, rotate=request.method == 'POST')
+        url = request.build_absolute_uri(f'/api/calendar/feed/{token}.ics')
+        return Response({
+            'token': token,
+            'urls': {scope: f'{url}?scope={scope}' for scope in FEED_SCOPES},
+        })
+
+
+@require_safe
+def calendar_feed(request, token):
+    """
+    .ics-стрічка термінів за токеном з посилання (календарні програми не
+    вміють Authorization). ?scope=assigned (за замовчуванням) або all.
+    If-None-Match без змін - 304 без читання карток (лише ETag, див.
+    core.services.calendar).
+    """
+    user = feed_user(token)
+    if user is None:
+        raise Http404
+    scope = request.GET.get('scope', 'assigned')
+    if scope not in FEED_SCOPES:
+        scope = 'assigned'
+    queryset, board_ids = feed_cards(user, scope)
+    etag = feed_etag(scope, queryset, board_ids)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = StreamingHttpResponse(
+            ics_stream(queryset, name=f'Boardly - {user.username}') if request.method == 'GET' else [],
+            content_type='text/calendar; charset=utf-8',
+        )
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -1,14 +1,16 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
-from django.db.models import Q
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.db.models import Prefetch, Q
 from django.db import transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.utils.dateparse import parse_date, parse_datetime
 import logging
 
 # Додані імпорти для копіювання та перевірки прав
-from core.models import List, Card, CardMember, Checklist, ChecklistItem, CardLabel, Membership, Label
+from core.models import List, Card, CardMember, CardLabel, Membership, Label
 from core.api.serializers import ListSerializer, CardSerializer, MyCardSerializer
 from core.services.activity_logger import log_activity
 from core.services.permissions import (
@@ -21,18 +23,60 @@ from core.services.permissions import (
     can_manage_card_members,
     can_join_card,
 )
+from core.services.card_bulk import BULK_CREATE_ACTION, create_cards, parse_titles
+from core.services.card_move import move_card
+from core.services.cold_storage import restore_for_edit
+from core.services.copying import card_copy, copy_cards
+from core.services.list_actions import archive_all_cards, move_all_cards, sort_cards_by_due
+from core.services.member_bulk import MAX_BULK_ASSIGN_CARDS, MAX_BULK_MEMBERS, assign_card_members, parse_ids
+from core.services.ordering import new_position, position_after, with_order
+from core.services.realtime import broadcast_board_event, card_audience
+from core.services.prefix_index import index_card, index_list, invalidate_board, unindex
+from core.services.search import reindex_card, reindex_cards, text_match_filter
+from core.services.versioning import bump_versions, etag, parse_if_match, save_versioned
 
 logger = logging.getLogger(__name__)
 
-class ListViewSet(viewsets.ModelViewSet):
+# Усе, що читає CardSerializer, - щоб відповідь на копію списку не робила запитів на кожну картку
+CARD_PREFETCH = (
+    'members__profile', 'checklists__items', 'cardlabel_set__label', 'attachments', 'comments__author__profile',
+)
+
+
+class VersionedViewSetMixin:
+    """
+    ETag ("<version>") на детальному GET і на відповіді PATCH/PUT;
+    If-Match на PATCH/PUT передається серіалізатору як очікувана версія
+    (розбіжність - 412 з поточним станом, див. core.services.versioning).
+    """
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method in ('PUT', 'PATCH'):
+            context['if_match'] = parse_if_match(self.request.headers.get('If-Match'))
+        return context
+
+    def _with_etag(self, response):
+        if response.status_code == 200 and 'version' in response.data:
+            response['ETag'] = etag(response.data['version'])
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._with_etag(super().retrieve(request, *args, **kwargs))
+
+    def update(self, request, *args, **kwargs):
+        return self._with_etag(super().update(request, *args, **kwargs))
+
+
+class ListViewSet(VersionedViewSetMixin, viewsets.ModelViewSet):
     serializer_class = ListSerializer
     permission_classes = [permissions.IsAuthenticated] 
 
     def get_queryset(self):
         user = self.request.user
-        queryset = List.objects.filter(
-            Q(board__owner=user) | Q(board__members=user)
-        ).distinct().prefetch_related('cards')
+        queryset = with_order(List.objects.filter(
+            Q(board__owner=user) | Q(board__members=user), board__pending_delete=False
+        ).distinct()).prefetch_related(Prefetch('cards', queryset=with_order(Card.objects.all())))
         board_id = self.request.query_params.get('board') # Виправлено board_id на board для фільтрації, якщо треба
         if board_id:
             queryset = queryset.filter(board__id=board_id)
@@ -43,6 +87,7 @@ class ListViewSet(viewsets.ModelViewSet):
         if not can_create_list(self.request.user, board):
             raise PermissionDenied('Only admins can create lists.')
         list_obj = serializer.save()
+        index_list(list_obj)
         log_activity(self.request.user, 'create_list', 'list', list_obj.id, {
             'board_id': list_obj.board_id,
             'board_title': list_obj.board.title if list_obj.board_id else None,
@@ -53,66 +98,24 @@ class ListViewSet(viewsets.ModelViewSet):
         previous = serializer.instance
         prev_title = previous.title
         prev_archived = previous.is_archived
-        prev_order = previous.order
+        prev_position = previous.position
         ensure_board_admin(self.request.user, previous.board, 'Only admins can update lists.')
-        with transaction.atomic():
-            has_order_update = 'order' in serializer.validated_data and not previous.is_archived
-            requested_order = int(serializer.validated_data.get('order') or prev_order or 1) if has_order_update else None
-
-            if has_order_update:
-                list_obj = serializer.save()
-                active_lists = list(
-                    List.objects.select_for_update()
-                    .filter(board=list_obj.board, is_archived=False)
-                    .order_by('order', 'id')
-                )
-                active_ids = [item.id for item in active_lists]
-                active_snapshot_before = [f'{item.id}:{item.title}:{item.order}' for item in active_lists]
-                logger.warning(
-                    '[list-move][backend-start] board_id=%s user_id=%s list_id=%s list_title=%s prev_order=%s requested_order=%s active_before=%s',
-                    list_obj.board_id,
-                    self.request.user.id,
-                    list_obj.id,
-                    list_obj.title,
-                    prev_order,
-                    requested_order,
-                    active_snapshot_before,
-                )
-                if list_obj.id in active_ids:
-                    active_ids.remove(list_obj.id)
-                    target_index = max(0, min(len(active_ids), requested_order - 1))
-                    active_ids.insert(target_index, list_obj.id)
-                    order_by_id = {list_id: index for index, list_id in enumerate(active_ids, start=1)}
-                    changed = []
-                    for item in active_lists:
-                        next_order = order_by_id.get(item.id)
-                        if next_order is None:
-                            continue
-                        if item.order != next_order:
-                            item.order = next_order
-                            changed.append(item)
-                    if changed:
-                        List.objects.bulk_update(changed, ['order'])
-                    active_snapshot_after = [f'{item.id}:{item.title}:{order_by_id.get(item.id)}' for item in active_lists]
-                    logger.warning(
-                        '[list-move][backend-reordered] board_id=%s list_id=%s list_title=%s target_index=%s active_after=%s changed_count=%s',
-                        list_obj.board_id,
-                        list_obj.id,
-                        list_obj.title,
-                        target_index,
-                        active_snapshot_after,
-                        len(changed),
-                    )
-                list_obj.refresh_from_db()
-                logger.warning(
-                    '[list-move][backend-result] board_id=%s list_id=%s list_title=%s final_order=%s',
-                    list_obj.board_id,
-                    list_obj.id,
-                    list_obj.title,
-                    list_obj.order,
-                )
-            else:
-                list_obj = serializer.save()
+        # Переміщення - новий дробовий ключ лише для цього списку (ListSerializer)
+        list_obj = serializer.save()
+        if list_obj.position != prev_position:
+            logger.warning(
+                '[list-move][backend-result] board_id=%s list_id=%s list_title=%s position=%s -> %s',
+                list_obj.board_id,
+                list_obj.id,
+                list_obj.title,
+                prev_position,
+                list_obj.position,
+            )
+
+        if 'is_archived' in serializer.validated_data and list_obj.is_archived != prev_archived:
+            invalidate_board(list_obj.board_id)
+        elif 'title' in serializer.validated_data:
+            index_list(list_obj)
 
         if 'is_archived' in serializer.validated_data and list_obj.is_archived != prev_archived:
             action = 'archive_list' if list_obj.is_archived else 'unarchive_list'
@@ -127,7 +130,7 @@ class ListViewSet(viewsets.ModelViewSet):
                 'board_id': list_obj.board_id,
                 'board_title': list_obj.board.title if list_obj.board_id else None
             })
-        elif 'order' in serializer.validated_data and list_obj.order != prev_order:
+        elif 'order' in serializer.validated_data and list_obj.position != prev_position:
             log_activity(self.request.user, 'move_list', 'list', list_obj.id, {
                 'board_id': list_obj.board_id,
                 'board_title': list_obj.board.title if list_obj.board_id else None,
@@ -146,58 +149,115 @@ class ListViewSet(viewsets.ModelViewSet):
             new_list = List.objects.create(
                 board=original_list.board,
                 title=new_title,
-                order=original_list.order + 1,
+                position=position_after(original_list),
                 color=original_list.color
             )
-            
-            # 2. Копіюємо всі активні картки
-            original_cards = original_list.cards.filter(is_archived=False)
-            for card in original_cards:
-                new_card = Card.objects.create(
-                    list=new_list,
-                    title=card.title,
-                    description=card.description,
-                    card_color=card.card_color,
-                    cover_size=card.cover_size,
-                    order=card.order,
-                    due_date=card.due_date,
-                    is_completed=card.is_completed,
-                    is_public=card.is_public
-                )
-                
-                # Копіюємо мітки
-                for card_label in CardLabel.objects.filter(card=card):
-                    CardLabel.objects.create(card=new_card, label=card_label.label)
-                
-                # Копіюємо чеклисти
-                for checklist in card.checklists.all():
-                    new_checklist = Checklist.objects.create(card=new_card, title=checklist.title)
-                    for item in checklist.items.all():
-                        ChecklistItem.objects.create(
-                            checklist=new_checklist, text=item.text, is_checked=item.is_checked, order=item.order
-                        )
 
+            # 2. Активні картки з мітками й чек-листами - по одному INSERT на рівень
+            original_cards = original_list.cards.filter(is_archived=False).order_by('position', 'id')
+            copies = copy_cards([
+                (card, card_copy(card, list=new_list, position=card.position)) for card in original_cards
+            ])
+
+            reindex_cards([card.id for card in copies])
+            index_list(new_list)
+            invalidate_board(new_list.board_id)
             log_activity(request.user, 'copy_list', 'list', new_list.id, {
                 'board_id': new_list.board_id,
                 'board_title': new_list.board.title,
                 'original_id': pk,
                 'title': new_list.title
             })
+            new_list = with_order(List.objects.filter(id=new_list.id)).select_related('board').prefetch_related(
+                Prefetch('cards', queryset=with_order(Card.objects.prefetch_related(*CARD_PREFETCH)))
+            ).get()
             return Response(ListSerializer(new_list).data)
 
+    def _accessible_list(self, pk):
+        """
+        Список без анотацій і prefetch карток get_queryset - для дій над усім списком.
+        """
+        user = self.request.user
+        return get_object_or_404(
+            List.objects.select_related('board').filter(
+                Q(board__owner=user) | Q(board__members=user), board__pending_delete=False,
+            ).distinct(),
+            pk=pk,
+        )
+
+    @action(detail=True, methods=['post'], url_path='move-all')
+    def move_all(self, request, pk=None):
+        return Response(move_all_cards(request.user, self._accessible_list(pk), request.data.get('list')))
+
+    @action(detail=True, methods=['post'], url_path='archive-all')
+    def archive_all(self, request, pk=None):
+        return Response(archive_all_cards(request.user, self._accessible_list(pk)))
+
+    @action(detail=True, methods=['post'])
+    def sort(self, request, pk=None):
+        """
+        {"by": "due_date", "direction": "asc" | "desc"} - поки що лише за терміном.
+        """
+        if request.data.get('by', 'due_date') != 'due_date':
+            raise ValidationError({'detail': 'unsupported_sort'})
+        descending = request.data.get('direction') == 'desc'
+        return Response(sort_cards_by_due(request.user, self._accessible_list(pk), descending))
+
+    @action(detail=True, methods=['post'], url_path='cards/bulk')
+    def bulk_cards(self, request, pk=None):
+        """
+        Багато карток за один запит: {"titles": [...]} або {"text": "..."}
+        (по картці на рядок), необов'язково "order" - місце першої з них.
+        """
+        titles = parse_titles(request.data)
+        list_obj = self._accessible_list(pk)
+        index = request.data.get('order')
+        if index not in (None, ''):
+            try:
+                index = int(index)
+            except (TypeError, ValueError):
+                raise ValidationError({'detail': 'invalid_order'})
+        cards = create_cards(request.user, list_obj, titles, index or None)
+
+        queryset = with_order(Card.objects.filter(id__in=[card.id for card in cards])).select_related(
+            'list', 'list__board'
+        ).prefetch_related(*CARD_PREFETCH)
+        data = CardSerializer(queryset, many=True).data
+        transaction.on_commit(lambda: broadcast_board_event(
+            list_obj.board_id, BULK_CREATE_ACTION, {'list': list_obj.id, 'cards': data}, sender_id=request.user.id,
+        ))
+        return Response({'list': list_obj.id, 'cards': data}, status=201)
+
     def perform_destroy(self, instance):
         ensure_board_admin(self.request.user, instance.board, 'Only admins can delete lists.')
         instance.delete()
+        invalidate_board(instance.board_id)
 
-class CardViewSet(viewsets.ModelViewSet):
+class CardViewSet(VersionedViewSetMixin, viewsets.ModelViewSet):
     serializer_class = CardSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_object(self):
+        """
+        PATCH/PUT картки з холодного архіву спершу повертає її рядки в гарячі
+        таблиці - розархівування лишається звичайним PATCH {"is_archived": false}.
+        """
+        try:
+            return super().get_object()
+        except Http404:
+            if self.request.method not in ('PUT', 'PATCH') or not self._restore_cold_card():
+                raise
+        return super().get_object()
+
+    def _restore_cold_card(self):
+        pk = str(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field))
+        return pk.isdigit() and restore_for_edit(self.request.user, int(pk))
+
     def get_queryset(self):
         user = self.request.user
-        queryset = Card.objects.filter(
-            Q(list__board__owner=user) | Q(list__board__members=user)
-        ).distinct().select_related('list', 'list__board').prefetch_related(
+        queryset = with_order(Card.objects.filter(
+            Q(list__board__owner=user) | Q(list__board__members=user), list__board__pending_delete=False
+        ).distinct()).select_related('list', 'list__board').prefetch_related(
             'members', 'checklists__items', 'cardlabel_set__label'
         )
         list_id = self.request.query_params.get('list_id')
@@ -223,7 +283,7 @@ class CardViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(cardlabel__label_id=label)
 
         if query:
-            queryset = queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
+            queryset = queryset.filter(text_match_filter(query))
 
         if due_before:
             parsed_datetime = parse_datetime(due_before)
@@ -260,9 +320,10 @@ class CardViewSet(viewsets.ModelViewSet):
         if list_obj and not can_create_card(self.request.user, list_obj):
             raise PermissionDenied('Only admins or allowed developers can create cards in this list.')
         card = serializer.save()
-        Checklist.objects.get_or_create(card=card, title='Чек-лист')
+        reindex_card(card.id)
         # Авто-призначаємо автора на картку, щоб "Мої картки" не були порожні.
         CardMember.objects.get_or_create(card=card, user=self.request.user)
+        index_card(card)
         board_id = card.list.board_id if card.list_id else None
         log_activity(self.request.user, 'create_card', 'card', card.id, {
             'list': card.list_id,
@@ -293,6 +354,10 @@ class CardViewSet(viewsets.ModelViewSet):
         prev_label_ids = set(CardLabel.objects.filter(card=previous).values_list('label_id', flat=True))
         
         card = serializer.save()
+        if 'title' in serializer.validated_data or 'description' in serializer.validated_data:
+            reindex_card(card.id)
+        if {'title', 'list', 'is_archived', 'is_public'} & set(serializer.validated_data):
+            index_card(card)
         board_id = card.list.board_id if card.list_id else None
         board_title = card.list.board.title if card.list_id else None
 
@@ -370,17 +435,34 @@ class CardViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
         # Забороняємо видалення без прав
         ensure_board_admin(self.request.user, instance.list.board, 'Only admins can delete cards.')
+        card_id = instance.id
         instance.delete()
+        unindex('card', card_id)
 
     # --- НОВІ ACTIONS ---
 
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        """
+        Перетягування картки: {list, before_id, after_id} -> {id, list, order, version}.
+        Без get_object і CardSerializer - права й сусіди читаються одним запитом.
+        """
+        result = move_card(
+            request.user, pk, request.data.get('list'),
+            before_id=request.data.get('before_id'), after_id=request.data.get('after_id'),
+        )
+        return Response(result)
+
     @action(detail=True, methods=['post'])
     def join(self, request, pk=None):
         card = self.get_object()
         if not can_join_card(request.user, card):
             raise PermissionDenied('Only admins can manage card members.')
-        CardMember.objects.get_or_create(card=card, user=request.user)
+        _, created = CardMember.objects.get_or_create(card=card, user=request.user)
+        if created:
+            bump_versions(Card, [card.id])
         card.refresh_from_db()
+        index_card(card)
         return Response(CardSerializer(card).data)
 
     @action(detail=True, methods=['post'])
@@ -389,7 +471,9 @@ class CardViewSet(viewsets.ModelViewSet):
         if not CardMember.objects.filter(card=card, user=request.user).exists():
             raise PermissionDenied('Not a card member.')
         CardMember.objects.filter(card=card, user=request.user).delete()
+        bump_versions(Card, [card.id])
         card.refresh_from_db()
+        index_card(card)
         return Response(CardSerializer(card).data)
 
     @action(detail=True, methods=['post'], url_path='remove-member')
@@ -402,8 +486,11 @@ class CardViewSet(viewsets.ModelViewSet):
         if not user_id:
             return Response({'detail': 'user_id_required'}, status=400)
 
-        CardMember.objects.filter(card=card, user_id=user_id).delete()
+        deleted, _ = CardMember.objects.filter(card=card, user_id=user_id).delete()
+        if deleted:
+            bump_versions(Card, [card.id])
         card.refresh_from_db()
+        index_card(card)
         return Response(CardSerializer(card).data)
 
     @action(detail=True, methods=['post'], url_path='add-member')
@@ -422,49 +509,66 @@ class CardViewSet(viewsets.ModelViewSet):
         if membership.role == 'viewer':
             return Response({'detail': 'viewer_cannot_be_assigned'}, status=400)
 
-        CardMember.objects.get_or_create(card=card, user_id=user_id)
+        _, created = CardMember.objects.get_or_create(card=card, user_id=user_id)
+        if created:
+            bump_versions(Card, [card.id])
         card.refresh_from_db()
+        index_card(card)
         return Response(CardSerializer(card).data)
 
+    @action(detail=False, methods=['post'], url_path='members/bulk')
+    def bulk_add_members(self, request):
+        """
+        Призначає кількох користувачів на кілька карток однієї дошки:
+        {"cards": [1, 2], "user_ids": [3, 4]}. Відповідь - id і кількість нових призначень.
+        """
+        card_ids = parse_ids(request.data.get('cards'), 'cards', MAX_BULK_ASSIGN_CARDS)
+        user_ids = parse_ids(request.data.get('user_ids'), 'user_ids', MAX_BULK_MEMBERS)
+        return Response(assign_card_members(request.user, card_ids, user_ids))
+
     @action(detail=True, methods=['post'])
     def toggle_public(self, request, pk=None):
         card = self.get_object()
         ensure_board_admin(request.user, card.list.board, 'Only admins can change card visibility.')
             
-        card.is_public = not card.is_public
-        card.save()
-        return Response(CardSerializer(card).data)
+        save_versioned(card, {'is_public': not card.is_public})
+        index_card(card)
+        data = CardSerializer(card).data
+        audience, user_ids = card_audience(card)
+        broadcast_board_event(
+            card.list.board_id, 'board/updateCard/fulfilled', data,
+            sender_id=request.user.id, audience=audience, user_ids=user_ids,
+        )
+        return Response(data)
 
     @action(detail=True, methods=['post'])
     def copy(self, request, pk=None):
         original_card = self.get_object()
         target_list_id = request.data.get('list_id', original_card.list_id)
         new_title = request.data.get('title', f"{original_card.title} (Копія)")
-        target_list = List.objects.get(id=target_list_id)
+        lists = List.objects.filter(
+            Q(board__owner=request.user) | Q(board__members=request.user), board__pending_delete=False,
+        ).distinct().select_related('board')
+        try:
+            target_list = get_object_or_404(lists, id=int(target_list_id))
+        except (TypeError, ValueError):
+            raise ValidationError({'detail': 'invalid_list'})
         ensure_board_admin(request.user, target_list.board, 'Only admins can copy cards.')
         
         with transaction.atomic():
-            new_card = Card.objects.create(
+            new_card, = copy_cards([(original_card, card_copy(
+                original_card,
                 list=target_list,
                 title=new_title,
-                description=original_card.description,
-                card_color=original_card.card_color,
-                cover_size=original_card.cover_size,
-                order=original_card.order + 1,
-                due_date=original_card.due_date,
-                is_public=original_card.is_public
-            )
-            
-            for card_label in CardLabel.objects.filter(card=original_card):
-                CardLabel.objects.create(card=new_card, label=card_label.label)
-                
-            for checklist in original_card.checklists.all():
-                new_checklist = Checklist.objects.create(card=new_card, title=checklist.title)
-                for item in checklist.items.all():
-                    ChecklistItem.objects.create(
-                        checklist=new_checklist, text=item.text, is_checked=item.is_checked, order=item.order
-                    )
-            
+                position=(
+                    position_after(original_card) if target_list.id == original_card.list_id
+                    else new_position(Card, {'list_id': target_list.id})
+                ),
+                is_completed=False,
+            ))])
+
+            reindex_card(new_card.id)
+            index_card(new_card)
             log_activity(request.user, 'copy_card', 'card', new_card.id, {
                 'board_id': target_list.board_id,
                 'board_title': target_list.board.title,
@@ -492,5 +596,5 @@ class MyCardsViewSet(viewsets.ReadOnlyModelViewSet):
         if user.is_anonymous:
             return Card.objects.none()
         return Card.objects.filter(
-            Q(members=user)
+            Q(members=user), list__board__pending_delete=False
         ).select_related('list', 'list__board').prefetch_related('cardlabel_set__label').distinct()
@@ -1,7 +1,11 @@
-from rest_framework import viewsets, permissions
-from core.models import Checklist, ChecklistItem, Attachment, Comment
+from rest_framework import viewsets, permissions, status
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from core.models import Card, Checklist, ChecklistItem, Attachment, Comment
 from core.api.serializers import ChecklistSerializer, ChecklistItemSerializer, AttachmentSerializer, CommentSerializer
 from core.services.activity_logger import log_activity
+from core.services.checklists import dismiss_default_checklist, materialize_default_checklist
+from core.services.search import reindex_card
 from core.services.permissions import (
     ensure_card_edit,
     ensure_comment_create,
@@ -14,7 +18,7 @@ class ChecklistViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Checklist.objects.all().prefetch_related('items')
+        queryset = Checklist.objects.filter(card__list__board__pending_delete=False).prefetch_related('items')
         card_id = self.request.query_params.get('card_id')
         if card_id:
             queryset = queryset.filter(card__id=card_id)
@@ -31,21 +35,42 @@ class ChecklistViewSet(viewsets.ModelViewSet):
         ensure_card_edit(self.request.user, checklist.card, 'Only card members or admins can update checklists.')
         serializer.save()
 
+    def destroy(self, request, *args, **kwargs):
+        pk = str(kwargs.get('pk', ''))
+        if not (pk.startswith('-') and pk[1:].isdigit()):
+            return super().destroy(request, *args, **kwargs)
+        # Від'ємний id - віртуальний стандартний чек-лист картки: рядка немає, лише ховаємо його
+        card = Card.objects.select_related('list__board').filter(id=int(pk[1:]), list__board__pending_delete=False).first()
+        if card is None or not card.show_default_checklist:
+            raise NotFound()
+        ensure_card_edit(request.user, card, 'Only card members or admins can delete checklists.')
+        dismiss_default_checklist(card.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     def perform_destroy(self, instance):
         ensure_card_edit(self.request.user, instance.card, 'Only card members or admins can delete checklists.')
         instance.delete()
+        # Після останнього справжнього чек-листа віртуальний не повертається
+        dismiss_default_checklist(instance.card_id)
+        reindex_card(instance.card_id)
 
 class ChecklistItemViewSet(viewsets.ModelViewSet):
     serializer_class = ChecklistItemSerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset = ChecklistItem.objects.select_related('checklist__card__list__board')
+    queryset = ChecklistItem.objects.filter(
+        checklist__card__list__board__pending_delete=False,
+    ).select_related('checklist__card__list__board')
 
     def perform_create(self, serializer):
         checklist = serializer.validated_data.get('checklist')
         if checklist:
             ensure_card_edit(self.request.user, checklist.card, 'Only card members or admins can update checklist items.')
+            if checklist.pk is None:
+                # Перший пункт віртуального чек-листа - тепер створюємо рядок
+                serializer.validated_data['checklist'] = materialize_default_checklist(checklist.card)
         item = serializer.save()
         card = item.checklist.card
+        reindex_card(card.id)
         log_activity(
             self.request.user,
             'add_checklist_item',
@@ -66,6 +91,12 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         item_instance = serializer.instance
         ensure_card_edit(self.request.user, item_instance.checklist.card, 'Only card members or admins can update checklist items.')
+        target = serializer.validated_data.get('checklist')
+        if target is not None and target.pk != item_instance.checklist_id:
+            # Перенесення пункту: права потрібні й на картку, куди він переїжджає
+            ensure_card_edit(self.request.user, target.card, 'Only card members or admins can update checklist items.')
+            if target.pk is None:
+                serializer.validated_data['checklist'] = materialize_default_checklist(target.card)
         previous = serializer.instance
         prev_checked = previous.is_checked
         prev_text = previous.text
@@ -91,6 +122,7 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
             )
         if 'text' in serializer.validated_data and item.text != prev_text:
             card = item.checklist.card
+            reindex_card(card.id)
             log_activity(
                 self.request.user,
                 'update_checklist_item',
@@ -109,12 +141,17 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
                 }
             )
 
+    def perform_destroy(self, instance):
+        card_id = instance.checklist.card_id
+        instance.delete()
+        reindex_card(card_id)
+
 class AttachmentViewSet(viewsets.ModelViewSet):
     serializer_class = AttachmentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Attachment.objects.all()
+        queryset = Attachment.objects.filter(card__list__board__pending_delete=False)
         card_id = self.request.query_params.get('card_id')
         if card_id:
             queryset = queryset.filter(card__id=card_id)
@@ -140,7 +177,7 @@ class CommentViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Comment.objects.all().select_related('author')
+        queryset = Comment.objects.filter(card__list__board__pending_delete=False).select_related('author')
         card_id = self.request.query_params.get('card_id')
         if card_id:
             queryset = queryset.filter(card__id=card_id)
@@ -152,6 +189,7 @@ class CommentViewSet(viewsets.ModelViewSet):
             ensure_comment_create(self.request.user, card, 'Only board members can add comments.')
         comment = serializer.save(author=self.request.user)
         card = comment.card
+        reindex_card(card.id)
         log_activity(
             self.request.user,
             'add_comment',
@@ -170,8 +208,11 @@ class CommentViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         comment = serializer.instance
         ensure_comment_edit(self.request.user, comment, 'Only author or admins can edit comments.')
-        serializer.save()
+        comment = serializer.save()
+        if 'text' in serializer.validated_data:
+            reindex_card(comment.card_id)
 
     def perform_destroy(self, instance):
         ensure_comment_delete(self.request.user, instance, 'Only admins can delete comments.')
         instance.delete()
+        reindex_card(instance.card_id)
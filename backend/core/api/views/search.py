@@ -0,0 +1,44 @@
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.services import prefix_index
+from core.services.search import DEFAULT_LIMIT, MAX_LIMIT, search_cards
+
+
+def _limit_param(request, default, maximum):
+    try:
+        limit = int(request.query_params.get('limit') or default)
+    except ValueError:
+        return None
+    return max(1, min(limit, maximum))
+
+
+class SearchViewSet(viewsets.ViewSet):
+    """
+    Повнотекстовий пошук карток: /api/search/?q=...&board_id=...&limit=...
+    Швидкий перехід (autocomplete): /api/search/suggest/?prefix=...
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        query = (request.query_params.get('q') or '').strip()
+        board_id = request.query_params.get('board_id')
+        include_archived = request.query_params.get('include_archived') in ('1', 'true')
+        limit = _limit_param(request, DEFAULT_LIMIT, MAX_LIMIT)
+        if limit is None:
+            return Response({'detail': 'invalid_limit'}, status=400)
+        if board_id and not str(board_id).isdigit():
+            return Response({'detail': 'invalid_board_id'}, status=400)
+
+        results = search_cards(request.user, query, board_id=board_id, limit=limit, include_archived=include_archived)
+        return Response({'query': query, 'results': results})
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        prefix = (request.query_params.get('prefix') or '').strip()
+        limit = _limit_param(request, prefix_index.DEFAULT_LIMIT, prefix_index.MAX_LIMIT)
+        if limit is None:
+            return Response({'detail': 'invalid_limit'}, status=400)
+        results = prefix_index.get_prefix_index_registry().suggest(request.user, prefix, limit) if prefix else []
+        return Response({'prefix': prefix, 'results': results})
@@ -12,7 +12,6 @@ from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Q
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from dj_rest_auth.registration.views import SocialLoginView
@@ -21,6 +20,8 @@ from core.models import Profile, ActivityLog
 from core.api.serializers import UserSerializer, ActivityLogSerializer
 from core.services.activity_retention import apply_activity_retention
 from core.services.activity_logger import log_activity
+from core.services.deletion import job_summary, schedule_user_deletion
+from core.services.user_search import search_users
 
 class GoogleLogin(SocialLoginView):
     adapter_class = GoogleOAuth2Adapter
@@ -28,20 +29,16 @@ class GoogleLogin(SocialLoginView):
     callback_url = "postmessage"
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = User.objects.all().select_related('profile')
+    queryset = User.objects.filter(is_active=True).select_related('profile')
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         queryset = super().get_queryset()
         query = self.request.query_params.get('search') or self.request.query_params.get('q')
-        if query:
-            queryset = queryset.filter(
-                Q(username__icontains=query)
-                | Q(email__icontains=query)
-                | Q(first_name__icontains=query)
-                | Q(last_name__icontains=query)
-            )
+        if query is not None and self.action == 'list':
+            # Індексований пошук з жорстким лімітом; спочатку ті, з ким є спільні дошки
+            return search_users(self.request.user, query, self.request.query_params.get('limit'))
         return queryset
 
     @action(detail=False, methods=['get', 'patch', 'delete'], url_path='me')
@@ -60,8 +57,9 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(serializer.data)
         
         elif request.method == 'DELETE':
-            request.user.delete()
-            return Response(status=204)
+            # Акаунт деактивується одразу, рядки видаляє process_deletions пачками
+            job = schedule_user_deletion(request.user)
+            return Response(job_summary(job), status=202)
 
     @action(detail=False, methods=['post', 'delete'], url_path='me/avatar')
     def avatar(self, request):
@@ -1,8 +1,6 @@
 from django.contrib.auth.backends import ModelBackend
-from django.contrib.auth import get_user_model
-from django.db.models import Q
 
-User = get_user_model()
+from core.services.user_lookup import find_user_by_login
 
 class EmailOrUsernameModelBackend(ModelBackend):
     """
@@ -16,15 +14,12 @@ class EmailOrUsernameModelBackend(ModelBackend):
         if username is None:
             return None
 
-        try:
-            # Шукаємо користувача, у якого username АБО email співпадає з введеним текстом
-            # iexact робить пошук нечутливим до регістру (admin = Admin)
-            user = User.objects.get(Q(username__iexact=username) | Q(email__iexact=username))
-        except User.DoesNotExist:
+        # Шукаємо користувача, у якого username АБО email співпадає з введеним текстом
+        # без урахування регістру (admin = Admin); один запит по функціональних індексах.
+        # Якщо раптом є кілька юзерів з таким email (старі дані), береться найстаріший.
+        user = find_user_by_login(username)
+        if user is None:
             return None
-        except User.MultipleObjectsReturned:
-            # Якщо раптом є кілька юзерів з таким email (старі дані), беремо першого
-            user = User.objects.filter(Q(username__iexact=username) | Q(email__iexact=username)).order_by('id').first()
 
         # Перевіряємо пароль і чи активний юзер
         if user.check_password(password) and self.user_can_authenticate(user):
@@ -0,0 +1,515 @@
+"""
+Channel layer для кількох процесів на одному хості без Redis.
+
+Процеси спілкуються через Unix domain socket з невеликим hub-ом, який
+тримає черги каналів і групи з тією ж семантикою, що й InMemoryChannelLayer
+(capacity, expiry, group_expiry). Hub запускається:
+  * вбудовано - перший процес, що захопив flock на "<path>.lock", піднімає
+    hub у фоновому потоці (embedded_hub=True, за замовчуванням);
+  * окремо - `python manage.py run_channel_hub`.
+
+Тіло повідомлення серіалізується msgpack один раз на стороні відправника;
+hub пересилає його як непрозорі байти, тож group_send не кодує повідомлення
+повторно для кожного отримувача.
+"""
+import asyncio
+import fcntl
+import os
+import random
+import string
+import struct
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+
+import msgpack
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'boardly-channels.sock')
+
+_FRAME_HEADER = struct.Struct('!I')
+
+
+def _pack(frame):
+    data = msgpack.packb(frame, use_bin_type=True)
+    return _FRAME_HEADER.pack(len(data)) + data
+
+
+async def _read_frame(reader):
+    header = await reader.readexactly(_FRAME_HEADER.size)
+    (length,) = _FRAME_HEADER.unpack(header)
+    return msgpack.unpackb(await reader.readexactly(length), raw=False)
+
+
+def _client_marker(client_id):
+    return f'.{client_id}!'
+
+
+# ----------------------------------------------------------------------
+# HUB
+# ----------------------------------------------------------------------
+
+class _Peer:
+    def __init__(self, writer):
+        self.writer = writer
+        self.client_id = None
+        self.closed = False
+        self.task = None
+
+    def write(self, frame):
+        if not self.closed:
+            self.writer.write(_pack(frame))
+
+
+class ChannelHub:
+    """
+    Брокер: черги каналів, очікувачі receive та групи.
+    Працює в одному event loop, тому не потребує блокувань.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET_PATH, expiry=60, group_expiry=86400, capacity=100, channel_capacity=None):
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.limits = BaseChannelLayer(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        # channel -> deque[(expires_at, body)]
+        self.channels = {}
+        # channel -> deque[(peer, request_id)]
+        self.waiters = {}
+        # group -> {channel: joined_at}
+        self.groups = {}
+        self.peers = set()
+        self.server = None
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self._handle, path=self.path)
+        return self.server
+
+    async def serve_forever(self, ready=None):
+        await self.start()
+        if ready is not None:
+            ready.set()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        """
+        Зупиняє сервер і дочікується завершення обробників з'єднань
+        (закриття транспорту дає обробнику EOF замість скасування задачі).
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        handlers = [peer.task for peer in self.peers if peer.task is not None]
+        for peer in list(self.peers):
+            peer.writer.close()
+        if handlers:
+            await asyncio.gather(*handlers, return_exceptions=True)
+
+    async def _handle(self, reader, writer):
+        peer = _Peer(writer)
+        peer.task = asyncio.current_task()
+        self.peers.add(peer)
+        try:
+            while True:
+                frame = await _read_frame(reader)
+                self._dispatch(peer, frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            peer.closed = True
+            self.peers.discard(peer)
+            self._forget_client(peer.client_id)
+            writer.close()
+
+    def _dispatch(self, peer, frame):
+        op, request_id, arg, payload = frame
+        if op == 'hello':
+            peer.client_id = arg
+            return
+        if op == 'cancel':
+            self._cancel(peer, arg, payload)
+            return
+        if op == 'send':
+            expires_at, body = payload
+            peer.write(['ok', request_id, self._send(arg, expires_at, body), None])
+        elif op == 'group_send':
+            expires_at, body = payload
+            self._group_send(arg, expires_at, body)
+            peer.write(['ok', request_id, True, None])
+        elif op == 'group_add':
+            self.groups.setdefault(arg, {})[payload] = time.time()
+            peer.write(['ok', request_id, True, None])
+        elif op == 'group_discard':
+            self._group_discard(arg, payload)
+            peer.write(['ok', request_id, True, None])
+        elif op == 'receive':
+            self._receive(peer, request_id, arg)
+        elif op == 'flush':
+            self.channels.clear()
+            self.groups.clear()
+            peer.write(['ok', request_id, True, None])
+
+    def _send(self, channel, expires_at, body):
+        self._clean_channel(channel)
+        waiters = self.waiters.get(channel)
+        while waiters:
+            peer, request_id = waiters.popleft()
+            if peer.closed:
+                continue
+            peer.write(['msg', request_id, channel, body])
+            if not waiters:
+                self.waiters.pop(channel, None)
+            return True
+        queue = self.channels.setdefault(channel, deque())
+        if len(queue) >= self.limits.get_capacity(channel):
+            return False
+        queue.append((expires_at, body))
+        return True
+
+    def _group_send(self, group, expires_at, body):
+        members = self.groups.get(group)
+        if not members:
+            return
+        timeout = time.time() - self.group_expiry
+        for channel, joined_at in list(members.items()):
+            if joined_at < timeout:
+                members.pop(channel, None)
+                continue
+            # Переповнений канал тихо пропускаємо, як InMemoryChannelLayer
+            self._send(channel, expires_at, body)
+
+    def _group_discard(self, group, channel):
+        members = self.groups.get(group)
+        if members:
+            members.pop(channel, None)
+            if not members:
+                self.groups.pop(group, None)
+
+    def _receive(self, peer, request_id, channel):
+        self._clean_channel(channel)
+        queue = self.channels.get(channel)
+        if queue:
+            _, body = queue.popleft()
+            if not queue:
+                self.channels.pop(channel, None)
+            peer.write(['msg', request_id, channel, body])
+            return
+        self.waiters.setdefault(channel, deque()).append((peer, request_id))
+
+    def _cancel(self, peer, channel, request_id):
+        waiters = self.waiters.get(channel)
+        if not waiters:
+            return
+        try:
+            waiters.remove((peer, request_id))
+        except ValueError:
+            # Повідомлення вже відправлено; клієнт збереже його як orphan
+            return
+        if not waiters:
+            self.waiters.pop(channel, None)
+
+    def _clean_channel(self, channel):
+        """
+        Прострочене повідомлення означає, що канал ніхто не читає:
+        прибираємо його з усіх груп (семантика InMemoryChannelLayer).
+        """
+        queue = self.channels.get(channel)
+        if not queue:
+            return
+        now = time.time()
+        expired = False
+        while queue and queue[0][0] < now:
+            queue.popleft()
+            expired = True
+        if expired:
+            for members in self.groups.values():
+                members.pop(channel, None)
+        if not queue:
+            self.channels.pop(channel, None)
+
+    def _forget_client(self, client_id):
+        if not client_id or any(peer.client_id == client_id for peer in self.peers):
+            return
+        marker = _client_marker(client_id)
+        for channel in [name for name in self.channels if marker in name]:
+            self.channels.pop(channel, None)
+        for members in self.groups.values():
+            for channel in [name for name in members if marker in name]:
+                members.pop(channel, None)
+        for group in [name for name, members in self.groups.items() if not members]:
+            self.groups.pop(group, None)
+
+
+class _HubThread(threading.Thread):
+    def __init__(self, hub):
+        super().__init__(name='boardly-channel-hub', daemon=True)
+        self.hub = hub
+        self.ready = threading.Event()
+
+    def run(self):
+        asyncio.run(self.hub.serve_forever(ready=self.ready))
+
+
+def acquire_hub_lock(path, blocking=False):
+    """
+    Повертає відкритий файловий дескриптор, якщо цей процес став hub-ом.
+    Блокування звільняє ОС, коли процес завершується.
+    """
+    fd = os.open(f'{path}.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+# ----------------------------------------------------------------------
+# CLIENT
+# ----------------------------------------------------------------------
+
+class _HubConnection:
+    def __init__(self, layer, reader, writer):
+        self.layer = layer
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        # Повідомлення, що прийшли на вже скасований receive
+        self.orphans = {}
+        self.closed = False
+        self._next_id = 0
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    def _request_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    def write(self, frame):
+        if self.closed:
+            raise ConnectionError('Channel hub connection is closed.')
+        self.writer.write(_pack(frame))
+
+    async def request(self, op, arg=None, payload=None):
+        request_id = self._request_id()
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.write([op, request_id, arg, payload])
+        try:
+            return await future
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def receive(self, channel):
+        orphans = self.orphans.get(channel)
+        if orphans:
+            body = orphans.popleft()
+            if not orphans:
+                self.orphans.pop(channel, None)
+            return body
+        request_id = self._request_id()
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = (future, channel)
+        self.write(['receive', request_id, channel, None])
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if not self.closed:
+                self.write(['cancel', 0, channel, request_id])
+            raise
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def _read_loop(self):
+        try:
+            while True:
+                op, request_id, arg, body = await _read_frame(self.reader)
+                waiter = self.pending.get(request_id)
+                if op == 'msg':
+                    future = waiter[0] if waiter else None
+                    if future is None or future.done():
+                        self.orphans.setdefault(arg, deque()).append(body)
+                    else:
+                        future.set_result(body)
+                elif waiter is not None and not waiter.done():
+                    waiter.set_result(arg)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for waiter in list(self.pending.values()):
+            future = waiter[0] if isinstance(waiter, tuple) else waiter
+            if not future.done():
+                future.set_exception(ConnectionError('Channel hub connection lost.'))
+        self.pending.clear()
+        self.writer.close()
+
+
+class UnixSocketChannelLayer(BaseChannelLayer):
+    """
+    Channel layer для N процесів daphne на одному хості.
+
+    CONFIG:
+        path          - шлях до Unix socket hub-а;
+        embedded_hub  - дозволити процесу самому підняти hub (за замовчуванням True);
+        expiry, group_expiry, capacity, channel_capacity - як у InMemoryChannelLayer.
+    """
+
+    extensions = ['groups', 'flush']
+
+    def __init__(
+        self,
+        path=DEFAULT_SOCKET_PATH,
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        embedded_hub=True,
+        connect_timeout=5,
+        **kwargs,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity, **kwargs)
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.embedded_hub = embedded_hub
+        self.connect_timeout = connect_timeout
+        self.client_id = uuid.uuid4().hex[:12]
+        self.hub_config = {
+            'expiry': expiry,
+            'group_expiry': group_expiry,
+            'capacity': capacity,
+            'channel_capacity': channel_capacity,
+        }
+        self._connections = weakref.WeakKeyDictionary()
+        # Членство в групах, додане цим процесом; відновлюється після перезапуску hub-а
+        self._memberships = {}
+        self._hub_thread = None
+        self._hub_lock_fd = None
+
+    # Підключення
+
+    async def _start_embedded_hub(self, timeout):
+        """
+        Запускає hub у потоці цього процесу, якщо ніхто інший його не тримає.
+        Готовності сокета чекаємо в executor-і, а не threading.Event.wait()
+        просто в циклі подій - інакше процес daphne завмирав би до timeout.
+        """
+        if self._hub_thread is None or not self._hub_thread.is_alive():
+            fd = acquire_hub_lock(self.path)
+            if fd is None:
+                return False
+            self._hub_lock_fd = fd
+            self._hub_thread = _HubThread(ChannelHub(self.path, **self.hub_config))
+            self._hub_thread.start()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._hub_thread.ready.wait, max(timeout, 0))
+        return True
+
+    async def _open_connection(self):
+        deadline = time.monotonic() + self.connect_timeout
+        delay = 0.01
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if self.embedded_hub:
+                    await self._start_embedded_hub(deadline - time.monotonic())
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.25)
+        connection = _HubConnection(self, reader, writer)
+        connection.write(['hello', 0, self.client_id, None])
+        timeout = time.time() - self.group_expiry
+        for (group, channel), joined_at in list(self._memberships.items()):
+            if joined_at < timeout:
+                self._memberships.pop((group, channel), None)
+                continue
+            await connection.request('group_add', group, channel)
+        return connection
+
+    async def _connection(self):
+        loop = asyncio.get_running_loop()
+        connection = self._connections.get(loop)
+        if connection is None or connection.closed:
+            connection = await self._open_connection()
+            self._connections[loop] = connection
+        return connection
+
+    async def _request(self, op, arg=None, payload=None):
+        try:
+            connection = await self._connection()
+            return await connection.request(op, arg, payload)
+        except ConnectionError:
+            # Hub перезапустився - одна повторна спроба з новим підключенням
+            connection = await self._connection()
+            return await connection.request(op, arg, payload)
+
+    def _encode(self, message):
+        return [time.time() + self.expiry, msgpack.packb(message, use_bin_type=True)]
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), 'message is not a dict'
+        self.require_valid_channel_name(channel)
+        assert '__asgi_channel__' not in message
+        if not await self._request('send', channel, self._encode(message)):
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        while True:
+            connection = await self._connection()
+            try:
+                body = await connection.receive(channel)
+            except ConnectionError:
+                continue
+            return msgpack.unpackb(body, raw=False)
+
+    async def new_channel(self, prefix='specific.'):
+        return '%s.%s!%s' % (
+            prefix,
+            self.client_id,
+            ''.join(random.choice(string.ascii_letters) for _ in range(12)),
+        )
+
+    async def flush(self):
+        self._memberships.clear()
+        await self._request('flush')
+
+    async def close(self):
+        for connection in list(self._connections.values()):
+            connection.close()
+        self._connections.clear()
+
+    # Groups extension
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        self._memberships[(group, channel)] = time.time()
+        await self._request('group_add', group, channel)
+
+    async def group_discard(self, group, channel):
+        self.require_valid_channel_name(channel)
+        self.require_valid_group_name(group)
+        self._memberships.pop((group, channel), None)
+        await self._request('group_discard', group, channel)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), 'Message is not a dict'
+        self.require_valid_group_name(group)
+        await self._request('group_send', group, self._encode(message))
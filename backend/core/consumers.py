@@ -1,8 +1,16 @@
+import uuid
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
 
 from core.models import Board, Membership
+from core.services.frame_encoding import FrameTooLarge, InvalidFrame, decode_frame, frame_cache, normalize_encoding
+from core.services.presence import get_presence_registry
+from core.services.realtime import audience_groups, board_group, board_role_group, board_user_group, relay_audience
+
+HEARTBEAT_ACTION = "board/ws_heartbeat/fulfilled"
 
 
 def _is_valid_action_type(value):
@@ -16,30 +24,81 @@ def _is_valid_action_type(value):
 class BoardConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self):
         self.board_id = self.scope["url_route"]["kwargs"].get("board_id")
-        self.group_name = f"board_{self.board_id}"
+        self.group_name = board_group(self.board_id)
+        query = parse_qs(self.scope.get("query_string", b"").decode("utf-8"))
+        self.encoding = normalize_encoding(query.get("encoding", [None])[0])
 
         user = self.scope.get("user", AnonymousUser())
         if user.is_anonymous:
             await self.close()
             return
 
-        has_access = await self._user_has_access(user.id, self.board_id)
-        if not has_access:
+        role = await self._get_user_role(user.id, self.board_id)
+        if not role:
             await self.close()
             return
 
-        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        self.role_group_name = board_role_group(self.board_id, role)
+        self.user_group_name = board_user_group(self.board_id, user.id)
+        for group in self._joined_groups():
+            await self.channel_layer.group_add(group, self.channel_name)
         await self.accept()
 
+        presence = get_presence_registry()
+        await presence.join(self.board_id, user.id, self)
+        await self.send_json({
+            "type": "presence_state",
+            "board_id": self.board_id,
+            "user_ids": presence.snapshot(self.board_id),
+        })
+
     async def disconnect(self, close_code):
-        if hasattr(self, "group_name"):
-            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        for group in self._joined_groups():
+            await self.channel_layer.group_discard(group, self.channel_name)
+        if hasattr(self, "role_group_name"):
+            await get_presence_registry().leave(self.board_id, self.channel_name)
+
+    def _joined_groups(self):
+        return [
+            group for group in (
+                getattr(self, "group_name", None),
+                getattr(self, "role_group_name", None),
+                getattr(self, "user_group_name", None),
+            ) if group
+        ]
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        if text_data is None and bytes_data is None:
+            return
+        try:
+            content = decode_frame(text_data, bytes_data, self.encoding)
+        except FrameTooLarge:
+            # 1009 - Message Too Big (RFC 6455, 7.4.1)
+            await self.close(code=1009)
+            return
+        except InvalidFrame:
+            # 1007 - Invalid frame payload data
+            await self.close(code=1007)
+            return
+        await self.receive_json(content, **kwargs)
+
+    async def send_json(self, content, close=False, event_id=None):
+        """
+        Надсилає кадр у кодуванні, яке обрав клієнт. Для подій з event_id
+        кадр кодується один раз на процес і береться з кешу.
+        """
+        text_data, bytes_data = frame_cache.encode(content, self.encoding, event_id)
+        await self.send(text_data=text_data, bytes_data=bytes_data, close=close)
 
     async def receive_json(self, content, **kwargs):
         if not isinstance(content, dict):
             return
 
         msg_type = content.get("type")
+        if msg_type == "hello":
+            # Альтернатива ?encoding=: перше повідомлення {"type": "hello", "encoding": "..."}
+            self.encoding = normalize_encoding(content.get("encoding"))
+            return
         if msg_type != "board_updated":
             return
 
@@ -55,14 +114,33 @@ class BoardConsumer(AsyncJsonWebsocketConsumer):
         if user.is_anonymous:
             return
 
+        if action_type == HEARTBEAT_ACTION:
+            # Heartbeat лише оновлює присутність і повертається відправнику,
+            # без розсилки всій дошці.
+            await get_presence_registry().heartbeat(self.board_id, user.id, self.channel_name)
+            await self.send_json({
+                "type": "board_updated",
+                "action_type": action_type,
+                "payload": content.get("payload"),
+                "sender_id": user.id,
+                "board_id": self.board_id,
+            })
+            return
+
         payload = {
             "type": "board.broadcast",
+            "event_id": uuid.uuid4().hex,
             "action_type": action_type,
             "payload": content.get("payload"),
             "sender_id": user.id,
             "board_id": self.board_id,
         }
-        await self.channel_layer.group_send(self.group_name, payload)
+        # Події про приватні картки - лише адмінам і учасникам картки, як у серверних публікаторів
+        audience, user_ids = await database_sync_to_async(relay_audience)(self.board_id, action_type, content.get("payload"))
+        for group in audience_groups(self.board_id, audience):
+            await self.channel_layer.group_send(group, payload)
+        for user_id in user_ids:
+            await self.channel_layer.group_send(board_user_group(self.board_id, user_id), payload)
 
     async def board_broadcast(self, event):
         await self.send_json({
@@ -71,11 +149,29 @@ class BoardConsumer(AsyncJsonWebsocketConsumer):
             "payload": event.get("payload"),
             "sender_id": event.get("sender_id"),
             "board_id": event.get("board_id"),
-        })
+        }, event_id=event.get("event_id"))
+
+    async def send_presence(self, message, event_id=None):
+        await self.send_json(message, event_id=event_id)
+
+    async def board_role_changed(self, event):
+        next_group = board_role_group(self.board_id, event.get("role"))
+        if next_group == getattr(self, "role_group_name", None):
+            return
+        await self.channel_layer.group_discard(self.role_group_name, self.channel_name)
+        self.role_group_name = next_group
+        await self.channel_layer.group_add(self.role_group_name, self.channel_name)
+
+    async def board_member_removed(self, event):
+        await self.close()
 
     @database_sync_to_async
-    def _user_has_access(self, user_id, board_id):
+    def _get_user_role(self, user_id, board_id):
         if not board_id:
-            return False
-        return Board.objects.filter(id=board_id, owner_id=user_id).exists() or \
-            Membership.objects.filter(board_id=board_id, user_id=user_id).exists()
+            return None
+        owner_id = Board.objects.filter(id=board_id, pending_delete=False).values_list("owner_id", flat=True).first()
+        if owner_id is None:
+            return None
+        if owner_id == user_id:
+            return "owner"
+        return Membership.objects.filter(board_id=board_id, user_id=user_id).values_list("role", flat=True).first()
@@ -0,0 +1,76 @@
+"""
+Спільні утиліти для бенчмарк-команд (manage.py bench_*).
+"""
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+class Rollback(Exception):
+    """
+    Сигнал для відкату транзакції з тестовими даними бенчмарку.
+    """
+
+
+@contextmanager
+def rollback_after():
+    """
+    Виконує блок у транзакції, яку завжди відкочує, щоб бенчмарк
+    не залишав після себе сиди в робочій базі.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback()
+    except Rollback:
+        pass
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize_ms(samples):
+    """
+    Повертає p50/p95/p99/max у мілісекундах для списку тривалостей у секундах.
+    """
+    return {
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+class Stopwatch:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
+        return False
+
+
+def format_rows(rows, columns):
+    """
+    Простий текстовий рендер таблиці результатів.
+    """
+    widths = {
+        column: max(len(column), *(len(str(row.get(column, ''))) for row in rows)) if rows else len(column)
+        for column in columns
+    }
+    header = '  '.join(column.ljust(widths[column]) for column in columns)
+    lines = [header, '  '.join('-' * widths[column] for column in columns)]
+    for row in rows:
+        lines.append('  '.join(str(row.get(column, '')).ljust(widths[column]) for column in columns))
+    return '\n'.join(lines)
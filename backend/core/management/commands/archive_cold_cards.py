@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.services.cold_storage import DEFAULT_BATCH_SIZE, cold_candidates, freeze_cards
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносить архівні картки, старші за CARD_COLD_STORAGE_DAYS, разом з чек-листами, мітками, '
+        'учасниками та коментарями в холодне сховище (ArchivedCard) пачками (для періодичного запуску).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CARD_COLD_STORAGE_DAYS,
+                            help='Переносити картки, архівовані раніше ніж стільки днів тому.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--board', type=int, help='Лише одна дошка.')
+
+    def handle(self, *args, **options):
+        queryset = cold_candidates(options['days'], options['board']).order_by('id')
+        batch_size = max(1, options['batch_size'])
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(queryset.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            total += freeze_cards(ids)
+            last_id = ids[-1]
+            self.stdout.write(f'Moved {total} cards')
+        self.stdout.write(self.style.SUCCESS(f'Done: {total} cards moved to cold storage'))
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import tempfile
+import time
+
+from channels.layers import InMemoryChannelLayer
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.channel_layers import UnixSocketChannelLayer
+from core.management.benchmarking import format_rows, summarize_ms
+
+
+class Command(BaseCommand):
+    help = (
+        'Пропускна здатність і затримка channel layer-ів: InMemory, '
+        'UnixSocketChannelLayer та Redis (якщо заданий --redis-url / CHANNEL_REDIS_URL).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=5000, help='Кількість point-to-point повідомлень.')
+        parser.add_argument('--group-size', type=int, default=200, help='Кількість каналів у групі.')
+        parser.add_argument('--group-sends', type=int, default=50, help='Кількість group_send.')
+        parser.add_argument('--redis-url', default=getattr(settings, 'CHANNEL_REDIS_URL', None))
+
+    def handle(self, *args, **options):
+        rows = asyncio.run(self._run(options))
+        self.stdout.write(format_rows(rows, [
+            'layer', 'scenario', 'messages', 'msgs_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms',
+        ]))
+
+    async def _run(self, options):
+        capacity = max(options['messages'], options['group_sends']) + 10
+        rows = []
+
+        layer = InMemoryChannelLayer(capacity=capacity)
+        rows += await self._measure('inmemory', layer, layer, options)
+
+        path = os.path.join(tempfile.mkdtemp(prefix='boardly-bench-'), 'channels.sock')
+        sender = UnixSocketChannelLayer(path=path, capacity=capacity)
+        receiver = UnixSocketChannelLayer(path=path, capacity=capacity)
+        rows += await self._measure('unix-socket', sender, receiver, options)
+        await sender.close()
+        await receiver.close()
+
+        if options['redis_url']:
+            from channels_redis.core import RedisChannelLayer
+
+            sender = RedisChannelLayer(hosts=[options['redis_url']], capacity=capacity)
+            receiver = RedisChannelLayer(hosts=[options['redis_url']], capacity=capacity)
+            rows += await self._measure('redis', sender, receiver, options)
+            await sender.flush()
+        else:
+            self.stderr.write('Redis skipped: pass --redis-url or set CHANNEL_REDIS_URL.')
+        return rows
+
+    async def _measure(self, name, sender, receiver, options):
+        return [
+            await self._point_to_point(name, sender, receiver, options['messages']),
+            await self._fan_out(name, sender, receiver, options['group_size'], options['group_sends']),
+        ]
+
+    async def _point_to_point(self, name, sender, receiver, count):
+        channel = await receiver.new_channel()
+        latencies = []
+
+        async def consume():
+            for _ in range(count):
+                message = await receiver.receive(channel)
+                latencies.append(time.perf_counter() - message['sent_at'])
+
+        consumer = asyncio.create_task(consume())
+        started = time.perf_counter()
+        for index in range(count):
+            await sender.send(channel, {'type': 'bench', 'index': index, 'sent_at': time.perf_counter()})
+        await consumer
+        elapsed = time.perf_counter() - started
+        return self._row(name, 'send/receive', count, elapsed, latencies)
+
+    async def _fan_out(self, name, sender, receiver, group_size, sends):
+        group = f'bench_{name.replace("-", "_")}'
+        channels = [await receiver.new_channel() for _ in range(group_size)]
+        for channel in channels:
+            await receiver.group_add(group, channel)
+        latencies = []
+
+        async def consume(channel):
+            for _ in range(sends):
+                message = await receiver.receive(channel)
+                latencies.append(time.perf_counter() - message['sent_at'])
+
+        consumers = [asyncio.create_task(consume(channel)) for channel in channels]
+        started = time.perf_counter()
+        for index in range(sends):
+            await sender.group_send(group, {'type': 'bench', 'index': index, 'sent_at': time.perf_counter()})
+        await asyncio.gather(*consumers)
+        elapsed = time.perf_counter() - started
+        for channel in channels:
+            await receiver.group_discard(group, channel)
+        return self._row(name, f'group_send x{group_size}', group_size * sends, elapsed, latencies)
+
+    def _row(self, name, scenario, messages, elapsed, latencies):
+        return {
+            'layer': name,
+            'scenario': scenario,
+            'messages': messages,
+            'msgs_per_sec': int(messages / elapsed) if elapsed else 0,
+            **summarize_ms(latencies),
+        }
@@ -0,0 +1,101 @@
+import asyncio
+import random
+import time
+
+from channels.layers import InMemoryChannelLayer
+from django.core.management.base import BaseCommand
+
+from core.management.benchmarking import format_rows
+from core.services.realtime import ROLE_GROUPS, audience_groups, board_group, board_role_group
+
+
+class Command(BaseCommand):
+    help = (
+        'Порівнює розсилку подій дошки через рольові групи з наївною '
+        'фільтрацією на кожному сокеті (InMemoryChannelLayer, без мережі).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sockets', type=int, default=1000)
+        parser.add_argument('--events', type=int, default=200)
+        parser.add_argument('--private-ratio', type=float, default=0.5,
+                            help='Частка подій по приватних картках (лише для адмінів).')
+        parser.add_argument('--roles', default='0.1,0.3,0.6',
+                            help='Частки admin,developer,viewer серед сокетів.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rows = asyncio.run(self._run(options))
+        self.stdout.write(format_rows(rows, [
+            'strategy', 'events', 'deliveries', 'dropped_by_filter', 'total_ms', 'per_event_ms',
+        ]))
+
+    async def _run(self, options):
+        rng = random.Random(options['seed'])
+        weights = [float(value) for value in options['roles'].split(',')]
+        roles = rng.choices(ROLE_GROUPS, weights=weights, k=options['sockets'])
+        events = [
+            'admins' if rng.random() < options['private_ratio'] else 'all'
+            for _ in range(options['events'])
+        ]
+        return [
+            await self._naive(roles, events),
+            await self._partitioned(roles, events),
+        ]
+
+    async def _setup(self, roles):
+        layer = InMemoryChannelLayer(capacity=len(roles) + 10)
+        sockets = []
+        for role in roles:
+            channel = await layer.new_channel()
+            await layer.group_add(board_group(1), channel)
+            await layer.group_add(board_role_group(1, role), channel)
+            sockets.append((channel, role))
+        return layer, sockets
+
+    async def _drain(self, layer, channels):
+        received = []
+        for channel in channels:
+            received.append(await layer.receive(channel))
+        return received
+
+    async def _naive(self, roles, events):
+        layer, sockets = await self._setup(roles)
+        deliveries = dropped = 0
+        started = time.perf_counter()
+        for audience in events:
+            await layer.group_send(board_group(1), {'type': 'board.broadcast', 'audience': audience})
+            messages = await self._drain(layer, [channel for channel, _ in sockets])
+            for (_, role), message in zip(sockets, messages):
+                deliveries += 1
+                # Кожен сокет сам вирішує, чи може бачити подію
+                if message['audience'] == 'admins' and role != 'admin':
+                    dropped += 1
+        elapsed = time.perf_counter() - started
+        return self._row('per-socket filter', events, deliveries, dropped, elapsed)
+
+    async def _partitioned(self, roles, events):
+        layer, sockets = await self._setup(roles)
+        members = {}
+        for channel, role in sockets:
+            members.setdefault(board_role_group(1, role), []).append(channel)
+        members[board_group(1)] = [channel for channel, _ in sockets]
+        deliveries = 0
+        started = time.perf_counter()
+        for audience in events:
+            for group in audience_groups(1, audience):
+                await layer.group_send(group, {'type': 'board.broadcast', 'audience': audience})
+                messages = await self._drain(layer, members.get(group, []))
+                deliveries += len(messages)
+        elapsed = time.perf_counter() - started
+        return self._row('role groups', events, deliveries, 0, elapsed)
+
+    def _row(self, strategy, events, deliveries, dropped, elapsed):
+        return {
+            'strategy': strategy,
+            'events': len(events),
+            'deliveries': deliveries,
+            'dropped_by_filter': dropped,
+            'total_ms': round(elapsed * 1000, 1),
+            'per_event_ms': round(elapsed * 1000 / max(1, len(events)), 3),
+        }
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from core.management.benchmarking import Stopwatch, format_rows, rollback_after
+from core.models import Board, Card, List, Membership
+from core.services.list_actions import archive_all_cards, move_all_cards, sort_cards_by_due
+from core.services.ordering import key_between, spread_keys
+
+BENCH_PREFIX = 'bench_list_actions_'
+
+
+def per_card_move_all(user, source, target):
+    """
+    Як клієнт до появи дій над списком: окремий UPDATE на кожну картку.
+    """
+    last = Card.objects.filter(list=target, is_archived=False).order_by('-position').values_list('position', flat=True).first()
+    for card_id in Card.objects.filter(list=source, is_archived=False).values_list('id', flat=True):
+        last = key_between(last, None)
+        Card.objects.filter(id=card_id).update(list=target, position=last, version=F('version') + 1)
+
+
+def per_card_archive_all(user, source):
+    for card_id in Card.objects.filter(list=source, is_archived=False).values_list('id', flat=True):
+        Card.objects.filter(id=card_id).update(is_archived=True, version=F('version') + 1)
+
+
+def per_card_sort(user, source):
+    ordered = Card.objects.filter(list=source, is_archived=False).order_by(F('due_date').asc(nulls_last=True), 'position')
+    ids = list(ordered.values_list('id', flat=True))
+    for card_id, key in zip(ids, spread_keys(len(ids))):
+        Card.objects.filter(id=card_id).update(position=key, version=F('version') + 1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Дії над усім списком (move-all, archive-all, sort за терміном) на списку з тисячами карток: '
+        'окремий UPDATE на картку проти одного set-based запису. Дані сидяться в транзакції, що відкочується.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = options['cards']
+        actions = [
+            ('move_all', per_card_move_all, lambda user, source, target: move_all_cards(user, source, target.id)),
+            ('archive_all', lambda user, source, target: per_card_archive_all(user, source),
+             lambda user, source, target: archive_all_cards(user, source)),
+            ('sort_by_due', lambda user, source, target: per_card_sort(user, source),
+             lambda user, source, target: sort_cards_by_due(user, source)),
+        ]
+        rows = []
+        for name, legacy, bulk in actions:
+            for mode, run in (('per-card', legacy), ('set-based', bulk)):
+                with rollback_after():
+                    user, source, target = self._seed(count)
+                    statements = []
+                    with connection.execute_wrapper(lambda execute, sql, *rest: statements.append(sql) or execute(sql, *rest)):
+                        with Stopwatch() as timer:
+                            run(user, source, target)
+                    rows.append({
+                        'action': name,
+                        'mode': mode,
+                        'cards': count,
+                        'ms': round(timer.elapsed * 1000, 1),
+                        'statements': len(statements),
+                    })
+        self.stdout.write(format_rows(rows, ['action', 'mode', 'cards', 'ms', 'statements']))
+
+    def _seed(self, count):
+        user = User.objects.create(username=f'{BENCH_PREFIX}owner', password='!')
+        board = Board.objects.create(title=f'{BENCH_PREFIX}board', owner=user)
+        Membership.objects.create(board=board, user=user, role='admin')
+        source, target = List.objects.bulk_create([
+            List(board=board, title='Source', position='a'),
+            List(board=board, title='Target', position='b'),
+        ])
+        now = timezone.now()
+        Card.objects.bulk_create([
+            Card(list=source, title=f'Card {index}', position=key,
+                 due_date=None if index % 5 == 0 else now + timedelta(hours=(index * 7919) % count))
+            for index, key in enumerate(spread_keys(count))
+        ], batch_size=1000)
+        return user, source, target
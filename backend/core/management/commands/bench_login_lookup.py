@@ -0,0 +1,79 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from core.management.benchmarking import Stopwatch, format_rows, rollback_after, summarize_ms
+from core.services.user_lookup import email_matches, find_user_by_login, username_matches, users_with_lower_logins
+
+BENCH_PREFIX = 'bench_login_'
+
+
+def legacy_lookup(login):
+    return User.objects.filter(Q(username__iexact=login) | Q(email__iexact=login)).order_by('id').first()
+
+
+class Command(BaseCommand):
+    help = (
+        'Пошук користувача при логіні: iexact проти LOWER(...) = LOWER(%s) по функціональних індексах. '
+        'Сидить N користувачів у транзакції, яка відкочується, і показує EXPLAIN обох запитів.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000_000)
+        parser.add_argument('--lookups', type=int, default=500)
+        parser.add_argument('--legacy-lookups', type=int, default=20,
+                            help='Старий запит сканує таблицю, тому вимірюється менше разів.')
+        parser.add_argument('--batch-size', type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        with rollback_after():
+            with Stopwatch() as seeding:
+                self._seed(options['users'], options['batch_size'])
+            self.stdout.write(f'Seeded {options["users"]} users in {seeding.elapsed:.1f}s')
+            if connection.vendor in ('sqlite', 'postgresql'):
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+            sample = 'Bench_Login_42@Example.com'
+            self.stdout.write('\nEXPLAIN legacy (iexact):')
+            self.stdout.write(User.objects.filter(Q(username__iexact=sample) | Q(email__iexact=sample)).explain())
+            self.stdout.write('\nEXPLAIN functional index (LOWER = LOWER):')
+            self.stdout.write(
+                users_with_lower_logins().filter(username_matches(sample) | email_matches(sample)).explain()
+            )
+
+            rng = random.Random(1)
+            rows = [
+                self._measure('legacy iexact', legacy_lookup, options['legacy_lookups'], options['users'], rng),
+                self._measure('lower() index', find_user_by_login, options['lookups'], options['users'], rng),
+            ]
+            self.stdout.write('')
+            self.stdout.write(format_rows(rows, ['query', 'lookups', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']))
+
+    def _seed(self, count, batch_size):
+        # Хеш пароля не потрібен для пошуку - беремо непридатний, щоб сидинг був швидким
+        for start in range(0, count, batch_size):
+            User.objects.bulk_create([
+                User(
+                    username=f'{BENCH_PREFIX}{index}',
+                    email=f'{BENCH_PREFIX}{index}@example.com',
+                    password='!',
+                )
+                for index in range(start, min(count, start + batch_size))
+            ], batch_size=batch_size)
+
+    def _measure(self, name, lookup, count, users, rng):
+        samples = []
+        for _ in range(count):
+            index = rng.randrange(users)
+            login = rng.choice([f'{BENCH_PREFIX.upper()}{index}', f'{BENCH_PREFIX}{index}@EXAMPLE.com'])
+            started = time.perf_counter()
+            found = lookup(login)
+            samples.append(time.perf_counter() - started)
+            if found is None:
+                raise RuntimeError(f'{name}: user {login} not found')
+        return {'query': name, 'lookups': count, **summarize_ms(samples)}
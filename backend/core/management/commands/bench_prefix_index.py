@@ -0,0 +1,63 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.management.benchmarking import Stopwatch, format_rows, summarize_ms
+from core.services.prefix_index import UserPrefixIndex
+
+WORDS = (
+    'release', 'notes', 'mobile', 'landing', 'payment', 'invoice', 'onboarding', 'design', 'review',
+    'backend', 'frontend', 'migration', 'search', 'calendar', 'export', 'import', 'bug', 'crash',
+    'реліз', 'оплата', 'дизайн', 'перевірка', 'звіт', 'клієнт', 'договір', 'тестування',
+)
+
+
+class Command(BaseCommand):
+    help = "Побудова, пошук і оновлення префіксного індексу autocomplete на синтетичних даних (без БД)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, nargs='+', default=[1000, 10000, 50000])
+        parser.add_argument('--lookups', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rows = [self._measure(count, options['lookups'], random.Random(options['seed'])) for count in options['cards']]
+        self.stdout.write(format_rows(rows, [
+            'cards', 'build_ms', 'lookup_p50_ms', 'lookup_p99_ms', 'upsert_p50_ms', 'upsert_p99_ms',
+        ]))
+
+    def _title(self, rng):
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + f' {rng.randint(1, 999)}'
+
+    def _measure(self, count, lookups, rng):
+        boards = [(board_id, self._title(rng)) for board_id in range(1, 51)]
+        lists = [(list_id, self._title(rng), rng.randint(1, 50)) for list_id in range(1, 501)]
+        cards = [(card_id, self._title(rng), rng.randint(1, 500), rng.randint(1, 50)) for card_id in range(1, count + 1)]
+        with Stopwatch() as build:
+            index = UserPrefixIndex.from_rows(boards, lists, cards)
+
+        lookup_samples = []
+        for _ in range(lookups):
+            word = rng.choice(WORDS)
+            prefix = word[:rng.randint(1, len(word))]
+            started = time.perf_counter()
+            index.search(prefix, 10)
+            lookup_samples.append(time.perf_counter() - started)
+
+        upsert_samples = []
+        for _ in range(lookups):
+            card_id = rng.randint(1, count)
+            started = time.perf_counter()
+            index.upsert('card', card_id, self._title(rng), rng.randint(1, 50), rng.randint(1, 500))
+            upsert_samples.append(time.perf_counter() - started)
+
+        lookup, upsert = summarize_ms(lookup_samples), summarize_ms(upsert_samples)
+        return {
+            'cards': count,
+            'build_ms': round(build.elapsed * 1000, 1),
+            'lookup_p50_ms': lookup['p50_ms'],
+            'lookup_p99_ms': lookup['p99_ms'],
+            'upsert_p50_ms': upsert['p50_ms'],
+            'upsert_p99_ms': upsert['p99_ms'],
+        }
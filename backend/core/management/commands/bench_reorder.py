@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection, transaction
+
+from core.management.benchmarking import Stopwatch, format_rows, summarize_ms
+from core.models import Board, Card, List
+from core.services.ordering import PositionConflict, spread_keys
+from core.services.versioning import move_to_index
+
+BENCH_PREFIX = 'bench_reorder_'
+
+
+def legacy_move(obj, index):
+    """
+    Старий шлях для порівняння: блокування всіх активних сусідів
+    (select_for_update) і перенумерація контейнера.
+    """
+    model = type(obj)
+    container = {'list_id': obj.list_id} if model is Card else {'board_id': obj.board_id}
+    with transaction.atomic():
+        items = list(model.objects.select_for_update().filter(**container, is_archived=False).order_by('position', 'id'))
+        ids = [item.id for item in items if item.id != obj.id]
+        ids.insert(max(0, min(len(ids), index - 1)), obj.id)
+        by_id = {item.id: item for item in items}
+        for item_id, key in zip(ids, spread_keys(len(ids))):
+            by_id[item_id].position = key
+        model.objects.bulk_update(items, ['position'])
+
+
+class Command(BaseCommand):
+    help = (
+        'Конкурентні переміщення на одній дошці: N потоків одночасно перетягують картки і списки. '
+        'Порівнює умовні UPDATE за версією (optimistic) зі старим select_for_update + перенумерацією (locked). '
+        'Створює тимчасову дошку bench_reorder_* у налаштованій БД і видаляє її після прогону.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--movers', type=int, default=16, help='Кількість одночасних потоків.')
+        parser.add_argument('--moves', type=int, default=50, help='Переміщень на потік.')
+        parser.add_argument('--lists', type=int, default=8)
+        parser.add_argument('--cards', type=int, default=40, help='Карток у кожному списку.')
+        parser.add_argument('--list-share', type=float, default=0.2, help='Частка переміщень списків.')
+        parser.add_argument('--mode', default='both', choices=['optimistic', 'locked', 'both'])
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                'SQLite serializes all writers and ignores select_for_update; run against Postgres for representative numbers.'
+            ))
+        modes = ['optimistic', 'locked'] if options['mode'] == 'both' else [options['mode']]
+        rows = []
+        for mode in modes:
+            board = self._create_fixtures(options['lists'], options['cards'])
+            try:
+                rows.append(self._run(mode, board, options))
+                rows[-1]['tied_keys'] = self._tied_keys(board)
+            finally:
+                self._delete_fixtures()
+        self.stdout.write(format_rows(rows, [
+            'mode', 'moves', 'moves_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'conflicts', 'errors', 'tied_keys',
+        ]))
+
+    def _create_fixtures(self, lists, cards):
+        owner = User.objects.create(username=f'{BENCH_PREFIX}owner', password='!')
+        board = Board.objects.create(title=f'{BENCH_PREFIX}board', owner=owner)
+        created = List.objects.bulk_create([
+            List(board=board, title=f'List {index}', position=key)
+            for index, key in enumerate(spread_keys(lists))
+        ])
+        card_keys = spread_keys(cards)
+        Card.objects.bulk_create([
+            Card(list=list_obj, title=f'Card {list_obj.id}-{index}', position=key)
+            for list_obj in created
+            for index, key in enumerate(card_keys)
+        ], batch_size=1000)
+        return board
+
+    def _delete_fixtures(self):
+        Board.objects.filter(title__startswith=BENCH_PREFIX).delete()
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+
+    def _run(self, mode, board, options):
+        list_ids = list(List.objects.filter(board=board).values_list('id', flat=True))
+        card_ids = list(Card.objects.filter(list__board=board).values_list('id', flat=True))
+        samples, counters, lock = [], {'conflicts': 0, 'errors': 0}, threading.Lock()
+        start = threading.Barrier(options['movers'])
+
+        def mover(seed):
+            rng = random.Random(seed)
+            local_samples, conflicts, errors = [], 0, 0
+            close_old_connections()
+            try:
+                start.wait()
+                for _ in range(options['moves']):
+                    moving_list = rng.random() < options['list_share']
+                    started = time.perf_counter()
+                    try:
+                        # Як у API: спершу читання рядка, потім переміщення
+                        if moving_list:
+                            obj = List.objects.get(id=rng.choice(list_ids))
+                            index, target = rng.randint(1, len(list_ids)), None
+                        else:
+                            obj = Card.objects.get(id=rng.choice(card_ids))
+                            index, target = rng.randint(1, options['cards']), List(id=rng.choice(list_ids), board_id=board.id)
+                        if mode == 'optimistic':
+                            move_to_index(obj, index, target)
+                        else:
+                            if target is not None:
+                                Card.objects.filter(id=obj.id).update(list_id=target.id)
+                                obj.list_id = target.id
+                            legacy_move(obj, index)
+                    except PositionConflict:
+                        conflicts += 1
+                    except OperationalError:
+                        errors += 1
+                    local_samples.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+            with lock:
+                samples.extend(local_samples)
+                counters['conflicts'] += conflicts
+                counters['errors'] += errors
+
+        threads = [threading.Thread(target=mover, args=(options['seed'] + index,)) for index in range(options['movers'])]
+        with Stopwatch() as wall:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return {
+            'mode': mode,
+            'moves': len(samples),
+            'moves_per_sec': round(len(samples) / wall.elapsed, 1) if wall.elapsed else 0,
+            **summarize_ms(samples),
+            **counters,
+        }
+
+    def _tied_keys(self, board):
+        """
+        Однакові ключі в одному контейнері (одночасні вставки в один проміжок) - їх розводить rebalance.
+        """
+        tied = 0
+        for model, field, queryset in (
+            (Card, 'list_id', Card.objects.filter(list__board=board)),
+            (List, 'board_id', List.objects.filter(board=board)),
+        ):
+            seen = set()
+            for container_id, position in queryset.values_list(field, 'position'):
+                if (container_id, position) in seen:
+                    tied += 1
+                seen.add((container_id, position))
+        return tied
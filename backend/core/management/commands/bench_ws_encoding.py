@@ -0,0 +1,77 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from core.management.benchmarking import format_rows
+from core.services.frame_encoding import ENCODINGS, FrameCache, encode_frame
+
+
+def _sample_card(index):
+    return {
+        'id': index,
+        'title': f'Card {index}: prepare release notes for the mobile overlays',
+        'description': 'Collect QA findings, group them by screen and attach screenshots. ' * 3,
+        'card_color': '#4f46e5',
+        'cover_size': 'full',
+        'order': index + 1,
+        'due_date': '2026-10-18T12:00:00+03:00',
+        'is_completed': False,
+        'is_archived': False,
+        'is_public': True,
+        'list': 7,
+        'board': 3,
+        'board_title': 'Mobile release',
+        'members': [{'id': 1, 'username': 'owner', 'first_name': 'Owner', 'last_name': 'User'}],
+        'labels': [{'id': 2, 'name': 'QA', 'color': '#16a34a'}],
+        'checklists': [{'id': index, 'title': 'Чек-лист', 'items': []}],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Розмір кадрів та CPU на розсилку однієї події дошки для кожного WebSocket-кодування.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=1000)
+        parser.add_argument('--cards', type=int, nargs='+', default=[1, 20, 200],
+                            help='Кількість карток у payload (імітація bulk-редагування).')
+
+    def handle(self, *args, **options):
+        recipients = options['recipients']
+        rows = []
+        for cards in options['cards']:
+            frame = {
+                'type': 'board_updated',
+                'action_type': 'board/updateList/fulfilled',
+                'payload': {'id': 7, 'cards': [_sample_card(index) for index in range(cards)]},
+                'sender_id': 1,
+                'board_id': 3,
+            }
+            for encoding in ENCODINGS:
+                text_data, bytes_data = encode_frame(frame, encoding)
+                frame_bytes = len(text_data.encode('utf-8')) if text_data is not None else len(bytes_data)
+
+                started = time.perf_counter()
+                for _ in range(recipients):
+                    encode_frame(frame, encoding)
+                naive = time.perf_counter() - started
+
+                cache = FrameCache()
+                event_id = uuid.uuid4().hex
+                started = time.perf_counter()
+                for _ in range(recipients):
+                    cache.encode(frame, encoding, event_id)
+                cached = time.perf_counter() - started
+
+                rows.append({
+                    'cards': cards,
+                    'encoding': encoding,
+                    'frame_bytes': frame_bytes,
+                    f'wire_kb_per_{recipients}': round(frame_bytes * recipients / 1024, 1),
+                    'cpu_ms_per_recipient_encode': round(naive * 1000, 2),
+                    'cpu_ms_encode_once': round(cached * 1000, 2),
+                })
+        self.stdout.write(format_rows(rows, [
+            'cards', 'encoding', 'frame_bytes', f'wire_kb_per_{recipients}',
+            'cpu_ms_per_recipient_encode', 'cpu_ms_encode_once',
+        ]))
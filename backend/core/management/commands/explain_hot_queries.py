@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from core.management.benchmarking import Stopwatch, format_rows, rollback_after, summarize_ms
+from core.models import Activity, ActivityLog, Board, Card, Comment, List, Membership
+from core.services.calendar import due_cards
+
+BENCH_PREFIX = 'explain_hot_queries_'
+
+# Індекси міграції 0034_hot_query_indexes: "до" - план без них
+HOT_INDEXES = (
+    'core_card_active_pos_idx',
+    'core_card_due_idx',
+    'core_card_archived_idx',
+    'core_activity_board_ts_idx',
+    'core_actlog_user_created_idx',
+    'core_comment_card_created_idx',
+    'core_member_favorite_idx',
+    'core_member_board_role_idx',
+)
+
+
+def hot_queries(seed):
+    """
+    (назва, queryset) у тій формі, в якій їх будують в'юхи та сервіси.
+    """
+    now = seed['now']
+    return [
+        ('list_active_cards', Card.objects.filter(list_id=seed['list'].id, is_archived=False).order_by('position', 'id')),
+        ('board_activity_feed', Activity.objects.filter(board_id=seed['board'].id).order_by('-timestamp')[:50]),
+        ('user_log_feed', ActivityLog.objects.filter(user_id=seed['user'].id).order_by('-created_at')[:50]),
+        ('user_log_retention', ActivityLog.objects.filter(user_id=seed['user'].id, created_at__lt=now - timedelta(days=60))),
+        ('favorite_boards', Membership.objects.filter(user_id=seed['user'].id, is_favorite=True)),
+        ('board_admins', Membership.objects.filter(board_id=seed['board'].id, role='admin')),
+        ('card_comments', Comment.objects.filter(card_id=seed['card'].id).order_by('created_at')),
+        ('calendar_due_range', due_cards(
+            seed['user'], now, now + timedelta(days=7), [seed['board'].id], {seed['board'].id},
+        )),
+        ('cold_candidates', Card.objects.filter(
+            is_archived=True, archived_at__lt=now - timedelta(days=30),
+        ).order_by('id').values_list('id', flat=True)[:500]),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN гарячих запитів (картки списку, стрічки активності, обрані, адміни, коментарі, календар, '
+        'холодний архів) до і після індексів 0034_hot_query_indexes на засіяних даних. '
+        'Індекси видаляються й дані сидяться в транзакції, що відкочується.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=20000)
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--plans', action='store_true', help='Друкувати повні плани.')
+
+    def handle(self, *args, **options):
+        runs = max(1, options['runs'])
+        rows = []
+        with rollback_after():
+            seed = self._seed(max(100, options['cards']))
+            after = self._capture(seed, runs)
+            with connection.cursor() as cursor:
+                for name in HOT_INDEXES:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+            self._analyze()
+            before = self._capture(seed, runs)
+
+        for name, (plan_after, ms_after) in after.items():
+            plan_before, ms_before = before[name]
+            rows.append({
+                'query': name,
+                'before_ms': ms_before,
+                'after_ms': ms_after,
+                'index': next((index for index in HOT_INDEXES if index in plan_after), '-'),
+            })
+            if options['plans']:
+                self.stdout.write(f'== {name}\n-- before\n{plan_before}\n-- after\n{plan_after}\n')
+        self.stdout.write(format_rows(rows, ['query', 'before_ms', 'after_ms', 'index']))
+
+    def _capture(self, seed, runs):
+        captured = {}
+        for name, queryset in hot_queries(seed):
+            plan = queryset.explain()
+            samples = []
+            for _ in range(runs):
+                with Stopwatch() as timer:
+                    list(queryset.all())
+                samples.append(timer.elapsed)
+            captured[name] = (plan, summarize_ms(samples)['p50_ms'])
+        return captured
+
+    def _analyze(self):
+        # Статистика для планувальника: без неї SQLite/Postgres можуть ігнорувати індекси
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _seed(self, count):
+        """
+        20 дошок по 10 списків, кожна десята картка архівна, а термін має кожна третя;
+        200 учасників на кожній дошці, обрані дошки, записів активності й коментарів.
+        """
+        now = timezone.now()
+        users = User.objects.bulk_create([
+            User(username=f'{BENCH_PREFIX}{index}', password='!') for index in range(200)
+        ])
+        user = users[0]
+        boards = Board.objects.bulk_create([
+            Board(title=f'{BENCH_PREFIX}board {index}', owner=user) for index in range(20)
+        ])
+        board = boards[0]
+        Membership.objects.bulk_create([
+            Membership(
+                board=item, user=member, role='admin' if index % 10 == 0 else 'developer',
+                is_favorite=index % 7 == 0,
+            )
+            for item in boards for index, member in enumerate(users)
+        ], batch_size=1000)
+        lists = List.objects.bulk_create([
+            List(board=item, title=f'List {index}', position=f'a{index:03d}')
+            for item in boards for index in range(10)
+        ])
+        Card.objects.bulk_create([
+            Card(
+                list=lists[index % len(lists)], title=f'Card {index}', position=f'a{index:07d}',
+                is_archived=index % 10 == 1,
+                archived_at=now - timedelta(days=index % 90) if index % 10 == 1 else None,
+                due_date=now + timedelta(hours=index % 2000 - 1000) if index % 3 == 0 else None,
+            )
+            for index in range(count)
+        ], batch_size=1000)
+        card = Card.objects.filter(list=lists[0], is_archived=False).order_by('id').first()
+        cards = list(Card.objects.filter(list__board__in=boards).values_list('id', flat=True)[:200])
+        Comment.objects.bulk_create([
+            Comment(card_id=cards[index % len(cards)], author=users[index % len(users)], text=f'Comment {index}')
+            for index in range(count // 2)
+        ] + [Comment(card=card, author=user, text=f'Own {index}') for index in range(20)], batch_size=1000)
+        activities = Activity.objects.bulk_create([
+            Activity(board=boards[index % len(boards)], user=users[index % len(users)],
+                     action_type='UPDATE_CARD', action_text=f'Card {index}')
+            for index in range(count)
+        ], batch_size=1000)
+        logs = ActivityLog.objects.bulk_create([
+            ActivityLog(user=users[index % len(users)], action='update_card', entity_type='card', entity_id=index)
+            for index in range(count)
+        ], batch_size=1000)
+        # timestamp/created_at - auto_now_add: розносимо записи в часі окремим bulk_update
+        for index, (activity, log) in enumerate(zip(activities, logs)):
+            activity.timestamp = log.created_at = now - timedelta(hours=index % 2880)
+        Activity.objects.bulk_update(activities, ['timestamp'], batch_size=1000)
+        ActivityLog.objects.bulk_update(logs, ['created_at'], batch_size=1000)
+        self._analyze()
+        return {'now': now, 'user': user, 'board': board, 'list': lists[0], 'card': card}
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import os
+import random
+import resource
+import time
+import uuid
+from pathlib import Path
+
+import msgpack
+from channels.layers import InMemoryChannelLayer, channel_layers
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from core.management.benchmarking import format_rows, summarize_ms
+from core.models import Board, Membership
+from core.services.frame_encoding import decode_frame
+
+LOADTEST_PREFIX = 'loadtest_'
+LOADTEST_ACTION = 'board/loadtest/fulfilled'
+
+COMPARED_METRICS = (
+    'connect_p50_ms', 'connect_p95_ms', 'connect_p99_ms',
+    'fanout_p50_ms', 'fanout_p95_ms', 'fanout_p99_ms',
+    'sent_per_sec', 'delivered_per_sec', 'rss_kb_per_socket', 'connect_failures',
+)
+
+
+def current_rss_kb():
+    """
+    Поточний RSS процесу; поза Linux - пікове значення з getrusage.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Command(BaseCommand):
+    help = (
+        'Навантажувальний тест BoardConsumer: відкриває N автентифікованих сокетів '
+        'на M дошках прямо проти boardly_project.asgi (InMemoryChannelLayer) '
+        'і вимірює затримку підключення, fan-out, повідомлення/с та RSS на сокет. '
+        'Створює тимчасових користувачів loadtest_<run>_* у налаштованій БД і видаляє після прогону '
+        'лише створені ним рядки. Поза DEBUG потрібен --allow-db.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sockets', type=int, default=200)
+        parser.add_argument('--boards', type=int, default=10)
+        parser.add_argument('--rate', type=float, default=50.0, help='Повідомлень за секунду (сумарно по всіх сокетах).')
+        parser.add_argument('--duration', type=float, default=10.0, help='Тривалість фази навантаження, с.')
+        parser.add_argument('--payload-bytes', type=int, default=256)
+        parser.add_argument('--encoding', default='json', choices=['json', 'msgpack', 'deflate'])
+        parser.add_argument('--connect-concurrency', type=int, default=50)
+        parser.add_argument('--capacity', type=int, default=1000, help='Ємність каналів InMemoryChannelLayer.')
+        parser.add_argument('--output', help='Зберегти результати у JSON-файл.')
+        parser.add_argument('--compare', help='JSON з попереднього прогону для порівняння.')
+        parser.add_argument('--keep-data', action='store_true', help='Не видаляти тестових користувачів і дошки.')
+        parser.add_argument('--allow-db', action='store_true', help='Дозволити запис у БД при DEBUG=False.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['allow_db']:
+            raise CommandError('loadtest_ws writes users and boards to the configured database; pass --allow-db.')
+        channel_layers.set('default', InMemoryChannelLayer(capacity=options['capacity']))
+        fixtures, created = self._create_fixtures(options['sockets'], options['boards'])
+        try:
+            results = asyncio.run(self._run(fixtures, options))
+        finally:
+            if not options['keep_data']:
+                self._delete_fixtures(created)
+
+        self.stdout.write(format_rows([results], ['sockets', 'boards'] + list(COMPARED_METRICS)))
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f'Results written to {options["output"]}')
+        if options['compare']:
+            previous = json.loads(Path(options['compare']).read_text())
+            self.stdout.write(format_rows(self._compare(previous, results), ['metric', 'previous', 'current', 'change']))
+
+    # Фікстури
+
+    def _create_fixtures(self, sockets, boards):
+        """
+        Повертає (фікстури сокетів, (id користувачів, id дошок)). Префікс
+        прогону унікальний, тож чужі рядки з loadtest_ у назві не зачіпаються.
+        """
+        prefix = f'{LOADTEST_PREFIX}{uuid.uuid4().hex[:8]}_'
+        users = User.objects.bulk_create([
+            User(username=f'{prefix}{index}', email=f'{prefix}{index}@example.com')
+            for index in range(sockets)
+        ])
+        if users and users[0].pk is None:
+            users = list(User.objects.filter(username__startswith=prefix).order_by('id'))
+        board_objs = Board.objects.bulk_create([
+            Board(title=f'{prefix}board_{index}', owner=users[index % len(users)])
+            for index in range(boards)
+        ])
+        if board_objs and board_objs[0].pk is None:
+            board_objs = list(Board.objects.filter(title__startswith=prefix).order_by('id'))
+        Membership.objects.bulk_create([
+            Membership(user=user, board=board_objs[index % len(board_objs)], role='developer')
+            for index, user in enumerate(users)
+        ], ignore_conflicts=True)
+        tokens = Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users])
+        fixtures = [
+            {'token': token.key, 'board_id': board_objs[index % len(board_objs)].id, 'user_id': token.user_id}
+            for index, token in enumerate(tokens)
+        ]
+        return fixtures, ([user.id for user in users], [board.id for board in board_objs])
+
+    def _delete_fixtures(self, created):
+        user_ids, board_ids = created
+        Board.objects.filter(id__in=board_ids).delete()
+        User.objects.filter(id__in=user_ids).delete()
+
+    # Прогін
+
+    async def _run(self, fixtures, options):
+        from boardly_project.asgi import application
+
+        rng = random.Random(options['seed'])
+        encoding = options['encoding']
+        semaphore = asyncio.Semaphore(options['connect_concurrency'])
+        connect_latencies = []
+        failures = 0
+
+        async def open_socket(fixture):
+            nonlocal failures
+            async with semaphore:
+                communicator = WebsocketCommunicator(
+                    application,
+                    f'/ws/board/{fixture["board_id"]}/?token={fixture["token"]}&encoding={encoding}',
+                )
+                started = time.perf_counter()
+                connected, _ = await communicator.connect(timeout=30)
+                if not connected:
+                    failures += 1
+                    return None
+                # Сокет готовий, коли прийшов знімок присутності
+                await communicator.receive_from(timeout=30)
+                connect_latencies.append(time.perf_counter() - started)
+                return fixture, communicator
+
+        rss_before = current_rss_kb()
+        opened = [item for item in await asyncio.gather(*(open_socket(f) for f in fixtures)) if item]
+        rss_after = current_rss_kb()
+
+        fanout_latencies = []
+        delivered = 0
+        last_delivery = None
+
+        async def read_loop(communicator):
+            nonlocal delivered, last_delivery
+            while True:
+                try:
+                    raw = await communicator.receive_from(timeout=options['duration'] + 5)
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    return
+                if isinstance(raw, bytes):
+                    frame = decode_frame(None, raw, encoding)
+                else:
+                    frame = decode_frame(raw, None, encoding)
+                if not isinstance(frame, dict) or frame.get('action_type') != LOADTEST_ACTION:
+                    continue
+                delivered += 1
+                last_delivery = time.perf_counter()
+                fanout_latencies.append(last_delivery - frame['payload']['sent_at'])
+
+        readers = [asyncio.create_task(read_loop(communicator)) for _, communicator in opened]
+        padding = 'x' * options['payload_bytes']
+        interval = 1.0 / options['rate'] if options['rate'] > 0 else None
+        sent = 0
+        started = time.perf_counter()
+        # Розклад від started, а не sleep(interval) після кожної відправки:
+        # час самої відправки не накопичується і фактична частота дорівнює --rate
+        while interval and opened and sent * interval < options['duration']:
+            delay = started + sent * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif time.perf_counter() - started >= options['duration']:
+                break
+            fixture, communicator = rng.choice(opened)
+            message = {
+                'type': 'board_updated',
+                'action_type': LOADTEST_ACTION,
+                'board_id': fixture['board_id'],
+                'payload': {'sent_at': time.perf_counter(), 'padding': padding},
+            }
+            if encoding == 'msgpack':
+                await communicator.send_to(bytes_data=msgpack.packb(message))
+            else:
+                await communicator.send_json_to(message)
+            sent += 1
+        if interval:
+            # Остання відправка займає свій слот розкладу
+            await asyncio.sleep(max(0.0, started + sent * interval - time.perf_counter()))
+        send_elapsed = time.perf_counter() - started
+        # Хвіст доставки не входить у частоти: відправка міряється фазою
+        # відправки, доставка - до останнього отриманого кадру
+        await asyncio.sleep(1)
+        deliver_elapsed = (last_delivery - started) if last_delivery else 0
+
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+        for _, communicator in opened:
+            await communicator.disconnect()
+
+        connect = summarize_ms(connect_latencies)
+        fanout = summarize_ms(fanout_latencies)
+        return {
+            'sockets': len(fixtures),
+            'boards': options['boards'],
+            'rate': options['rate'],
+            'duration': options['duration'],
+            'encoding': encoding,
+            'connect_failures': failures,
+            'connect_p50_ms': connect['p50_ms'],
+            'connect_p95_ms': connect['p95_ms'],
+            'connect_p99_ms': connect['p99_ms'],
+            'fanout_p50_ms': fanout['p50_ms'],
+            'fanout_p95_ms': fanout['p95_ms'],
+            'fanout_p99_ms': fanout['p99_ms'],
+            'sent': sent,
+            'delivered': delivered,
+            'sent_per_sec': round(sent / send_elapsed, 1) if send_elapsed else 0,
+            'delivered_per_sec': round(delivered / deliver_elapsed, 1) if deliver_elapsed else 0,
+            'rss_kb_per_socket': round((rss_after - rss_before) / max(1, len(opened)), 1),
+        }
+
+    def _compare(self, previous, current):
+        rows = []
+        for metric in COMPARED_METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if before in (None, 0) or after is None:
+                change = 'n/a'
+            else:
+                change = f'{(after - before) / before * 100:+.1f}%'
+            rows.append({'metric': metric, 'previous': before, 'current': after, 'change': change})
+        return rows
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import DeletionJob
+from core.services.deletion import DEFAULT_BATCH_SIZE, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        'Видаляє дошки й акаунти з черги DeletionJob пачками (листові таблиці першими). '
+        'Незавершені й упалі завдання продовжуються з місця зупинки; --watch - працювати як фоновий процес.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--job', type=int, help='Лише одне завдання.')
+        parser.add_argument('--watch', action='store_true', help='Не завершуватись: перевіряти чергу кожні --interval секунд.')
+        parser.add_argument('--interval', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        processed = failed = 0
+        while True:
+            jobs = DeletionJob.objects.exclude(status='done').order_by('id')
+            if options['job']:
+                jobs = jobs.filter(id=options['job'])
+            for job in jobs:
+                self.stdout.write(f'Job {job.id}: {job.kind} {job.object_id} "{job.label}" ({job.status})')
+                try:
+                    run_job(job, batch_size, report=self._report)
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(self.style.ERROR(f'Job {job.id} failed at {job.step}: {error}'))
+                    continue
+                processed += 1
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Done: {processed} jobs, {failed} failed'))
+
+    def _report(self, job):
+        step = job.step or 'finished'
+        self.stdout.write(f'  {step}: {job.progress.get(job.step, 0)} rows (job total {job.deleted_rows})')
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Length
+
+from core.models import Card, List
+from core.services.ordering import rebalance
+
+
+class Command(BaseCommand):
+    help = (
+        'Перебудовує дробові ключі порядку в контейнерах, де вони стали задовгими '
+        '(для періодичного запуску; зазвичай перебудова відбувається сама після запису).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-length', type=int, default=settings.ORDERING_KEY_REBALANCE_LENGTH,
+            help='Перебудовувати контейнери з ключами, довшими за це значення.',
+        )
+        parser.add_argument('--board', type=int, help='Лише одна дошка.')
+        parser.add_argument('--all', action='store_true', help='Перебудувати всі контейнери незалежно від довжини ключів.')
+
+    def handle(self, *args, **options):
+        lists = List.objects.all()
+        cards = Card.objects.all()
+        if options['board']:
+            lists = lists.filter(board_id=options['board'])
+            cards = cards.filter(list__board_id=options['board'])
+        if not options['all']:
+            lists = lists.annotate(key_length=Length('position')).filter(key_length__gt=options['max_length'])
+            cards = cards.annotate(key_length=Length('position')).filter(key_length__gt=options['max_length'])
+
+        board_ids = sorted(set(lists.values_list('board_id', flat=True)))
+        list_ids = sorted(set(cards.values_list('list_id', flat=True)))
+        rows = 0
+        for board_id in board_ids:
+            rows += rebalance(List, {'board_id': board_id})
+        for list_id in list_ids:
+            rows += rebalance(Card, {'list_id': list_id})
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {len(board_ids)} boards, {len(list_ids)} card lists, {rows} rows rewritten'
+        ))
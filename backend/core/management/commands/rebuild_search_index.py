@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Card
+from core.services.search import reindex_cards
+
+
+class Command(BaseCommand):
+    help = 'Перебудовує пошукові документи карток пачками (після імпорту даних або змін у складі документа).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--board', type=int, help='Лише картки однієї дошки.')
+
+    def handle(self, *args, **options):
+        queryset = Card.objects.order_by('id')
+        if options['board']:
+            queryset = queryset.filter(list__board_id=options['board'])
+        batch_size = max(1, options['batch_size'])
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(queryset.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            reindex_cards(ids)
+            last_id = ids[-1]
+            total += len(ids)
+            self.stdout.write(f'Reindexed {total} cards')
+        self.stdout.write(self.style.SUCCESS(f'Done: {total} cards'))
@@ -0,0 +1,34 @@
+import asyncio
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.channel_layers import ChannelHub, acquire_hub_lock
+
+
+class Command(BaseCommand):
+    help = 'Запускає окремий hub для UnixSocketChannelLayer (замість вбудованого в процес daphne).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alias', default='default', help='Channel layer alias із CHANNEL_LAYERS.')
+
+    def handle(self, *args, **options):
+        layer_settings = settings.CHANNEL_LAYERS.get(options['alias'], {})
+        if layer_settings.get('BACKEND') != 'core.channel_layers.UnixSocketChannelLayer':
+            raise CommandError('Channel layer is not configured as core.channel_layers.UnixSocketChannelLayer.')
+        config = dict(layer_settings.get('CONFIG', {}))
+        config.pop('embedded_hub', None)
+        config.pop('connect_timeout', None)
+
+        hub = ChannelHub(**config)
+        self.stdout.write(f'Waiting for hub lock on {hub.path}.lock ...')
+        # Тримаємо дескриптор до завершення процесу
+        lock_fd = acquire_hub_lock(hub.path, blocking=True)
+        self.stdout.write(self.style.SUCCESS(f'Channel hub listening on {hub.path}'))
+        try:
+            asyncio.run(hub.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.close(lock_fd)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_profile_pending_password_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CardSearchDocument',
+            fields=[
+                ('card', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='core.card', verbose_name='Картка')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок')),
+                ('body', models.TextField(blank=True, verbose_name='Текст')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+            ],
+            options={
+                'verbose_name': 'Пошуковий документ картки',
+                'verbose_name_plural': 'Пошукові документи карток',
+            },
+        ),
+    ]
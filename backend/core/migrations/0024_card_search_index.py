@@ -0,0 +1,112 @@
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE core_cardsearchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX core_cardsearch_vector_gin ON core_cardsearchdocument USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_cardsearch_vector_gin",
+    "ALTER TABLE core_cardsearchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_cardsearch_fts USING fts5(
+        title, body,
+        content='core_cardsearchdocument', content_rowid='card_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER core_cardsearch_ai AFTER INSERT ON core_cardsearchdocument BEGIN
+        INSERT INTO core_cardsearch_fts(rowid, title, body) VALUES (new.card_id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_cardsearch_ad AFTER DELETE ON core_cardsearchdocument BEGIN
+        INSERT INTO core_cardsearch_fts(core_cardsearch_fts, rowid, title, body) VALUES ('delete', old.card_id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_cardsearch_au AFTER UPDATE ON core_cardsearchdocument BEGIN
+        INSERT INTO core_cardsearch_fts(core_cardsearch_fts, rowid, title, body) VALUES ('delete', old.card_id, old.title, old.body);
+        INSERT INTO core_cardsearch_fts(rowid, title, body) VALUES (new.card_id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_cardsearch_au",
+    "DROP TRIGGER IF EXISTS core_cardsearch_ad",
+    "DROP TRIGGER IF EXISTS core_cardsearch_ai",
+    "DROP TABLE IF EXISTS core_cardsearch_fts",
+]
+
+BACKFILL_BATCH = 500
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_BACKWARD)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_BACKWARD)
+
+
+def backfill_documents(apps, schema_editor):
+    Card = apps.get_model('core', 'Card')
+    ChecklistItem = apps.get_model('core', 'ChecklistItem')
+    Comment = apps.get_model('core', 'Comment')
+    CardSearchDocument = apps.get_model('core', 'CardSearchDocument')
+
+    last_id = 0
+    while True:
+        cards = list(
+            Card.objects.filter(id__gt=last_id).order_by('id').values('id', 'title', 'description')[:BACKFILL_BATCH]
+        )
+        if not cards:
+            return
+        last_id = cards[-1]['id']
+        ids = [card['id'] for card in cards]
+        parts = {card['id']: [card['description'] or ''] for card in cards}
+        for card_id, text in ChecklistItem.objects.filter(checklist__card_id__in=ids).values_list('checklist__card_id', 'text'):
+            parts[card_id].append(text)
+        for card_id, text in Comment.objects.filter(card_id__in=ids).values_list('card_id', 'text'):
+            parts[card_id].append(text)
+        CardSearchDocument.objects.bulk_create([
+            CardSearchDocument(card_id=card['id'], title=card['title'], body='\n'.join(p for p in parts[card['id']] if p))
+            for card in cards
+        ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_card_search_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
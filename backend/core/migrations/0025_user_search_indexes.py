@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import migrations
+
+
+SEARCH_COLUMNS = ('username', 'email', 'first_name', 'last_name')
+
+
+def create_user_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS core_user_{column}_trgm_idx '
+                f'ON auth_user USING GIN (LOWER({column}) gin_trgm_ops)'
+            )
+    elif vendor == 'sqlite':
+        for column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS core_user_lower_{column}_idx ON auth_user (LOWER({column}))'
+            )
+
+
+def drop_user_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for column in SEARCH_COLUMNS:
+        if vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS core_user_{column}_trgm_idx')
+        elif vendor == 'sqlite':
+            schema_editor.execute(f'DROP INDEX IF EXISTS core_user_lower_{column}_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_card_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_user_search_indexes, drop_user_search_indexes),
+    ]
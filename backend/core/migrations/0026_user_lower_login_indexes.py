@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import migrations
+
+
+LOGIN_COLUMNS = ('username', 'email')
+
+
+def create_login_indexes(apps, schema_editor):
+    # На SQLite ці індекси вже створила 0025 (IF NOT EXISTS робить крок безпечним)
+    if schema_editor.connection.vendor not in ('postgresql', 'sqlite'):
+        return
+    for column in LOGIN_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS core_user_lower_{column}_idx ON auth_user (LOWER({column}))'
+        )
+
+
+def drop_login_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in LOGIN_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS core_user_lower_{column}_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_user_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_login_indexes, drop_login_indexes),
+    ]
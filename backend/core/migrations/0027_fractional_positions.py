@@ -0,0 +1,84 @@
+from itertools import groupby
+
+from django.db import migrations, models
+
+# Копія core.services.ordering.spread_keys на момент міграції: міграція не
+# повинна залежати від живого коду, який може змінитися
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+
+def spread_keys(count):
+    if count <= 0:
+        return []
+    length = 2
+    while BASE ** (length - 2) < count + 1:
+        length += 1
+    span = BASE ** length
+    step = span // (2 * (count + 1))
+    keys = []
+    for index in range(1, count + 1):
+        value = span // 4 + index * step
+        digits = []
+        for _ in range(length):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append(''.join(reversed(digits)).rstrip('0'))
+    return keys
+
+
+def _backfill(model, container_field):
+    rows = model.objects.order_by(container_field, 'order', 'id').values_list('id', container_field)
+    updates = []
+    for _, group in groupby(rows.iterator(), key=lambda row: row[1]):
+        ids = [row_id for row_id, _ in group]
+        updates.extend(model(id=row_id, position=key) for row_id, key in zip(ids, spread_keys(len(ids))))
+        if len(updates) >= 2000:
+            model.objects.bulk_update(updates, ['position'])
+            updates = []
+    if updates:
+        model.objects.bulk_update(updates, ['position'])
+
+
+def backfill_positions(apps, schema_editor):
+    _backfill(apps.get_model('core', 'List'), 'board_id')
+    _backfill(apps.get_model('core', 'Card'), 'list_id')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_user_lower_login_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='list',
+            name='position',
+            field=models.CharField(default='i', max_length=255, verbose_name='Позиція'),
+        ),
+        migrations.AddField(
+            model_name='card',
+            name='position',
+            field=models.CharField(default='i', max_length=255, verbose_name='Позиція'),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='list',
+            options={'ordering': ['position', 'id'], 'verbose_name': 'Список', 'verbose_name_plural': 'Списки'},
+        ),
+        migrations.AlterModelOptions(
+            name='card',
+            options={'ordering': ['position', 'id'], 'verbose_name': 'Картка', 'verbose_name_plural': 'Картки'},
+        ),
+        migrations.RemoveField(model_name='list', name='order'),
+        migrations.RemoveField(model_name='card', name='order'),
+        migrations.AddIndex(
+            model_name='list',
+            index=models.Index(fields=['board', 'position'], name='core_list_board_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['list', 'position'], name='core_card_list_position_idx'),
+        ),
+    ]
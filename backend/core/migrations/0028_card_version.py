@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_fractional_positions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='version',
+            field=models.PositiveIntegerField(default=1, verbose_name='Версія'),
+        ),
+    ]
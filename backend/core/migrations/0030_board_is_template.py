@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_list_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='is_template',
+            field=models.BooleanField(default=False, verbose_name='Шаблон'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_board_is_template'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='pending_delete',
+            field=models.BooleanField(default=False, verbose_name='Очікує видалення'),
+        ),
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('board', 'Дошка'), ('user', 'Користувач')], max_length=20, verbose_name='Тип')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID сутності')),
+                ('label', models.CharField(blank=True, max_length=255, verbose_name='Назва')),
+                ('status', models.CharField(choices=[('pending', 'Очікує'), ('running', 'Виконується'), ('done', 'Завершено'), ('failed', 'Помилка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('step', models.CharField(blank=True, max_length=100, verbose_name='Поточний крок')),
+                ('progress', models.JSONField(blank=True, default=dict, verbose_name='Видалено рядків по таблицях')),
+                ('deleted_rows', models.PositiveBigIntegerField(default=0, verbose_name='Видалено рядків')),
+                ('error', models.TextField(blank=True, verbose_name='Помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата створення')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+            ],
+            options={
+                'verbose_name': 'Завдання видалення',
+                'verbose_name_plural': 'Завдання видалення',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='core_deljob_status_idx')],
+            },
+        ),
+    ]
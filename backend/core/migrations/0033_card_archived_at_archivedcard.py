@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_board_pending_delete_deletionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Архівовано'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedCard',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID картки')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок Картки')),
+                ('description', models.TextField(blank=True, verbose_name='Опис Картки')),
+                ('is_public', models.BooleanField(default=True, verbose_name='Публічна картка')),
+                ('member_ids', models.JSONField(blank=True, default=list, verbose_name='Учасники')),
+                ('archived_at', models.DateTimeField(blank=True, null=True, verbose_name='Архівовано')),
+                ('stored_at', models.DateTimeField(auto_now_add=True, verbose_name='Перенесено в архів')),
+                ('payload', models.JSONField(verbose_name='Рядки картки')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_cards', to='core.board', verbose_name='Дошка')),
+                ('list', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_cards', to='core.list', verbose_name='Список')),
+            ],
+            options={
+                'verbose_name': 'Архівна картка',
+                'verbose_name_plural': 'Архівні картки',
+                'ordering': ['-archived_at', '-id'],
+                'indexes': [models.Index(fields=['board', '-archived_at'], name='core_archcard_board_idx')],
+            },
+        ),
+    ]
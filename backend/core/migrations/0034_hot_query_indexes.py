@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_card_archived_at_archivedcard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['board', '-timestamp'], name='core_activity_board_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['user', '-created_at'], name='core_actlog_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['list', 'position', 'id'], name='core_card_active_pos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(condition=models.Q(('due_date__isnull', False), ('is_archived', False)), fields=['due_date'], name='core_card_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(condition=models.Q(('is_archived', True)), fields=['archived_at'], name='core_card_archived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['card', 'created_at'], name='core_comment_card_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(condition=models.Q(('is_favorite', True)), fields=['user'], name='core_member_favorite_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['board', 'role'], name='core_member_board_role_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:00
+
+from django.db import migrations, models, transaction
+from django.db.models import Exists, Min, OuterRef
+
+BATCH_SIZE = 1000
+# Назва стандартного чек-листа на момент міграції (core.services.checklists)
+DEFAULT_CHECKLIST_TITLE = 'Чек-лист'
+
+
+def reclaim_default_checklists(apps, schema_editor):
+    """
+    Віртуальний чек-лист - лише для нових карток, крім тих, де лежить порожній
+    стандартний рядок від старого коду: чек-лист без пунктів з назвою
+    DEFAULT_CHECKLIST_TITLE, перший на картці. Такі рядки видаляються пачками
+    (кожна у своїй транзакції), а їхні картки знову показують віртуальний.
+    Інші картки без чек-листів могли позбутися стандартного свідомо.
+    """
+    Card = apps.get_model('core', 'Card')
+    Checklist = apps.get_model('core', 'Checklist')
+    ChecklistItem = apps.get_model('core', 'ChecklistItem')
+    Card.objects.update(show_default_checklist=False)
+
+    candidates = (
+        Checklist.objects.filter(title=DEFAULT_CHECKLIST_TITLE)
+        .filter(~Exists(ChecklistItem.objects.filter(checklist_id=OuterRef('pk'))))
+        .order_by('id')
+    )
+    last_id = 0
+    while True:
+        rows = list(candidates.filter(id__gt=last_id).values_list('id', 'card_id')[:BATCH_SIZE])
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        first = dict(
+            Checklist.objects.filter(card_id__in={card_id for _, card_id in rows})
+            .values('card_id').annotate(first=Min('id')).values_list('card_id', 'first')
+        )
+        dead = [(checklist_id, card_id) for checklist_id, card_id in rows if first.get(card_id) == checklist_id]
+        if not dead:
+            continue
+        with transaction.atomic():
+            # Пункт міг з'явитися після вибірки - такий чек-лист уже не порожній
+            deleted = set(
+                Checklist.objects.filter(id__in=[checklist_id for checklist_id, _ in dead])
+                .filter(~Exists(ChecklistItem.objects.filter(checklist_id=OuterRef('pk'))))
+                .values_list('id', flat=True)
+            )
+            Checklist.objects.filter(id__in=deleted).delete()
+            Card.objects.filter(id__in=[card_id for checklist_id, card_id in dead if checklist_id in deleted]).update(
+                show_default_checklist=True,
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0036_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='show_default_checklist',
+            field=models.BooleanField(default=True, verbose_name='Стандартний чек-лист'),
+        ),
+        migrations.RunPython(reclaim_default_checklists, migrations.RunPython.noop),
+    ]
@@ -2,10 +2,16 @@ from .users import Profile, ActivityLog
 from .boards import Board, Membership, Label, Activity
 from .cards import List, Card, CardMember, CardLabel
 from .details import Checklist, ChecklistItem, Attachment, Comment
+from .search import CardSearchDocument
+from .jobs import DeletionJob
+from .archive import ArchivedCard
 
 __all__ = [
     'Profile', 'ActivityLog',
     'Board', 'Membership', 'Label', 'Activity',
     'List', 'Card', 'CardMember', 'CardLabel',
     'Checklist', 'ChecklistItem', 'Attachment', 'Comment',
+    'CardSearchDocument',
+    'DeletionJob',
+    'ArchivedCard',
 ]
\ No newline at end of file
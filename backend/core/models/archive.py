@@ -0,0 +1,40 @@
+"""
+Холодне сховище архівних карток.
+"""
+import builtins
+
+from django.db import models
+
+
+class ArchivedCard(models.Model):
+    """
+    Картка, яка пробула в архіві довше за CARD_COLD_STORAGE_DAYS і винесена
+    з гарячих таблиць командою archive_cold_cards (core.services.cold_storage).
+
+    id збігається з id картки, тож посилання в історії та URL лишаються
+    дійсними. Колонки - те, за чим архів переглядають і шукають; payload -
+    рядки картки, її чек-листів, пунктів, міток, учасників, коментарів і
+    вкладень у форматі серіалізатора Django, з якого картка відновлюється.
+    """
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID картки")
+    board = models.ForeignKey('core.Board', on_delete=models.CASCADE, related_name='archived_cards', verbose_name="Дошка")
+    list = models.ForeignKey('core.List', on_delete=models.CASCADE, related_name='archived_cards', verbose_name="Список")
+    title = models.CharField(max_length=255, verbose_name="Заголовок Картки")
+    description = models.TextField(blank=True, verbose_name="Опис Картки")
+    is_public = models.BooleanField(default=True, verbose_name="Публічна картка")
+    # Учасники картки - щоб приватні картки в архіві бачили ті самі люди, що й до переносу
+    # (builtins.list: ім'я list у класі вже зайняте полем списку)
+    member_ids = models.JSONField(default=builtins.list, blank=True, verbose_name="Учасники")
+    archived_at = models.DateTimeField(null=True, blank=True, verbose_name="Архівовано")
+    stored_at = models.DateTimeField(auto_now_add=True, verbose_name="Перенесено в архів")
+    payload = models.JSONField(verbose_name="Рядки картки")
+
+    class Meta:
+        verbose_name = "Архівна картка"
+        verbose_name_plural = "Архівні картки"
+        ordering = ['-archived_at', '-id']
+        indexes = [models.Index(fields=['board', '-archived_at'], name='core_archcard_board_idx')]
+        app_label = 'core'
+
+    def __str__(self):
+        return self.title
@@ -16,6 +16,7 @@ class Board(models.Model):
     # is_favorite видалено звідси, тепер це персональне налаштування в Membership
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='owned_boards', verbose_name="Власник")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата зміни")
     invite_link = models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name="Посилання-запрошення")
     # Налаштування прав для Developer
     dev_can_create_cards = models.BooleanField(default=True, verbose_name="Dev може створювати картки")
@@ -23,6 +24,10 @@ class Board(models.Model):
     dev_can_archive_assigned_cards = models.BooleanField(default=True, verbose_name="Dev може архівувати призначені картки")
     dev_can_join_card = models.BooleanField(default=False, verbose_name="Dev може приєднуватися до чужих карток")
     dev_can_create_lists = models.BooleanField(default=False, verbose_name="Dev може створювати списки")
+    # Шаблон: будь-який учасник може створити з нього нову дошку (POST /api/boards/{id}/clone/)
+    is_template = models.BooleanField(default=False, verbose_name="Шаблон")
+    # Поставлена в чергу на видалення (DeletionJob): прихована з усіх вибірок, рядки видаляє process_deletions
+    pending_delete = models.BooleanField(default=False, verbose_name="Очікує видалення")
     
     # Зв'язок M:M через Membership
     members = models.ManyToManyField(User, through='Membership', related_name='boards', verbose_name="Учасники")
@@ -57,6 +62,12 @@ class Membership(models.Model):
         verbose_name = "Участь у Дошці"
         verbose_name_plural = "Участь у Дошках"
         unique_together = ('user', 'board')
+        indexes = [
+            # Обрані дошки користувача (рядків з is_favorite мало - частковий індекс)
+            models.Index(fields=['user'], condition=models.Q(is_favorite=True), name='core_member_favorite_idx'),
+            # Адміни/ролі дошки
+            models.Index(fields=['board', 'role'], name='core_member_board_role_idx'),
+        ]
         app_label = 'core'
 
     def __str__(self):
@@ -106,6 +117,7 @@ class Activity(models.Model):
         verbose_name = "Дія"
         verbose_name_plural = "Журнал дій"
         ordering = ['-timestamp']
+        indexes = [models.Index(fields=['board', '-timestamp'], name='core_activity_board_ts_idx')]
         app_label = 'core'
 
     def __str__(self):
@@ -10,15 +10,21 @@ class List(models.Model):
     """
     board = models.ForeignKey('core.Board', on_delete=models.CASCADE, related_name='lists', verbose_name="Дошка")
     title = models.CharField(max_length=255, verbose_name="Назва Списку")
-    order = models.DecimalField(max_digits=10, decimal_places=5, default=0, verbose_name="Позиція")
+    # Дробовий ключ порядку (core.services.ordering); API віддає order - номер серед сусідів
+    position = models.CharField(max_length=255, default='i', verbose_name="Позиція")
     is_archived = models.BooleanField(default=False, verbose_name="Архівувати Список")
     color = models.CharField(max_length=20, null=True, blank=True, verbose_name="Колір колонки")
     allow_dev_add_cards = models.BooleanField(default=True, verbose_name="Dev може додавати картки")
+    # Зростає з кожною зміною списку; умовні UPDATE замість блокувань
+    version = models.PositiveIntegerField(default=1, verbose_name="Версія")
+    # auto_now покриває save(); UPDATE-шляхи з version=F('version') + 1 ставлять його явно
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата зміни")
 
     class Meta:
         verbose_name = "Список"
         verbose_name_plural = "Списки"
-        ordering = ['order']
+        ordering = ['position', 'id']
+        indexes = [models.Index(fields=['board', 'position'], name='core_list_board_position_idx')]
         app_label = 'core'
 
     def __str__(self):
@@ -33,20 +39,38 @@ class Card(models.Model):
     description = models.TextField(blank=True, verbose_name="Опис Картки")
     card_color = models.CharField(max_length=7, blank=True, default='', verbose_name="Колір Картки (HEX)")
     cover_size = models.CharField(max_length=10, blank=True, default='full', verbose_name="Розмір обкладинки")
-    order = models.DecimalField(max_digits=10, decimal_places=5, default=0, verbose_name="Позиція")
+    position = models.CharField(max_length=255, default='i', verbose_name="Позиція")
     due_date = models.DateTimeField(null=True, blank=True, verbose_name="Кінцевий термін")
     is_completed = models.BooleanField(default=False, verbose_name="Завершено")
     is_archived = models.BooleanField(default=False, verbose_name="Архівувати Картку")
+    # Коли картку архівували; старі архівні картки переносяться в ArchivedCard
+    archived_at = models.DateTimeField(null=True, blank=True, verbose_name="Архівовано")
 
     # НОВЕ ПОЛЕ: Статус приватності картки
     is_public = models.BooleanField(default=True, verbose_name="Публічна картка")
+    # Віртуальний стандартний чек-лист (core.services.checklists) показується, поки картка
+    # не мала жодного чек-листа і його не видалили
+    show_default_checklist = models.BooleanField(default=True, verbose_name="Стандартний чек-лист")
+    # Зростає з кожною зміною картки (move, PATCH, пакетні операції)
+    version = models.PositiveIntegerField(default=1, verbose_name="Версія")
+    # auto_now покриває save(); UPDATE-шляхи з version=F('version') + 1 ставлять його явно
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата зміни")
 
     members = models.ManyToManyField(User, through='CardMember', related_name='assigned_cards', verbose_name="Призначені учасники")
     
     class Meta:
         verbose_name = "Картка"
         verbose_name_plural = "Картки"
-        ordering = ['order']
+        ordering = ['position', 'id']
+        indexes = [
+            models.Index(fields=['list', 'position'], name='core_card_list_position_idx'),
+            # Активні картки списку в порядку: колонки дошки, сусіди при вставці/переміщенні, order
+            models.Index(fields=['list', 'position', 'id'], condition=models.Q(is_archived=False), name='core_card_active_pos_idx'),
+            # Календар: лише активні картки з терміном
+            models.Index(fields=['due_date'], condition=models.Q(due_date__isnull=False, is_archived=False), name='core_card_due_idx'),
+            # Кандидати для archive_cold_cards
+            models.Index(fields=['archived_at'], condition=models.Q(is_archived=True), name='core_card_archived_idx'),
+        ]
         app_label = 'core'
 
     def __str__(self):
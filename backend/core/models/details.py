@@ -67,6 +67,7 @@ class Comment(models.Model):
         verbose_name = "Коментар"
         verbose_name_plural = "Коментарі"
         ordering = ['created_at']
+        indexes = [models.Index(fields=['card', 'created_at'], name='core_comment_card_created_idx')]
         app_label = 'core'
 
     def __str__(self):
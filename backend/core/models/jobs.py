@@ -0,0 +1,47 @@
+"""
+Фонові завдання обслуговування (видалення великих дошок і акаунтів пачками).
+"""
+from django.db import models
+
+
+class DeletionJob(models.Model):
+    """
+    Відкладене видалення дошки або користувача.
+
+    Запит лише ховає сутність (Board.pending_delete / User.is_active=False) і
+    створює завдання; команда process_deletions видаляє дочірні рядки пачками,
+    від листових таблиць до кореня, записуючи поточний крок і лічильники.
+    Кожен крок ідемпотентний, тож після падіння завдання продовжується з step.
+    """
+    KIND_CHOICES = (
+        ('board', 'Дошка'),
+        ('user', 'Користувач'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Очікує'),
+        ('running', 'Виконується'),
+        ('done', 'Завершено'),
+        ('failed', 'Помилка'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Тип")
+    object_id = models.PositiveBigIntegerField(verbose_name="ID сутності")
+    label = models.CharField(max_length=255, blank=True, verbose_name="Назва")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Статус")
+    step = models.CharField(max_length=100, blank=True, verbose_name="Поточний крок")
+    progress = models.JSONField(default=dict, blank=True, verbose_name="Видалено рядків по таблицях")
+    deleted_rows = models.PositiveBigIntegerField(default=0, verbose_name="Видалено рядків")
+    error = models.TextField(blank=True, verbose_name="Помилка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершено")
+
+    class Meta:
+        verbose_name = "Завдання видалення"
+        verbose_name_plural = "Завдання видалення"
+        ordering = ['id']
+        indexes = [models.Index(fields=['status', 'id'], name='core_deljob_status_idx')]
+        app_label = 'core'
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} ({self.status})"
@@ -0,0 +1,26 @@
+"""
+Пошуковий документ картки (денормалізований текст для повнотекстового пошуку).
+"""
+from django.db import models
+
+
+class CardSearchDocument(models.Model):
+    """
+    Текст картки для пошуку: заголовок + опис, пункти чек-листів і коментарі.
+
+    Сам індекс живе поза ORM і створюється міграцією залежно від БД:
+    Postgres - згенерована колонка search_vector (tsvector) з GIN-індексом,
+    SQLite - віртуальна таблиця FTS5 core_cardsearch_fts, яку синхронізують тригери.
+    """
+    card = models.OneToOneField('core.Card', on_delete=models.CASCADE, primary_key=True, related_name='search_document', verbose_name="Картка")
+    title = models.CharField(max_length=255, verbose_name="Заголовок")
+    body = models.TextField(blank=True, verbose_name="Текст")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
+
+    class Meta:
+        verbose_name = "Пошуковий документ картки"
+        verbose_name_plural = "Пошукові документи карток"
+        app_label = 'core'
+
+    def __str__(self):
+        return f"Search document {self.card_id}"
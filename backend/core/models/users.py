@@ -73,6 +73,8 @@ class Profile(models.Model):
         verbose_name="Pending password requested at"
     )
     bio = models.TextField(blank=True, verbose_name="Bio")
+    # Секрет у посиланні на .ics-стрічку термінів (/api/calendar/feed/<token>.ics)
+    calendar_token = models.CharField(max_length=64, blank=True, default='', db_index=True, verbose_name="Токен календарної стрічки")
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True, verbose_name="Avatar")
     
     class Meta:
@@ -116,6 +118,8 @@ class ActivityLog(models.Model):
         verbose_name = "Лог дій"
         verbose_name_plural = "Логи дій"
         ordering = ['-created_at']
+        # Стрічка в профілі та очищення за терміном зберігання
+        indexes = [models.Index(fields=['user', '-created_at'], name='core_actlog_user_created_idx')]
         app_label = 'core'
 
     def __str__(self):
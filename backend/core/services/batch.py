@@ -0,0 +1,468 @@
+"""
+Пакетні зміни дошки: POST /api/boards/{id}/batch/.
+
+Клієнт надсилає впорядкований список операцій одного жесту (мультивибір,
+перетягування кількох карток, "архівувати 20 карток"). Усі операції:
+  * перевіряються одним BoardPermissionResolver (без запитів на кожну картку);
+  * застосовуються в пам'яті, а потім записуються в одній транзакції
+    кількома bulk_update / bulk_create / delete; переміщення дають нові
+    дробові ключі лише переміщеним карткам (core.services.ordering);
+  * дають один запис в історії та одну подію для сокетів дошки.
+Якщо будь-яка операція невалідна або заборонена - не застосовується жодна.
+
+Формат операції: {"op": "<назва>", "cards": [id, ...], ...параметри}
+  move / reorder   list, order (1-based місце першої картки серед активних у списку)
+  archive / unarchive / complete / uncomplete
+  set_due_date     due_date (ISO або YYYY-MM-DD; null - зняти)
+  set_labels / add_labels / remove_labels      label_ids
+  assign / unassign                            user_ids
+  move_list        list, order (замість cards)
+"""
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from core.models import Card, CardLabel, CardMember, Label, List, Membership
+from core.services.activity_logger import log_activity
+from core.services.ordering import key_between, keys_between, needs_rebalance, rebalance
+from core.services.permissions import BoardPermissionResolver
+from core.services.prefix_index import index_card
+from core.services.realtime import broadcast_board_event, card_audience
+
+BATCH_ACTION = 'board/batch/fulfilled'
+MAX_OPERATIONS = 100
+MAX_CARDS_PER_OPERATION = 500
+
+CARD_OPERATIONS = (
+    'move', 'reorder', 'archive', 'unarchive', 'complete', 'uncomplete', 'set_due_date',
+    'set_labels', 'add_labels', 'remove_labels', 'assign', 'unassign',
+)
+LIST_OPERATIONS = ('move_list',)
+OPERATIONS = CARD_OPERATIONS + LIST_OPERATIONS
+
+FLAG_OPERATIONS = {
+    'archive': ('is_archived', True),
+    'unarchive': ('is_archived', False),
+    'complete': ('is_completed', True),
+    'uncomplete': ('is_completed', False),
+}
+
+_due_date_field = serializers.DateTimeField(allow_null=True, input_formats=['%Y-%m-%d', 'iso-8601'])
+
+
+class BatchError(APIException):
+    """
+    Помилка операції з номером index у пакеті. Тіло віддається як є,
+    щоб index та id лишались числами.
+    """
+    status_code = status.HTTP_400_BAD_REQUEST
+
+    def __init__(self, detail, index=None, status_code=None, **extra):
+        super().__init__(detail)
+        if status_code is not None:
+            self.status_code = status_code
+        self.detail = {'detail': detail, **({'index': index} if index is not None else {}), **extra}
+
+
+def _error(index, detail, **extra):
+    return BatchError(detail, index, **extra)
+
+
+def _int_list(value, index, name):
+    if not isinstance(value, list) or not value:
+        raise _error(index, f'{name}_required')
+    if len(value) > MAX_CARDS_PER_OPERATION:
+        raise _error(index, f'too_many_{name}')
+    try:
+        return [int(item) for item in value]
+    except (TypeError, ValueError):
+        raise _error(index, f'invalid_{name}')
+
+
+def _int_value(value, index, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise _error(index, f'invalid_{name}')
+
+
+def _slot(sequence, order, is_archived):
+    """
+    Індекс вставки в повну послідовність (разом з архівними) для 1-based
+    місця order серед активних елементів.
+    """
+    active = [at for at, item in enumerate(sequence) if not is_archived(item)]
+    return active[order - 1] if order - 1 < len(active) else len(sequence)
+
+
+def _ranks(sequence, is_archived):
+    """
+    order для API: 1 + кількість активних елементів перед кожним.
+    """
+    ranks, active_before = {}, 0
+    for item in sequence:
+        ranks[item] = active_before + 1
+        if not is_archived(item):
+            active_before += 1
+    return ranks
+
+
+class BoardBatch:
+    def __init__(self, user, board, operations):
+        self.user = user
+        self.board = board
+        self.operations = self._parse(operations)
+        self.cards = {}
+        self.lists = {}
+        # list_id -> [card_id, ...] у поточному порядку (лише для списків, зачеплених move)
+        self.sequences = {}
+        self.card_labels = {}
+        self.card_members = {}
+        self.member_roles = {}
+        self.dirty_fields = {}
+        self.positioned = set()
+        self.list_sequence = []
+        self.moved_lists = set()
+
+    # Розбір
+
+    def _parse(self, operations):
+        if not isinstance(operations, list) or not operations:
+            raise BatchError('operations_required')
+        if len(operations) > MAX_OPERATIONS:
+            raise BatchError('too_many_operations')
+        parsed = []
+        for index, raw in enumerate(operations):
+            if not isinstance(raw, dict) or raw.get('op') not in OPERATIONS:
+                raise _error(index, 'unknown_operation')
+            op = {'op': raw['op'], 'index': index}
+            if op['op'] in CARD_OPERATIONS:
+                op['cards'] = _int_list(raw.get('cards'), index, 'cards')
+            if op['op'] in ('move', 'reorder', 'move_list'):
+                op['list'] = _int_value(raw.get('list'), index, 'list')
+                op['order'] = max(1, _int_value(raw.get('order', 1), index, 'order'))
+            if op['op'] == 'set_due_date':
+                try:
+                    op['due_date'] = _due_date_field.run_validation(raw.get('due_date'))
+                except serializers.ValidationError:
+                    raise _error(index, 'invalid_due_date')
+            if op['op'] in ('set_labels', 'add_labels', 'remove_labels'):
+                label_ids = raw.get('label_ids')
+                op['label_ids'] = [] if label_ids == [] and op['op'] == 'set_labels' else _int_list(label_ids, index, 'label_ids')
+            if op['op'] in ('assign', 'unassign'):
+                op['user_ids'] = _int_list(raw.get('user_ids'), index, 'user_ids')
+            parsed.append(op)
+        return parsed
+
+    # Завантаження (фіксована кількість запитів незалежно від кількості операцій)
+
+    def _load(self):
+        card_ids = {card_id for op in self.operations for card_id in op.get('cards', ())}
+        self.lists = {item.id: item for item in List.objects.filter(board=self.board)}
+        self.cards = {
+            card.id: card
+            for card in Card.objects.filter(id__in=card_ids, list__board=self.board).select_related('list')
+        }
+        for op in self.operations:
+            missing = [card_id for card_id in op.get('cards', ()) if card_id not in self.cards]
+            if missing:
+                raise _error(op['index'], 'card_not_found', cards=missing)
+        self.resolver = BoardPermissionResolver(self.user, self.board, card_ids)
+
+        touched_lists = set()
+        for op in self.operations:
+            if op['op'] in ('move', 'reorder'):
+                if op['list'] not in self.lists:
+                    raise _error(op['index'], 'list_not_found')
+                touched_lists.add(op['list'])
+                touched_lists.update(self.cards[card_id].list_id for card_id in op['cards'])
+        if touched_lists:
+            self.sequences = {list_id: [] for list_id in touched_lists}
+            queryset = Card.objects.filter(list_id__in=touched_lists).only('id', 'list_id', 'position', 'is_archived', 'is_public')
+            for card in queryset.order_by('position', 'id'):
+                self.sequences[card.list_id].append(card.id)
+                self.cards.setdefault(card.id, card)
+
+        label_card_ids = {c for op in self.operations if op['op'].endswith('_labels') for c in op['cards']}
+        if label_card_ids:
+            self.card_labels = {card_id: set() for card_id in label_card_ids}
+            for card_id, label_id in CardLabel.objects.filter(card_id__in=label_card_ids).values_list('card_id', 'label_id'):
+                self.card_labels[card_id].add(label_id)
+            requested = {label_id for op in self.operations if op['op'].endswith('_labels') for label_id in op['label_ids']}
+            self.board_label_ids = set(Label.objects.filter(board=self.board, id__in=requested).values_list('id', flat=True))
+
+        member_card_ids = {c for op in self.operations if op['op'] in ('assign', 'unassign') for c in op['cards']}
+        if member_card_ids:
+            self.card_members = {card_id: set() for card_id in member_card_ids}
+            for card_id, user_id in CardMember.objects.filter(card_id__in=member_card_ids).values_list('card_id', 'user_id'):
+                self.card_members[card_id].add(user_id)
+            requested = {user_id for op in self.operations if op['op'] == 'assign' for user_id in op['user_ids']}
+            self.member_roles = dict(
+                Membership.objects.filter(board=self.board, user_id__in=requested).values_list('user_id', 'role')
+            )
+
+        self.original_labels = {card_id: set(labels) for card_id, labels in self.card_labels.items()}
+        self.original_members = {card_id: set(members) for card_id, members in self.card_members.items()}
+
+    # Застосування в пам'яті
+
+    def _mark(self, card, field):
+        self.dirty_fields.setdefault(card.id, set()).add(field)
+
+    def _deny(self, op, message):
+        raise BatchError(message, op['index'], status_code=status.HTTP_403_FORBIDDEN)
+
+    def _apply_move(self, op):
+        target = self.lists[op['list']]
+        moving = []
+        for card_id in op['cards']:
+            card = self.cards[card_id]
+            if not self.resolver.can_move(card, target):
+                self._deny(op, 'Only admins or allowed developers can move cards to this list.')
+            if card_id in moving:
+                continue
+            self.sequences[card.list_id].remove(card_id)
+            moving.append(card_id)
+        # Нові ключі отримують лише переміщені картки - сусіди не змінюються
+        sequence = self.sequences[target.id]
+        slot = _slot(sequence, op['order'], lambda card_id: self.cards[card_id].is_archived)
+        before = self.cards[sequence[slot - 1]].position if slot else None
+        after = self.cards[sequence[slot]].position if slot < len(sequence) else None
+        for card_id, key in zip(moving, keys_between(before, after, len(moving))):
+            card = self.cards[card_id]
+            card.position = key
+            self.positioned.add(card_id)
+            if card.list_id != target.id:
+                card.list = target
+                self._mark(card, 'list')
+        sequence[slot:slot] = moving
+
+    def _apply_flag(self, op):
+        field, value = FLAG_OPERATIONS[op['op']]
+        check = self.resolver.can_archive if field == 'is_archived' else self.resolver.can_edit
+        for card_id in op['cards']:
+            card = self.cards[card_id]
+            if not check(card):
+                self._deny(op, 'Only admins or allowed developers can change these cards.')
+            if getattr(card, field) != value:
+                setattr(card, field, value)
+                self._mark(card, field)
+                if field == 'is_archived':
+                    card.archived_at = timezone.now() if value else None
+
+    def _apply_due_date(self, op):
+        for card_id in op['cards']:
+            card = self.cards[card_id]
+            if not self.resolver.can_edit(card):
+                self._deny(op, 'Only card members or admins can update cards.')
+            if card.due_date != op['due_date']:
+                card.due_date = op['due_date']
+                self._mark(card, 'due_date')
+
+    def _apply_labels(self, op):
+        unknown = [label_id for label_id in op['label_ids'] if label_id not in self.board_label_ids]
+        if unknown:
+            raise _error(op['index'], 'label_not_found', label_ids=unknown)
+        for card_id in op['cards']:
+            if not self.resolver.can_edit(self.cards[card_id]):
+                self._deny(op, 'Only card members or admins can update cards.')
+            labels = self.card_labels[card_id]
+            if op['op'] == 'set_labels':
+                labels.clear()
+                labels.update(op['label_ids'])
+            elif op['op'] == 'add_labels':
+                labels.update(op['label_ids'])
+            else:
+                labels.difference_update(op['label_ids'])
+
+    def _apply_members(self, op):
+        if not self.resolver.can_manage_card_members():
+            self._deny(op, 'Only admins can manage card members.')
+        if op['op'] == 'assign':
+            for user_id in op['user_ids']:
+                role = self.member_roles.get(user_id)
+                if role is None and user_id != self.board.owner_id:
+                    raise _error(op['index'], 'user_not_board_member', user_id=user_id)
+                if role == 'viewer':
+                    raise _error(op['index'], 'viewer_cannot_be_assigned', user_id=user_id)
+        for card_id in op['cards']:
+            if op['op'] == 'assign':
+                self.card_members[card_id].update(op['user_ids'])
+            else:
+                self.card_members[card_id].difference_update(op['user_ids'])
+
+    def _apply_move_list(self, op):
+        if not self.resolver.can_manage_lists():
+            self._deny(op, 'Only admins can update lists.')
+        list_obj = self.lists.get(op['list'])
+        if list_obj is None or list_obj.is_archived:
+            raise _error(op['index'], 'list_not_found')
+        if not self.list_sequence:
+            self.list_sequence = sorted(self.lists.values(), key=lambda item: (item.position, item.id))
+        sequence = self.list_sequence
+        sequence.remove(list_obj)
+        slot = _slot(sequence, op['order'], lambda item: item.is_archived)
+        before = sequence[slot - 1].position if slot else None
+        after = sequence[slot].position if slot < len(sequence) else None
+        list_obj.position = key_between(before, after)
+        sequence.insert(slot, list_obj)
+        self.moved_lists.add(list_obj.id)
+
+    def _apply(self):
+        handlers = {
+            'move': self._apply_move,
+            'reorder': self._apply_move,
+            'set_due_date': self._apply_due_date,
+            'set_labels': self._apply_labels,
+            'add_labels': self._apply_labels,
+            'remove_labels': self._apply_labels,
+            'assign': self._apply_members,
+            'unassign': self._apply_members,
+            'move_list': self._apply_move_list,
+        }
+        for op in self.operations:
+            handlers.get(op['op'], self._apply_flag)(op)
+
+    # Запис
+
+    def _changed_card_ids(self):
+        card_ids = set(self.dirty_fields) | self.positioned
+        card_ids.update(card_id for card_id, labels in self.card_labels.items() if labels != self.original_labels[card_id])
+        card_ids.update(card_id for card_id, users in self.card_members.items() if users != self.original_members[card_id])
+        return card_ids
+
+    def _claim_versions(self, model, objects):
+        """
+        Умовний інкремент версій (UPDATE ... WHERE id IN (...) AND version = ?
+        на кожне значення версії). Якщо хтось змінив рядок після читання -
+        409, транзакція відкочується, клієнт повторює пакет.
+        """
+        by_version = {}
+        now = timezone.now()
+        for obj in objects:
+            by_version.setdefault(obj.version, []).append(obj.id)
+        claimed = sum(
+            model.objects.filter(id__in=ids, version=version).update(version=F('version') + 1, updated_at=now)
+            for version, ids in by_version.items()
+        )
+        if claimed != len(objects):
+            raise BatchError('version_conflict', status_code=status.HTTP_409_CONFLICT)
+        for obj in objects:
+            obj.version += 1
+
+    def _save(self):
+        # Змінюються лише картки з операцій - вони завантажені повністю, тож один bulk_update
+        changed = [self.cards[card_id] for card_id in self._changed_card_ids()]
+        if changed:
+            self._claim_versions(Card, changed)
+            fields = {field for fields in self.dirty_fields.values() for field in fields}
+            if self.positioned:
+                fields.update(('list', 'position'))
+            if 'is_archived' in fields:
+                fields.add('archived_at')
+            if fields:
+                Card.objects.bulk_update(changed, sorted(fields))
+        positioned = [self.cards[card_id] for card_id in self.positioned]
+        for list_id in {card.list_id for card in positioned if needs_rebalance(card.position)}:
+            transaction.on_commit(lambda list_id=list_id: rebalance(Card, {'list_id': list_id}))
+
+        self._save_pairs(CardLabel, 'label_id', self.original_labels, self.card_labels)
+        self._save_pairs(CardMember, 'user_id', self.original_members, self.card_members)
+
+        if self.moved_lists:
+            moved = [self.lists[list_id] for list_id in self.moved_lists]
+            self._claim_versions(List, moved)
+            List.objects.bulk_update(moved, ['position'])
+            if any(needs_rebalance(item.position) for item in moved):
+                transaction.on_commit(lambda: rebalance(List, {'board_id': self.board.id}))
+
+    def _save_pairs(self, model, field, before, after):
+        to_create, to_delete = [], Q()
+        for card_id, current in after.items():
+            added = current - before[card_id]
+            removed = before[card_id] - current
+            to_create.extend(model(card_id=card_id, **{field: value}) for value in added)
+            if removed:
+                to_delete |= Q(card_id=card_id, **{f'{field}__in': removed})
+        if to_delete:
+            model.objects.filter(to_delete).delete()
+        if to_create:
+            model.objects.bulk_create(to_create, ignore_conflicts=True)
+
+    # Результат
+
+    def diff(self):
+        card_ids = self._changed_card_ids()
+        ranks = {}
+        for sequence in self.sequences.values():
+            ranks.update(_ranks(sequence, lambda card_id: self.cards[card_id].is_archived))
+        cards = []
+        for card_id in sorted(card_ids):
+            card = self.cards[card_id]
+            entry = {'id': card_id, 'version': card.version}
+            fields = self.dirty_fields.get(card_id, set())
+            if card_id in self.positioned:
+                entry['list'] = card.list_id
+                entry['order'] = ranks[card_id]
+                entry['position'] = card.position
+            for field in fields - {'list'}:
+                value = getattr(card, field)
+                entry[field] = value.isoformat() if field == 'due_date' and value else value
+            if card_id in self.card_labels and self.card_labels[card_id] != self.original_labels[card_id]:
+                entry['label_ids'] = sorted(self.card_labels[card_id])
+            if card_id in self.card_members and self.card_members[card_id] != self.original_members[card_id]:
+                entry['member_ids'] = sorted(self.card_members[card_id])
+            cards.append(entry)
+        list_ranks = _ranks([item.id for item in self.list_sequence], lambda list_id: self.lists[list_id].is_archived)
+        lists = [
+            {
+                'id': list_id,
+                'order': list_ranks[list_id],
+                'position': self.lists[list_id].position,
+                'version': self.lists[list_id].version,
+            }
+            for list_id in sorted(self.moved_lists)
+        ]
+        return {'board_id': self.board.id, 'cards': cards, 'lists': lists}
+
+    def run(self):
+        with transaction.atomic():
+            self._load()
+            self._apply()
+            self._save()
+            diff = self.diff()
+            log_activity(self.user, 'batch_update', 'board', self.board.id, {
+                'board_id': self.board.id,
+                'board_title': self.board.title,
+                'operations': [op['op'] for op in self.operations],
+                'card_ids': [entry['id'] for entry in diff['cards']][:50],
+                'cards_count': len(diff['cards']),
+            })
+            transaction.on_commit(lambda: self._broadcast(diff))
+        for card_id, fields in self.dirty_fields.items():
+            if fields & {'list', 'is_archived'}:
+                index_card(self.cards[card_id])
+        return diff
+
+    def _broadcast(self, diff):
+        """
+        Одна подія для публічних карток; приватні картки йдуть окремо лише
+        тим, хто їх бачить (як і toggle_public).
+        """
+        private_ids = {entry['id'] for entry in diff['cards'] if not self.cards[entry['id']].is_public}
+        public_cards = [entry for entry in diff['cards'] if entry['id'] not in private_ids]
+        if public_cards or diff['lists']:
+            broadcast_board_event(self.board.id, BATCH_ACTION, {**diff, 'cards': public_cards}, sender_id=self.user.id)
+        for entry in diff['cards']:
+            if entry['id'] in private_ids:
+                audience, user_ids = card_audience(self.cards[entry['id']])
+                broadcast_board_event(
+                    self.board.id, BATCH_ACTION, {**diff, 'cards': [entry], 'lists': []},
+                    sender_id=self.user.id, audience=audience, user_ids=user_ids,
+                )
+
+
+def apply_batch(user, board, operations):
+    return BoardBatch(user, board, operations).run()
@@ -0,0 +1,261 @@
+"""
+Календар термінів: GET /api/calendar/?from=2026-10-01&to=2026-10-31&boards=1,2&tz=Europe/Kyiv.
+
+Межі - дати в часовому поясі клієнта (tz, за замовчуванням TIME_ZONE).
+Вони переводяться в півінтервал [початок from, початок дня після to) з
+часовим поясом, тож фільтр - due_date >= ? AND due_date < ? по самій
+колонці, без приведення до дати: його обслуговує частковий індекс
+core_card_due_idx (лише активні картки з терміном).
+
+Охоплює всі доступні дошки (або підмножину boards) одним запитом і
+повертає мінімальну проєкцію карток, згруповану за днями.
+
+Стрічка iCalendar (/api/calendar/feed/<token>.ics) - той самий запит у вікні
+FEED_PAST_DAYS..FEED_FUTURE_DAYS, що віддається потоком пачками карток.
+Календарні програми опитують її кожні кілька хвилин, тому ETag рахується
+агрегатами (version, updated_at карток, списків і дошок) без читання карток,
+і більшість опитувань закінчується 304. Last-Modified стрічка не віддає:
+видалена чи знята з вибірки картка не пересуває жодної дати, і клієнт з
+If-Modified-Since назавжди лишився б зі старою подією.
+"""
+import hashlib
+import secrets
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Exists, Max, OuterRef, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from core.models import Board, Card, CardMember, List, Membership, Profile
+
+MAX_RANGE_DAYS = 93
+MAX_CARDS = 2000
+FEED_PAST_DAYS = 30
+FEED_FUTURE_DAYS = 365
+FEED_SCOPES = ('assigned', 'all')
+FEED_CHUNK_SIZE = 500
+FEED_FIELDS = ('id', 'title', 'due_date', 'is_completed', 'version', 'updated_at', 'list__title', 'list__board__title')
+CARD_FIELDS = ('id', 'title', 'due_date', 'is_completed', 'card_color', 'list_id', 'list__board_id')
+
+
+def parse_timezone(value):
+    if not value:
+        return timezone.get_current_timezone()
+    try:
+        return ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError({'detail': 'invalid_tz'})
+
+
+def parse_range(date_from, date_to, tz):
+    """
+    (start, end) - aware datetime для дат from..to включно в поясі tz.
+    """
+    try:
+        start_date = parse_date(date_from or '')
+        end_date = parse_date(date_to or '')
+    except ValueError:
+        raise ValidationError({'detail': 'invalid_date'})
+    if not start_date or not end_date:
+        raise ValidationError({'detail': 'from_to_required'})
+    if end_date < start_date:
+        raise ValidationError({'detail': 'invalid_range'})
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        raise ValidationError({'detail': 'range_too_long', 'max_days': MAX_RANGE_DAYS})
+    start = datetime.combine(start_date, time.min, tzinfo=tz)
+    end = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=tz)
+    return start, end
+
+
+def parse_board_ids(value):
+    if not value:
+        return None
+    try:
+        return {int(item) for item in str(value).split(',') if item.strip()}
+    except ValueError:
+        raise ValidationError({'detail': 'invalid_boards'})
+
+
+def accessible_boards(user, board_ids=None):
+    """
+    {id: title} активних дошок користувача та множина id дошок, де він адмін.
+    """
+    boards = Board.objects.filter(Q(owner=user) | Q(members=user), is_archived=False, pending_delete=False)
+    if board_ids is not None:
+        boards = boards.filter(id__in=board_ids)
+    titles = dict(boards.distinct().values_list('id', 'title'))
+    admin_ids = set(Board.objects.filter(owner=user, id__in=titles).values_list('id', flat=True))
+    admin_ids.update(Membership.objects.filter(user=user, role='admin', board_id__in=titles).values_list('board_id', flat=True))
+    return titles, admin_ids
+
+
+def due_cards(user, start, end, board_ids, admin_ids, assigned=False):
+    """
+    Активні картки з терміном у [start, end) на дошках board_ids. Приватні -
+    лише для адмінів дошки та учасників картки; assigned - лише призначені user.
+    """
+    membership = Exists(CardMember.objects.filter(card_id=OuterRef('pk'), user_id=user.id))
+    queryset = Card.objects.filter(
+        due_date__gte=start, due_date__lt=end, is_archived=False,
+        list__is_archived=False, list__board_id__in=board_ids,
+    )
+    if assigned:
+        queryset = queryset.filter(membership)
+    else:
+        queryset = queryset.filter(Q(is_public=True) | Q(list__board_id__in=admin_ids) | membership)
+    return queryset.order_by('due_date', 'id')
+
+
+def calendar(user, date_from, date_to, boards=None, tz=None, assigned=False):
+    tz = parse_timezone(tz)
+    start, end = parse_range(date_from, date_to, tz)
+    titles, admin_ids = accessible_boards(user, parse_board_ids(boards))
+    rows = list(due_cards(user, start, end, list(titles), admin_ids, assigned).values(*CARD_FIELDS)[:MAX_CARDS + 1])
+
+    days = {}
+    for row in rows[:MAX_CARDS]:
+        due = timezone.localtime(row['due_date'], tz)
+        days.setdefault(due.date().isoformat(), []).append({
+            'id': row['id'],
+            'title': row['title'],
+            'due_date': due.isoformat(),
+            'is_completed': row['is_completed'],
+            'card_color': row['card_color'],
+            'board': row['list__board_id'],
+            'list': row['list_id'],
+        })
+    return {
+        'from': start.date().isoformat(),
+        'to': (end - timedelta(days=1)).date().isoformat(),
+        'tz': str(tz),
+        'boards': [{'id': board_id, 'title': title} for board_id, title in sorted(titles.items())],
+        'days': [{'date': day, 'cards': cards} for day, cards in days.items()],
+        'truncated': len(rows) > MAX_CARDS,
+    }
+
+
+def feed_token(user, rotate=False):
+    """
+    Токен .ics-стрічки користувача; створюється при першому запиті,
+    rotate=True видає новий (старе посилання перестає працювати).
+    """
+    profile, _ = Profile.objects.get_or_create(user=user)
+    if rotate or not profile.calendar_token:
+        profile.calendar_token = secrets.token_hex(20)
+        profile.save(update_fields=['calendar_token'])
+    return profile.calendar_token
+
+
+def feed_user(token):
+    profile = Profile.objects.filter(calendar_token=token, user__is_active=True).select_related('user').first() if token else None
+    return profile.user if profile else None
+
+
+def feed_cards(user, scope='assigned'):
+    """
+    Картки стрічки: призначені користувачу (assigned) або всі видимі йому
+    на його дошках (all), з терміном у вікні навколо сьогодні.
+    Повертає (queryset, id дошок).
+    """
+    today = datetime.combine(timezone.localdate(), time.min, tzinfo=timezone.get_current_timezone())
+    start = today - timedelta(days=FEED_PAST_DAYS)
+    end = today + timedelta(days=FEED_FUTURE_DAYS)
+    titles, admin_ids = accessible_boards(user)
+    board_ids = list(titles)
+    return due_cards(user, start, end, board_ids, admin_ids, assigned=scope == 'assigned'), board_ids
+
+
+def feed_etag(scope, queryset, board_ids):
+    """
+    ETag стрічки з двох агрегатів, без читання карток. Картки: кількість,
+    сума version, максимуми id та updated_at - видалення, зняття з вибірки
+    й будь-який запис картки їх змінюють. Назви списків і дошок теж
+    потрапляють у стрічку, тому враховується їхній найпізніший updated_at.
+    """
+    cards = queryset.order_by().aggregate(
+        count=Count('id'), total=Sum('version'), last=Max('id'), updated=Max('updated_at'),
+    )
+    containers = List.objects.filter(board_id__in=board_ids).aggregate(
+        lists=Max('updated_at'), boards=Max('board__updated_at'),
+    )
+    digest = hashlib.sha1(repr((sorted(cards.items()), sorted(containers.items()))).encode()).hexdigest()[:16]
+    return f'"{scope}-{digest}"'
+
+
+def _ics_escape(value):
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n').replace('\r', '')
+
+
+def _ics_line(line):
+    """
+    Рядок iCalendar, згорнутий по 75 байт (RFC 5545, 3.1), з CRLF.
+    """
+    data = line.encode('utf-8')
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        # Не розрізаємо багатобайтовий символ UTF-8
+        while cut and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut])
+        data = data[cut:]
+    parts.append(data)
+    return b'\r\n '.join(parts) + b'\r\n'
+
+
+def _ics_time(value):
+    return value.astimezone(ZoneInfo('UTC')).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _ics_event(row, stamp):
+    due = _ics_time(row['due_date'])
+    title = f"\u2713 {row['title']}" if row['is_completed'] else row['title']
+    # Без DTEND: DTSTART-дата й час без тривалості - подія-момент (RFC 5545, 3.6.1)
+    return b''.join(_ics_line(line) for line in (
+        'BEGIN:VEVENT',
+        f"UID:card-{row['id']}@boardly",
+        f"SEQUENCE:{row['version']}",
+        f'DTSTAMP:{stamp}',
+        f"LAST-MODIFIED:{_ics_time(row['updated_at'])}",
+        f'DTSTART:{due}',
+        f'SUMMARY:{_ics_escape(title)}',
+        f"DESCRIPTION:{_ics_escape(row['list__board__title'] + ' / ' + row['list__title'])}",
+        'END:VEVENT',
+    ))
+
+
+def _feed_chunk(queryset, after):
+    """
+    Наступні FEED_CHUNK_SIZE карток після (due_date, id) - keyset, а не
+    курсор: кожна пачка - окремий запит, який можна виконати в будь-якому потоці.
+    """
+    if after is not None:
+        due, card_id = after
+        queryset = queryset.filter(Q(due_date__gt=due) | Q(due_date=due, id__gt=card_id))
+    return list(queryset.values(*FEED_FIELDS)[:FEED_CHUNK_SIZE])
+
+
+async def ics_stream(queryset, name='Boardly'):
+    """
+    Асинхронний генератор байтів .ics. Під ASGI StreamingHttpResponse
+    споживає його напряму, тож у пам'яті лише одна пачка з FEED_CHUNK_SIZE
+    карток (синхронний ітератор Django спершу зібрав би в list увесь документ).
+    Кожна картка стає одним VEVENT.
+    """
+    stamp = _ics_time(timezone.now())
+    yield b''.join(_ics_line(line) for line in (
+        'BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//Boardly//Due dates//UK', 'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH', f'X-WR-CALNAME:{_ics_escape(name)}',
+    ))
+    after = None
+    while True:
+        rows = await sync_to_async(_feed_chunk)(queryset, after)
+        if rows:
+            yield b''.join(_ics_event(row, stamp) for row in rows)
+        if len(rows) < FEED_CHUNK_SIZE:
+            break
+        after = (rows[-1]['due_date'], rows[-1]['id'])
+    yield _ics_line('END:VCALENDAR')
@@ -0,0 +1,79 @@
+"""
+Масове створення карток: POST /api/lists/{id}/cards/bulk/ (вставка
+списку рядків - по картці на рядок).
+
+Права перевіряються один раз; ключі порядку для всіх карток рахуються
+з одного проміжку (keys_between), картки й призначення автора пишуться
+двома bulk_create (стандартний чек-лист віртуальний, core.services.checklists).
+Один запис в історії та одна подія board_updated після коміту.
+"""
+from django.db import transaction
+from rest_framework.exceptions import PermissionDenied, ValidationError
+
+from core.models import Card, CardMember
+from core.services.activity_logger import log_activity
+from core.services.copying import bulk_insert
+from core.services.ordering import keys_between, neighbours_at, schedule_rebalance
+from core.services.permissions import can_create_card
+from core.services.prefix_index import index_card
+from core.services.search import reindex_cards
+
+MAX_BULK_CARDS = 500
+TITLE_MAX_LENGTH = Card._meta.get_field('title').max_length
+BULK_CREATE_ACTION = 'board/bulkCreateCards/fulfilled'
+
+
+def parse_titles(data):
+    """
+    Назви карток з {"titles": [...]} або {"text": "рядок\\nрядок"}; порожні рядки пропускаються.
+    """
+    titles = data.get('titles')
+    if titles is None:
+        text = data.get('text')
+        if not isinstance(text, str):
+            raise ValidationError({'detail': 'titles_required'})
+        titles = text.splitlines()
+    if not isinstance(titles, list) or not all(isinstance(title, str) for title in titles):
+        raise ValidationError({'detail': 'titles_must_be_strings'})
+    titles = [title.strip() for title in titles if title.strip()]
+    if not titles:
+        raise ValidationError({'detail': 'titles_required'})
+    if len(titles) > MAX_BULK_CARDS:
+        raise ValidationError({'detail': 'too_many_cards', 'max': MAX_BULK_CARDS})
+    if any(len(title) > TITLE_MAX_LENGTH for title in titles):
+        raise ValidationError({'detail': 'title_too_long', 'max': TITLE_MAX_LENGTH})
+    return titles
+
+
+def create_cards(user, list_obj, titles, index=None):
+    """
+    Створює картки з назвами titles підряд, починаючи з 1-based місця index
+    (None - у кінець списку). Повертає створені картки в порядку titles.
+    """
+    if not can_create_card(user, list_obj):
+        raise PermissionDenied('Only admins or allowed developers can create cards in this list.')
+    container = {'list_id': list_obj.id}
+    with transaction.atomic():
+        before, after = neighbours_at(Card, container, index)
+        keys = keys_between(before, after, len(titles))
+        cards = bulk_insert(Card, [
+            Card(list=list_obj, title=title, position=key) for title, key in zip(titles, keys)
+        ])
+        # Як і для однієї картки: автор призначений, щоб "Мої картки" не були порожні
+        CardMember.objects.bulk_create([CardMember(card=card, user=user) for card in cards])
+        schedule_rebalance(Card, container, max(keys, key=len))
+
+        card_ids = [card.id for card in cards]
+        reindex_cards(card_ids)
+        log_activity(user, 'bulk_create_cards', 'list', list_obj.id, {
+            'list': list_obj.id,
+            'list_title': list_obj.title,
+            'board_id': list_obj.board_id,
+            'board_title': list_obj.board.title,
+            'title': list_obj.title,
+            'card_ids': card_ids[:50],
+            'cards_count': len(cards),
+        })
+    for card in cards:
+        index_card(card)
+    return cards
@@ -0,0 +1,176 @@
+"""
+Легкий шлях перетягування картки: POST /api/cards/{id}/move/.
+
+Клієнт передає цільовий список і сусідів після переміщення:
+  before_id - картка, що опиниться безпосередньо вище;
+  after_id  - картка, що опиниться безпосередньо нижче.
+Можна передати одного сусіда (другий визначається сервером) або жодного
+(картка йде в кінець списку).
+
+Один SELECT читає все потрібне: роль користувача на дошці, призначення на
+картку, цільовий список, ключі сусідів і номер нового місця. Далі - один
+умовний UPDATE (list, position, version) WHERE version = прочитаній.
+Відповідь - лише {id, list, order, version}.
+"""
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+
+from core.models import Card, CardMember, List, Membership
+from core.services.activity_logger import log_activity
+from core.services.ordering import MAX_MOVE_ATTEMPTS, PositionConflict, key_between, schedule_rebalance
+from core.services.prefix_index import index_card
+
+
+def _optional_id(value, name):
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({'detail': f'invalid_{name}'})
+
+
+def _count(queryset):
+    counted = queryset.order_by().values('list_id').annotate(total=Count('id')).values('total')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def _neighbour(card_id, list_id):
+    return Card.objects.filter(id=card_id, list_id=list_id).exclude(id=OuterRef('id'))
+
+
+def _annotations(user, list_id, before_id, after_id):
+    # Активні картки цільового списку без самої картки (підзапити першого рівня)
+    siblings = Card.objects.filter(list_id=list_id, is_archived=False).exclude(id=OuterRef('id'))
+    target = List.objects.filter(id=list_id, board__pending_delete=False)
+    annotations = {
+        'board_id': F('list__board_id'),
+        'owner_id': F('list__board__owner_id'),
+        'dev_can_edit_assigned_cards': F('list__board__dev_can_edit_assigned_cards'),
+        'dev_can_create_cards': F('list__board__dev_can_create_cards'),
+        'member_role': Subquery(
+            Membership.objects.filter(board_id=OuterRef('list__board_id'), user_id=user.id).values('role')[:1]
+        ),
+        'is_assigned': Exists(CardMember.objects.filter(card_id=OuterRef('id'), user_id=user.id)),
+        'board_title': F('list__board__title'),
+        'target_board_id': Subquery(target.values('board_id')[:1]),
+        'target_title': Subquery(target.values('title')[:1]),
+        'target_allow_dev': Subquery(target.values('allow_dev_add_cards')[:1]),
+    }
+    if before_id:
+        before_position = Subquery(_neighbour(before_id, list_id).values('position')[:1])
+        annotations['before_position'] = before_position
+        # Номер місця: усі активні сусіди до before включно
+        annotations['rank_before'] = _count(siblings.filter(
+            Q(position__lt=OuterRef('before_position'))
+            | Q(position=OuterRef('before_position'), id__lte=before_id)
+        ))
+    if after_id:
+        annotations['after_position'] = Subquery(_neighbour(after_id, list_id).values('position')[:1])
+    if before_id and not after_id:
+        annotations['after_position'] = Subquery(
+            siblings.filter(
+                Q(position__gt=OuterRef('before_position'))
+                | Q(position=OuterRef('before_position'), id__gt=before_id)
+            ).order_by('position', 'id').values('position')[:1]
+        )
+    if after_id and not before_id:
+        after_filter = (
+            Q(position__lt=OuterRef('after_position'))
+            | Q(position=OuterRef('after_position'), id__lt=after_id)
+        )
+        annotations['before_position'] = Subquery(
+            siblings.filter(after_filter).order_by('-position', '-id').values('position')[:1]
+        )
+        annotations['rank_before'] = _count(siblings.filter(after_filter))
+    if not before_id and not after_id:
+        annotations['before_position'] = Subquery(siblings.order_by('-position', '-id').values('position')[:1])
+        annotations['rank_before'] = _count(siblings)
+    return annotations
+
+
+def _can_move(user, row):
+    role = 'owner' if row['owner_id'] == user.id else row['member_role']
+    if role in ('owner', 'admin'):
+        return True
+    if role != 'developer':
+        return False
+    if not (row['dev_can_edit_assigned_cards'] and row['dev_can_create_cards']):
+        return False
+    return row['is_assigned'] and row['target_allow_dev']
+
+
+def move_card(user, card_id, list_id, before_id=None, after_id=None):
+    card_id = _optional_id(card_id, 'card')
+    list_id = _optional_id(list_id, 'list')
+    before_id = _optional_id(before_id, 'before_id')
+    after_id = _optional_id(after_id, 'after_id')
+    if list_id is None:
+        raise ValidationError({'detail': 'list_required'})
+    if card_id in (before_id, after_id):
+        raise ValidationError({'detail': 'invalid_neighbours'})
+
+    # Умовний UPDATE за версією; якщо картку щойно змінили - читаємо заново і повторюємо
+    for _ in range(MAX_MOVE_ATTEMPTS):
+        result = _try_move(user, card_id, list_id, before_id, after_id)
+        if result is not None:
+            return result
+    raise PositionConflict()
+
+
+def _try_move(user, card_id, list_id, before_id, after_id):
+    annotations = _annotations(user, list_id, before_id, after_id)
+    row = (
+        Card.objects.filter(id=card_id, list__board__pending_delete=False)
+        .annotate(**annotations)
+        .values('id', 'title', 'list_id', 'is_public', 'is_archived', 'version', *annotations)
+        .first()
+    )
+    if row is None or (row['owner_id'] != user.id and row['member_role'] is None):
+        raise NotFound()
+    if row['target_board_id'] != row['board_id']:
+        raise ValidationError({'detail': 'list_not_found'})
+    if not _can_move(user, row):
+        raise PermissionDenied('Only admins or allowed developers can move cards to this list.')
+    if before_id and row['before_position'] is None:
+        raise ValidationError({'detail': 'before_not_found'})
+    if after_id and row['after_position'] is None:
+        raise ValidationError({'detail': 'after_not_found'})
+
+    before_position, after_position = row['before_position'], row.get('after_position')
+    if before_id and after_id and before_position > after_position:
+        raise ValidationError({'detail': 'invalid_neighbours'})
+    position = key_between(before_position, after_position)
+
+    # Дошку могли поставити в чергу на видалення після SELECT - тоді UPDATE нічого не змінить
+    updated = Card.objects.filter(id=card_id, version=row['version'], list__board__pending_delete=False).update(
+        list_id=list_id, position=position, version=F('version') + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        return None
+    schedule_rebalance(Card, {'list_id': list_id}, position)
+
+    if row['list_id'] != list_id:
+        # Для індексу достатньо даних із SELECT: без повторного читання картки
+        index_card(Card(
+            id=card_id, title=row['title'], is_public=row['is_public'], is_archived=row['is_archived'],
+            list=List(id=list_id, board_id=row['board_id']),
+        ))
+        log_activity(user, 'move_card', 'card', card_id, {
+            'from_list': row['list_id'],
+            'to_list': list_id,
+            'to_list_title': row['target_title'],
+            'board_id': row['board_id'],
+            'board_title': row['board_title'],
+            'card_id': card_id,
+            'title': row['title'],
+        })
+
+    return {
+        'id': card_id,
+        'list': list_id,
+        'order': row['rank_before'] + 1,
+        'version': row['version'] + 1,
+    }
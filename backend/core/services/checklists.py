@@ -0,0 +1,48 @@
+"""
+Стандартний чек-лист картки без рядка в базі.
+
+Картка без жодного чек-листа віддається в API з віртуальним чек-листом
+{id: -<id картки>, title: 'Чек-лист', items: []}. Рядок Checklist
+з'являється лише тоді, коли в нього додають перший пункт
+(POST /api/checklist-items/ з checklist = від'ємний id).
+
+DELETE /api/checklists/<від'ємний id>/ прибирає віртуальний чек-лист, а
+видалення останнього справжнього не повертає його: обидва знімають
+Card.show_default_checklist.
+"""
+from django.db import transaction
+
+from core.models import Card, Checklist
+
+DEFAULT_CHECKLIST_TITLE = 'Чек-лист'
+
+
+def virtual_checklist_id(card_id):
+    return -card_id
+
+
+def default_checklists(card):
+    """
+    [віртуальний чек-лист] для картки, яка його ще показує, інакше [].
+    """
+    if not card.show_default_checklist:
+        return []
+    return [{'id': virtual_checklist_id(card.id), 'title': DEFAULT_CHECKLIST_TITLE, 'items': []}]
+
+
+def dismiss_default_checklist(card_id):
+    Card.objects.filter(id=card_id, show_default_checklist=True).update(show_default_checklist=False)
+
+
+def materialize_default_checklist(card):
+    """
+    Перший чек-лист картки або новий стандартний. Рядок картки блокується,
+    щоб два одночасні перші пункти не створили два чек-листи.
+    """
+    with transaction.atomic():
+        Card.objects.select_for_update().filter(id=card.id).values_list('id', flat=True).first()
+        checklist = Checklist.objects.filter(card_id=card.id).order_by('id').first()
+        if checklist is None:
+            checklist = Checklist.objects.create(card=card, title=DEFAULT_CHECKLIST_TITLE)
+        dismiss_default_checklist(card.id)
+    return checklist
@@ -0,0 +1,222 @@
+"""
+Холодне сховище архівних карток.
+
+Картки, що пробули в архіві довше за CARD_COLD_STORAGE_DAYS, команда
+archive_cold_cards переносить пачками в ArchivedCard: по рядку на картку
+з колонками для перегляду/пошуку та payload - рядками картки, чек-листів,
+пунктів, міток, учасників, коментарів і вкладень (формат серіалізатора
+Django). Гарячі таблиці після цього містять лише поточну роботу.
+
+Відновлення (restore_cards) вставляє ті самі рядки з тими самими id -
+по одному bulk_create на таблицю; учасники й мітки, яких уже немає,
+пропускаються.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+
+from core.models import ArchivedCard, Attachment, Card, CardLabel, CardMember, Checklist, ChecklistItem, Comment, Label
+from core.services.activity_logger import log_activity
+from core.services.permissions import ensure_board_admin, is_board_admin, is_board_developer
+from core.services.prefix_index import invalidate_board
+from core.services.realtime import broadcast_board_event
+from core.services.search import reindex_cards
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+RESTORE_ACTION = 'board/restoreArchivedCards/fulfilled'
+
+# Порядок вставки при відновленні: батьківські таблиці перед дочірніми
+RESTORE_ORDER = (Card, Checklist, ChecklistItem, CardLabel, CardMember, Comment, Attachment)
+
+
+def cold_candidates(days=None, board_id=None):
+    """
+    Архівні картки, старші за days (за замовчуванням CARD_COLD_STORAGE_DAYS).
+    Картки без archived_at архівовані до появи цього поля - вони вважаються старими.
+    """
+    days = settings.CARD_COLD_STORAGE_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    queryset = Card.objects.filter(is_archived=True).filter(Q(archived_at__lt=cutoff) | Q(archived_at__isnull=True))
+    if board_id:
+        queryset = queryset.filter(list__board_id=board_id)
+    return queryset
+
+
+def freeze_cards(card_ids):
+    """
+    Переносить архівні картки card_ids у ArchivedCard і видаляє їх із гарячих
+    таблиць. Одна транзакція, по запиту на таблицю. Повертає кількість карток.
+    """
+    with transaction.atomic():
+        cards = list(
+            Card.objects.select_for_update().filter(id__in=card_ids, is_archived=True)
+            .select_related('list').order_by('id')
+        )
+        if not cards:
+            return 0
+        ids = [card.id for card in cards]
+        owned = [(card.id, card) for card in cards]
+        checklists = list(Checklist.objects.filter(card_id__in=ids).order_by('id'))
+        owned += [(checklist.card_id, checklist) for checklist in checklists]
+        owned += [
+            (item.checklist.card_id, item)
+            for item in ChecklistItem.objects.filter(checklist__card_id__in=ids).select_related('checklist').order_by('id')
+        ]
+        for model in (CardLabel, CardMember, Comment, Attachment):
+            owned += [(row.card_id, row) for row in model.objects.filter(card_id__in=ids).order_by('id')]
+
+        payloads = {card_id: [] for card_id in ids}
+        members = {card_id: [] for card_id in ids}
+        rows = json.loads(serializers.serialize('json', [row for _, row in owned]))
+        for (card_id, row), data in zip(owned, rows):
+            payloads[card_id].append(data)
+            if isinstance(row, CardMember):
+                members[card_id].append(row.user_id)
+
+        ArchivedCard.objects.bulk_create([
+            ArchivedCard(
+                id=card.id, board_id=card.list.board_id, list_id=card.list_id, title=card.title,
+                description=card.description, is_public=card.is_public, member_ids=members[card.id],
+                archived_at=card.archived_at, payload=payloads[card.id],
+            )
+            for card in cards
+        ])
+        # Дочірні рядки та пошукові документи йдуть каскадом у межах пачки
+        Card.objects.filter(id__in=ids).delete()
+    return len(cards)
+
+
+def restore_cards(card_ids):
+    """
+    Повертає картки card_ids з ArchivedCard у гарячі таблиці (картки лишаються
+    архівними - розархівовує викликач). Повертає id відновлених карток.
+    """
+    with transaction.atomic():
+        archived = list(ArchivedCard.objects.select_for_update().filter(id__in=card_ids))
+        if not archived:
+            return []
+        rows = {model: [] for model in RESTORE_ORDER}
+        for entry in archived:
+            for obj in serializers.deserialize('python', entry.payload, ignorenonexistent=True):
+                rows[type(obj.object)].append(obj.object)
+
+        user_ids = {row.user_id for row in rows[CardMember]} | {row.author_id for row in rows[Comment]}
+        users = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+        labels = set(Label.objects.filter(id__in={row.label_id for row in rows[CardLabel]}).values_list('id', flat=True))
+        rows[CardMember] = [row for row in rows[CardMember] if row.user_id in users]
+        rows[Comment] = [row for row in rows[Comment] if row.author_id in users]
+        rows[CardLabel] = [row for row in rows[CardLabel] if row.label_id in labels]
+
+        for model in RESTORE_ORDER:
+            _insert(model, rows[model])
+        ArchivedCard.objects.filter(id__in=[entry.id for entry in archived]).delete()
+        restored = [card.id for card in rows[Card]]
+        reindex_cards(restored)
+    return restored
+
+
+def _insert(model, objects):
+    """
+    bulk_create зі збереженням id і дат: auto_now_add поля перезаписуються
+    при вставці, тому повертаються окремим bulk_update.
+    """
+    if not objects:
+        return
+    stamped = [field.attname for field in model._meta.concrete_fields if getattr(field, 'auto_now_add', False)]
+    stamps = [[getattr(obj, name) for name in stamped] for obj in objects]
+    model.objects.bulk_create(objects, batch_size=DEFAULT_BATCH_SIZE)
+    if stamped:
+        for obj, values in zip(objects, stamps):
+            for name, value in zip(stamped, values):
+                setattr(obj, name, value)
+        model.objects.bulk_update(objects, stamped, batch_size=DEFAULT_BATCH_SIZE)
+
+
+def restore_for_edit(user, card_id):
+    """
+    Повертає з холодного сховища картку, яку user редагує (PUT/PATCH): права
+    ті ж, що й can_edit_card, але перевіряються за рядком ArchivedCard до
+    відновлення. False - такої картки в архіві доступних дошок немає.
+    """
+    entry = ArchivedCard.objects.filter(
+        Q(board__owner=user) | Q(board__members=user), board__pending_delete=False, id=card_id,
+    ).select_related('board').defer('payload').first()
+    if entry is None:
+        return False
+    board = entry.board
+    if not is_board_admin(user, board) and not (
+        is_board_developer(user, board) and board.dev_can_edit_assigned_cards and user.id in entry.member_ids
+    ):
+        raise PermissionDenied('Only card members or admins can update cards.')
+    return bool(restore_cards([entry.id]))
+
+
+def unarchive_cards(user, board, card_ids):
+    """
+    Відновлює картки дошки з холодного сховища й розархівовує їх (лише адмін).
+    Повертає id відновлених карток.
+    """
+    ensure_board_admin(user, board, 'Only admins can restore archived cards.')
+    card_ids = list(ArchivedCard.objects.filter(board=board, id__in=card_ids).values_list('id', flat=True))
+    with transaction.atomic():
+        restored = restore_cards(card_ids)
+        Card.objects.filter(id__in=restored).update(
+            is_archived=False, archived_at=None, version=F('version') + 1, updated_at=timezone.now(),
+        )
+        if restored:
+            log_activity(user, 'restore_archived_cards', 'board', board.id, {
+                'board_id': board.id,
+                'board_title': board.title,
+                'title': board.title,
+                'card_ids': restored[:50],
+                'cards_count': len(restored),
+            })
+            transaction.on_commit(lambda: broadcast_board_event(
+                board.id, RESTORE_ACTION, {'board': board.id, 'cards': restored}, sender_id=user.id,
+            ))
+    invalidate_board(board.id)
+    return restored
+
+
+def browse(user, board, query='', list_id=None, limit=DEFAULT_LIMIT, offset=0):
+    """
+    Сторінка холодного архіву дошки (новіші першими), з пошуком за назвою й
+    описом. Приватні картки бачать адміни дошки та учасники картки.
+    """
+    queryset = ArchivedCard.objects.filter(board=board).select_related('list').defer('payload', 'description')
+    if query:
+        queryset = queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
+    if list_id:
+        queryset = queryset.filter(list_id=list_id)
+    if not is_board_admin(user, board):
+        # Приватних карток в архіві мало порівняно з публічними - учасників перевіряємо в Python
+        private = ArchivedCard.objects.filter(board=board, is_public=False).values_list('id', 'member_ids')
+        visible = [card_id for card_id, member_ids in private if user.id in member_ids]
+        queryset = queryset.filter(Q(is_public=True) | Q(id__in=visible))
+    page = list(queryset[offset:offset + limit + 1])
+    return {
+        'board': board.id,
+        'query': query,
+        'results': [
+            {
+                'id': entry.id,
+                'title': entry.title,
+                'list': entry.list_id,
+                'list_title': entry.list.title,
+                'is_public': entry.is_public,
+                'archived_at': entry.archived_at,
+                'stored_at': entry.stored_at,
+            }
+            for entry in page[:limit]
+        ],
+        'next_offset': offset + limit if len(page) > limit else None,
+    }
@@ -0,0 +1,126 @@
+"""
+Глибоке копіювання пачками: дошки (clone_board), картки, мітки карток,
+чек-листи, пункти.
+
+Джерело читається кількома запитами (по одному на рівень), кожен рівень
+пишеться одним bulk_create. Нові id беруться з bulk_create там, де база їх
+повертає (Postgres, SQLite 3.35+); інакше картки та чек-листи вставляються
+по одній, а решта рівнів - так само пачками.
+"""
+from django.db import connection, transaction
+
+from core.models import Board, Card, CardLabel, Checklist, ChecklistItem, Label, List, Membership
+from core.services.search import reindex_cards
+
+# Поля картки, що переносяться в копію (list і position задає викликач)
+CARD_FIELDS = (
+    'title', 'description', 'card_color', 'cover_size', 'due_date', 'is_completed', 'is_public', 'show_default_checklist',
+)
+BOARD_FIELDS = (
+    'description', 'background_url', 'dev_can_create_cards', 'dev_can_edit_assigned_cards',
+    'dev_can_archive_assigned_cards', 'dev_can_join_card', 'dev_can_create_lists',
+)
+BATCH_SIZE = 1000
+
+
+def bulk_insert(model, objects):
+    """
+    Вставляє objects і гарантує, що в них виставлені pk.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+    for obj in objects:
+        obj.save(force_insert=True)
+    return objects
+
+
+def card_copy(source, **overrides):
+    """
+    Незбережена копія картки source; overrides - list, position, title тощо.
+    """
+    values = {field: getattr(source, field) for field in CARD_FIELDS}
+    values.update(overrides)
+    return Card(**values)
+
+
+def copy_cards(pairs, label_map=None):
+    """
+    pairs - [(картка-джерело, незбережена копія)]. Створює копії разом з
+    мітками та чек-листами і повертає їх.
+
+    label_map - {id мітки джерела: id мітки цілі} для копій на іншу дошку;
+    мітки без відповідника пропускаються. None - мітки ті самі (та сама дошка).
+    """
+    if not pairs:
+        return []
+    copies = bulk_insert(Card, [copy for _, copy in pairs])
+    card_map = {source.id: copy.id for (source, _), copy in zip(pairs, copies)}
+
+    card_labels = []
+    for card_id, label_id in CardLabel.objects.filter(card_id__in=card_map).values_list('card_id', 'label_id'):
+        if label_map is not None:
+            label_id = label_map.get(label_id)
+        if label_id is not None:
+            card_labels.append(CardLabel(card_id=card_map[card_id], label_id=label_id))
+    CardLabel.objects.bulk_create(card_labels, batch_size=BATCH_SIZE)
+
+    sources = list(Checklist.objects.filter(card_id__in=card_map).order_by('id').values_list('id', 'card_id', 'title'))
+    checklists = bulk_insert(Checklist, [Checklist(card_id=card_map[card_id], title=title) for _, card_id, title in sources])
+    checklist_map = {source[0]: checklist.id for source, checklist in zip(sources, checklists)}
+
+    items = (
+        ChecklistItem.objects.filter(checklist_id__in=checklist_map)
+        .order_by('checklist_id', 'order', 'id')
+        .values_list('checklist_id', 'text', 'is_checked', 'order')
+    )
+    ChecklistItem.objects.bulk_create([
+        ChecklistItem(checklist_id=checklist_map[checklist_id], text=text, is_checked=is_checked, order=order)
+        for checklist_id, text, is_checked, order in items
+    ], batch_size=BATCH_SIZE)
+    return copies
+
+
+def clone_board(user, source, title=None, include_members=False):
+    """
+    Нова дошка користувача user з активних списків, міток і карток source
+    (мітки карток переназначаються на мітки нової дошки). include_members -
+    перенести учасників з їхніми ролями. Кожна таблиця - один bulk_create
+    в одній транзакції. Повертає (дошку, кількості створених рядків).
+    """
+    with transaction.atomic():
+        board = Board.objects.create(
+            owner=user, title=title or source.title, **{field: getattr(source, field) for field in BOARD_FIELDS}
+        )
+        memberships = [Membership(user=user, board=board, role='admin')]
+        if include_members:
+            memberships.extend(
+                Membership(user_id=user_id, board=board, role=role)
+                for user_id, role in Membership.objects.filter(board=source).exclude(user=user).values_list('user_id', 'role')
+            )
+        Membership.objects.bulk_create(memberships)
+
+        labels = list(Label.objects.filter(board=source).order_by('id'))
+        new_labels = bulk_insert(Label, [Label(board=board, name=label.name, color=label.color) for label in labels])
+        label_map = {label.id: new_label.id for label, new_label in zip(labels, new_labels)}
+
+        lists = list(List.objects.filter(board=source, is_archived=False).order_by('position', 'id'))
+        new_lists = bulk_insert(List, [
+            List(
+                board=board, title=list_obj.title, position=list_obj.position,
+                color=list_obj.color, allow_dev_add_cards=list_obj.allow_dev_add_cards,
+            )
+            for list_obj in lists
+        ])
+        list_map = {list_obj.id: new_list for list_obj, new_list in zip(lists, new_lists)}
+
+        cards = Card.objects.filter(list_id__in=list_map, is_archived=False).order_by('list_id', 'position', 'id')
+        copies = copy_cards([
+            (card, card_copy(card, list=list_map[card.list_id], position=card.position)) for card in cards
+        ], label_map)
+        reindex_cards([card.id for card in copies])
+    return board, {
+        'members': len(memberships),
+        'labels': len(new_labels),
+        'lists': len(new_lists),
+        'cards': len(copies),
+    }
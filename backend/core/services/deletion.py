@@ -0,0 +1,168 @@
+"""
+Відкладене видалення дошок і акаунтів (DeletionJob).
+
+DELETE /api/boards/{id}/ і DELETE /api/users/me/ лише ховають сутність
+(Board.pending_delete, User.is_active=False, токени видаляються) і ставлять
+завдання в чергу. Команда process_deletions видаляє рядки пачками по
+batch_size, від листових таблиць (пункти чек-листів, коментарі, призначення)
+до кореня, кожна пачка - окрема коротка транзакція. Замість одного каскаду
+на десятки тисяч рядків у пам'яті й під блокуванням - багато дрібних DELETE.
+
+Кроки ідемпотентні (видаляється те, що ще лишилось): завдання, перерване
+падінням, запускається знову - вже порожні кроки минають одним SELECT,
+а step і progress показують, де воно зупинилось.
+"""
+import logging
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.models import (
+    Activity, ActivityLog, ArchivedCard, Attachment, Board, Card, CardLabel, CardMember, CardSearchDocument,
+    Checklist, ChecklistItem, Comment, DeletionJob, Label, List, Membership,
+)
+from core.services.prefix_index import invalidate_board, invalidate_user
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# (крок, модель, фільтр за id дошки) - від листових таблиць до кореня
+BOARD_STEPS = (
+    ('checklist_items', ChecklistItem, 'checklist__card__list__board_id'),
+    ('checklists', Checklist, 'card__list__board_id'),
+    ('comments', Comment, 'card__list__board_id'),
+    ('attachments', Attachment, 'card__list__board_id'),
+    ('card_labels', CardLabel, 'card__list__board_id'),
+    ('card_members', CardMember, 'card__list__board_id'),
+    ('search_documents', CardSearchDocument, 'card__list__board_id'),
+    ('cards', Card, 'list__board_id'),
+    ('archived_cards', ArchivedCard, 'board_id'),
+    ('lists', List, 'board_id'),
+    ('labels', Label, 'board_id'),
+    ('activities', Activity, 'board_id'),
+    ('memberships', Membership, 'board_id'),
+    ('board', Board, 'id'),
+)
+
+# Спершу дошки власника (кожна - кроками BOARD_STEPS), далі рядки, що посилаються на користувача
+USER_STEPS = (
+    ('activity_logs', ActivityLog, 'user_id'),
+    ('comments', Comment, 'author_id'),
+    ('card_members', CardMember, 'user_id'),
+    ('memberships', Membership, 'user_id'),
+    ('user', User, 'id'),
+)
+
+
+def schedule_board_deletion(board):
+    """
+    Ховає дошку і ставить її видалення в чергу. Повертає DeletionJob.
+    """
+    with transaction.atomic():
+        Board.objects.filter(id=board.id).update(pending_delete=True)
+        job = _enqueue('board', board.id, board.title)
+    invalidate_board(board.id)
+    return job
+
+
+def schedule_user_deletion(user):
+    """
+    Деактивує користувача (вхід, токени, пошук), ховає його дошки і ставить
+    видалення акаунта в чергу. Повертає DeletionJob.
+    """
+    with transaction.atomic():
+        User.objects.filter(id=user.id).update(is_active=False)
+        Token.objects.filter(user_id=user.id).delete()
+        board_ids = list(Board.objects.filter(owner_id=user.id).values_list('id', flat=True))
+        Board.objects.filter(id__in=board_ids).update(pending_delete=True)
+        job = _enqueue('user', user.id, user.username)
+    invalidate_user(user.id)
+    for board_id in board_ids:
+        invalidate_board(board_id)
+    return job
+
+
+def _enqueue(kind, object_id, label):
+    job = DeletionJob.objects.filter(kind=kind, object_id=object_id).exclude(status='done').first()
+    if job is None:
+        job = DeletionJob.objects.create(kind=kind, object_id=object_id, label=label)
+    return job
+
+
+def job_summary(job):
+    return {
+        'job': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'step': job.step,
+        'deleted_rows': job.deleted_rows,
+    }
+
+
+def delete_in_batches(model, lookup, value, batch_size, on_batch=None):
+    """
+    Видаляє рядки model з lookup=value пачками по batch_size id.
+    Кожна пачка - своя транзакція; on_batch(кількість) викликається всередині неї.
+    """
+    total = 0
+    queryset = model.objects.filter(**{lookup: value}).order_by('pk')
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        with transaction.atomic():
+            # Дочірні таблиці вже порожні, тож каскад колектора тут лише перевіряє їх за id пачки
+            deleted = model.objects.filter(pk__in=ids).delete()[1].get(model._meta.label, 0)
+            # Прогрес пишеться в тій самій транзакції, що й пачка
+            if on_batch:
+                on_batch(deleted)
+        total += deleted
+
+
+def run_job(job, batch_size=DEFAULT_BATCH_SIZE, report=None):
+    """
+    Виконує (або продовжує) завдання. report(job) викликається після кожної
+    пачки - для виводу прогресу. Повертає job.
+    """
+    job.status = 'running'
+    job.error = ''
+    job.save(update_fields=['status', 'error', 'updated_at'])
+    try:
+        if job.kind == 'board':
+            _run_steps(job, BOARD_STEPS, job.object_id, batch_size, report)
+        else:
+            for board_id in Board.objects.filter(owner_id=job.object_id).order_by('id').values_list('id', flat=True):
+                _run_steps(job, BOARD_STEPS, board_id, batch_size, report, prefix=f'board:{board_id}:')
+            _run_steps(job, USER_STEPS, job.object_id, batch_size, report)
+    except Exception as error:
+        logger.exception('Deletion job %s failed at %s', job.id, job.step)
+        job.status = 'failed'
+        job.error = str(error)
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        raise
+    job.status = 'done'
+    job.step = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'step', 'finished_at', 'updated_at'])
+    if report:
+        report(job)
+    return job
+
+
+def _run_steps(job, steps, object_id, batch_size, report, prefix=''):
+    for name, model, lookup in steps:
+        step = f'{prefix}{name}'
+        job.step = step
+        job.save(update_fields=['step', 'updated_at'])
+
+        def on_batch(deleted, step=step):
+            job.progress[step] = job.progress.get(step, 0) + deleted
+            job.deleted_rows += deleted
+            job.save(update_fields=['progress', 'deleted_rows', 'updated_at'])
+            if report:
+                report(job)
+
+        delete_in_batches(model, lookup, object_id, batch_size, on_batch)
@@ -0,0 +1,134 @@
+"""
+Кодування WebSocket-кадрів дошки, яке клієнт обирає при підключенні.
+
+  * json     - текстовий кадр JSON (за замовчуванням, як раніше);
+  * msgpack  - бінарний кадр MessagePack;
+  * deflate  - JSON; кадри більші за WS_DEFLATE_THRESHOLD_BYTES надсилаються
+               бінарно, стиснуті zlib (DecompressionStream('deflate') у браузері).
+
+Кожна подія має event_id, тож усі сокети процесу беруть уже закодований кадр
+з LRU-кешу: кодування відбувається один раз на подію, а не на отримувача.
+"""
+import json
+import zlib
+from collections import OrderedDict
+
+import msgpack
+from django.conf import settings
+
+
+ENCODINGS = ('json', 'msgpack', 'deflate')
+DEFAULT_ENCODING = 'json'
+# Межа розпакованого кадру від клієнта: захист від zlib-бомби
+MAX_FRAME_BYTES = 1024 * 1024
+
+
+class FrameTooLarge(ValueError):
+    pass
+
+
+class InvalidFrame(ValueError):
+    pass
+
+
+# Типи, які json.dumps кодує: кадр від msgpack-клієнта розсилається й json-отримувачам
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def normalize_encoding(value):
+    value = (value or '').strip().lower()
+    return value if value in ENCODINGS else DEFAULT_ENCODING
+
+
+def encode_frame(frame, encoding, threshold=None):
+    """
+    Повертає (text_data, bytes_data) для consumer.send().
+    """
+    if encoding == 'msgpack':
+        return None, msgpack.packb(frame, use_bin_type=True)
+    text = json.dumps(frame)
+    if encoding == 'deflate':
+        if threshold is None:
+            threshold = settings.WS_DEFLATE_THRESHOLD_BYTES
+        if len(text) > threshold:
+            return None, zlib.compress(text.encode('utf-8'))
+    return text, None
+
+
+def decode_frame(text_data, bytes_data, encoding):
+    """
+    Кадр від клієнта. Нерозбірні дані та значення, яких немає в JSON
+    (bin, ext, Timestamp з msgpack), - InvalidFrame: такий кадр не можна
+    переслати json-отримувачам.
+    """
+    try:
+        if text_data is not None:
+            return json.loads(text_data)
+        if encoding == 'msgpack':
+            return _json_compatible(msgpack.unpackb(bytes_data, raw=False))
+        if encoding == 'deflate':
+            return json.loads(_inflate(bytes_data))
+        return json.loads(bytes_data)
+    except FrameTooLarge:
+        raise
+    except (ValueError, zlib.error) as exc:
+        # ExtraData, FormatError, StackError, UnicodeDecodeError, JSONDecodeError - підкласи ValueError
+        raise InvalidFrame(str(exc)) from exc
+
+
+def _json_compatible(frame):
+    """
+    Перевіряє без рекурсії, що кадр складається лише з dict зі str-ключами,
+    list і JSON-скалярів. Повертає кадр або InvalidFrame.
+    """
+    pending = [frame]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            if not all(isinstance(key, str) for key in value):
+                raise InvalidFrame('Map keys must be strings')
+            pending.extend(value.values())
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif not isinstance(value, _JSON_SCALARS):
+            raise InvalidFrame(f'Unsupported value type: {type(value).__name__}')
+    return frame
+
+
+def _inflate(data, limit=MAX_FRAME_BYTES):
+    """
+    Розпаковує не більше limit байтів; якщо стиснуті дані на цьому не
+    скінчились - FrameTooLarge, а не розпакування всього в пам'ять.
+    """
+    decompressor = zlib.decompressobj()
+    inflated = decompressor.decompress(data, limit)
+    if decompressor.unconsumed_tail:
+        raise FrameTooLarge(f'Frame is larger than {limit} bytes')
+    return inflated
+
+
+class FrameCache:
+    """
+    LRU кеш закодованих кадрів: (event_id, encoding) -> (text_data, bytes_data).
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._frames = OrderedDict()
+
+    def encode(self, frame, encoding, event_id=None):
+        if not event_id:
+            return encode_frame(frame, encoding)
+        key = (event_id, encoding)
+        encoded = self._frames.get(key)
+        if encoded is not None:
+            self._frames.move_to_end(key)
+            return encoded
+        encoded = encode_frame(frame, encoding)
+        self._frames[key] = encoded
+        if len(self._frames) > self.max_size:
+            self._frames.popitem(last=False)
+        return encoded
+
+
+frame_cache = FrameCache()
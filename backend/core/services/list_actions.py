@@ -0,0 +1,104 @@
+"""
+Дії над усім списком: перенести всі картки, архівувати всі, відсортувати
+за терміном. Кожна дія - одна перевірка прав, один запис (UPDATE ...
+WHERE list_id = ?; для сортування - bulk_update пачками), один запис в
+історії та одна подія board_updated після коміту.
+
+Подія компактна ({action, list, to_list, count}) - без вмісту карток,
+тому її можна слати всім учасникам (приватні картки не розкриваються);
+клієнт перечитує список.
+"""
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Length
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from core.models import Card, List
+from core.services.activity_logger import log_activity
+from core.services.copying import BATCH_SIZE
+from core.services.ordering import key_between, schedule_rebalance, spread_keys
+from core.services.permissions import ensure_board_admin
+from core.services.prefix_index import invalidate_board
+from core.services.realtime import broadcast_board_event
+
+LIST_BULK_ACTION = 'board/listBulk/fulfilled'
+
+
+def _active_cards(list_obj):
+    return Card.objects.filter(list_id=list_obj.id, is_archived=False)
+
+
+def _finish(user, list_obj, action, count, **meta):
+    summary = {'action': action, 'list': list_obj.id, 'count': count, **meta}
+    log_activity(user, f'{action}_cards', 'list', list_obj.id, {
+        'board_id': list_obj.board_id,
+        'board_title': list_obj.board.title,
+        'list': list_obj.id,
+        'list_title': list_obj.title,
+        'title': list_obj.title,
+        'cards_count': count,
+        **meta,
+    })
+    invalidate_board(list_obj.board_id)
+    transaction.on_commit(lambda: broadcast_board_event(
+        list_obj.board_id, LIST_BULK_ACTION, summary, sender_id=user.id,
+    ))
+    return summary
+
+
+def move_all_cards(user, list_obj, target_id):
+    """
+    Переносить усі активні картки в кінець списку target_id одним UPDATE.
+    Новий ключ - K || старий ключ, де K - ключ одразу після останньої
+    картки цілі: відносний порядок зберігається, і всі картки йдуть після
+    наявних (архівні картки лишаються на місці).
+    """
+    ensure_board_admin(user, list_obj.board, 'Only admins can move all cards.')
+    try:
+        target_id = int(target_id)
+    except (TypeError, ValueError):
+        raise ValidationError({'detail': 'list_required'})
+    target = List.objects.filter(id=target_id, board_id=list_obj.board_id).first()
+    if target is None:
+        raise ValidationError({'detail': 'list_not_found'})
+    if target.id == list_obj.id:
+        raise ValidationError({'detail': 'same_list'})
+    container = {'list_id': target.id}
+    with transaction.atomic():
+        last = _active_cards(target).order_by('-position', '-id').values_list('position', flat=True).first()
+        prefix = key_between(last, None)
+        longest = _active_cards(list_obj).order_by(Length('position').desc()).values_list('position', flat=True).first()
+        count = _active_cards(list_obj).update(
+            list_id=target.id, position=Concat(Value(prefix), F('position')),
+            version=F('version') + 1, updated_at=timezone.now(),
+        )
+        schedule_rebalance(Card, container, prefix + (longest or ''))
+        return _finish(user, list_obj, 'move_all', count, to_list=target.id, to_list_title=target.title)
+
+
+def archive_all_cards(user, list_obj):
+    ensure_board_admin(user, list_obj.board, 'Only admins can archive all cards.')
+    with transaction.atomic():
+        count = _active_cards(list_obj).update(
+            is_archived=True, archived_at=timezone.now(), version=F('version') + 1, updated_at=timezone.now(),
+        )
+        return _finish(user, list_obj, 'archive_all', count)
+
+
+def sort_cards_by_due(user, list_obj, descending=False):
+    """
+    Перевпорядковує активні картки за due_date (без терміну - в кінці, рівні -
+    у поточному порядку) bulk_update свіжих рівномірних ключів пачками по BATCH_SIZE.
+    """
+    ensure_board_admin(user, list_obj.board, 'Only admins can sort lists.')
+    due = F('due_date').desc(nulls_last=True) if descending else F('due_date').asc(nulls_last=True)
+    with transaction.atomic():
+        cards = list(_active_cards(list_obj).order_by(due, 'position', 'id').only('id'))
+        for card, key in zip(cards, spread_keys(len(cards))):
+            card.position = key
+        # Архівні картки зберігають старі ключі: order рахується лише серед активних.
+        # version піднімається окремим UPDATE: F() у bulk_update розгортається в CASE на кожен рядок
+        Card.objects.bulk_update(cards, ['position'], batch_size=BATCH_SIZE)
+        _active_cards(list_obj).update(version=F('version') + 1, updated_at=timezone.now())
+        return _finish(user, list_obj, 'sort_by_due', len(cards), descending=descending)
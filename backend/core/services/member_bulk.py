@@ -0,0 +1,146 @@
+"""
+Масове додавання учасників дошки та призначення на картки:
+POST /api/board-members/bulk/ і POST /api/cards/members/bulk/.
+
+Права перевіряються один раз; користувачі та їхні ролі читаються одним
+запитом; рядки пишуться одним bulk_create(ignore_conflicts=True), тому
+повторний запит нічого не дублює. Відповідь компактна - id та кількості,
+без серіалізації карток чи профілів.
+"""
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from core.models import Card, CardMember, Membership
+from core.services.activity_logger import log_activity
+from core.services.copying import BATCH_SIZE
+from core.services.permissions import ensure_board_admin
+from core.services.prefix_index import invalidate_board, invalidate_user
+from core.services.realtime import broadcast_board_event
+from core.services.versioning import bump_versions
+
+MAX_BULK_MEMBERS = 100
+MAX_BULK_ASSIGN_CARDS = 500
+ROLES = {role for role, _ in Membership.ROLE_CHOICES}
+BULK_ASSIGN_ACTION = 'board/bulkAssign/fulfilled'
+
+
+def parse_ids(value, name, limit):
+    if not isinstance(value, list) or not value:
+        raise ValidationError({'detail': f'{name}_required'})
+    if len(value) > limit:
+        raise ValidationError({'detail': f'too_many_{name}', 'max': limit})
+    try:
+        ids = [int(item) for item in value]
+    except (TypeError, ValueError):
+        raise ValidationError({'detail': f'{name}_must_be_ids'})
+    return list(dict.fromkeys(ids))
+
+
+def parse_members(data):
+    """
+    {user_id: role} з {"members": [{"user_id": 1, "role": "developer"}, ...]}
+    або {"user_ids": [...], "role": "viewer"} (роль за замовчуванням - viewer).
+    """
+    members = data.get('members')
+    if members is None:
+        role = data.get('role', 'viewer')
+        members = [{'user_id': user_id, 'role': role} for user_id in data.get('user_ids') or []]
+    if not isinstance(members, list) or not all(isinstance(member, dict) for member in members):
+        raise ValidationError({'detail': 'members_must_be_objects'})
+    user_ids = parse_ids([member.get('user_id') for member in members], 'user_ids', MAX_BULK_MEMBERS)
+    roles = {}
+    for member in members:
+        role = member.get('role', 'viewer')
+        if role not in ROLES:
+            raise ValidationError({'detail': 'invalid_role', 'role': role})
+        roles.setdefault(int(member['user_id']), role)
+    return {user_id: roles[user_id] for user_id in user_ids}
+
+
+def add_board_members(user, board, roles):
+    """
+    Додає користувачів {user_id: role} на дошку. Наявні учасники лишаються
+    зі своєю роллю (ignore_conflicts) і повертаються в already_members.
+    """
+    ensure_board_admin(user, board, 'Only admins can add members directly.')
+    found = set(User.objects.filter(id__in=roles, is_active=True).values_list('id', flat=True))
+    missing = [user_id for user_id in roles if user_id not in found]
+    if missing:
+        raise ValidationError({'detail': 'users_not_found', 'user_ids': missing})
+
+    with transaction.atomic():
+        existing = set(Membership.objects.filter(board=board, user_id__in=roles).values_list('user_id', flat=True))
+        added = [user_id for user_id in roles if user_id not in existing]
+        Membership.objects.bulk_create(
+            [Membership(board=board, user_id=user_id, role=roles[user_id]) for user_id in added],
+            batch_size=BATCH_SIZE, ignore_conflicts=True,
+        )
+        if added:
+            log_activity(user, 'add_members', 'board', board.id, {
+                'board_id': board.id,
+                'board_title': board.title,
+                'title': board.title,
+                'user_ids': added[:50],
+                'members_count': len(added),
+            })
+    for user_id in added:
+        invalidate_user(user_id)
+    return {
+        'board': board.id,
+        'added': [{'user_id': user_id, 'role': roles[user_id]} for user_id in added],
+        'already_members': [user_id for user_id in roles if user_id in existing],
+    }
+
+
+def assign_card_members(user, card_ids, user_ids):
+    """
+    Призначає user_ids на всі картки card_ids (одна дошка). Призначати можна
+    лише учасників дошки з роллю, відмінною від viewer (власник - завжди).
+    """
+    cards = list(Card.objects.filter(id__in=card_ids, list__board__pending_delete=False).select_related('list__board'))
+    if len(cards) != len(card_ids):
+        found = {card.id for card in cards}
+        raise ValidationError({'detail': 'cards_not_found', 'cards': [card_id for card_id in card_ids if card_id not in found]})
+    boards = {card.list.board for card in cards}
+    if len(boards) != 1:
+        raise ValidationError({'detail': 'cards_from_different_boards'})
+    board = boards.pop()
+    ensure_board_admin(user, board, 'Only admins can manage card members.')
+
+    roles = dict(Membership.objects.filter(board=board, user_id__in=user_ids).values_list('user_id', 'role'))
+    if board.owner_id in user_ids:
+        roles.setdefault(board.owner_id, 'admin')
+    not_members = [user_id for user_id in user_ids if user_id not in roles]
+    if not_members:
+        raise ValidationError({'detail': 'user_not_board_member', 'user_ids': not_members})
+    viewers = [user_id for user_id in user_ids if roles[user_id] == 'viewer']
+    if viewers:
+        raise ValidationError({'detail': 'viewer_cannot_be_assigned', 'user_ids': viewers})
+
+    with transaction.atomic():
+        existing = Counter(CardMember.objects.filter(card_id__in=card_ids, user_id__in=user_ids).values_list('card_id', flat=True))
+        CardMember.objects.bulk_create(
+            [CardMember(card_id=card_id, user_id=user_id) for card_id in card_ids for user_id in user_ids],
+            batch_size=BATCH_SIZE, ignore_conflicts=True,
+        )
+        bump_versions(Card, [card_id for card_id in card_ids if existing[card_id] < len(user_ids)])
+        assigned = len(card_ids) * len(user_ids) - sum(existing.values())
+        summary = {'board': board.id, 'cards': card_ids, 'user_ids': user_ids, 'assigned': assigned}
+        if assigned:
+            log_activity(user, 'assign_cards', 'board', board.id, {
+                'board_id': board.id,
+                'board_title': board.title,
+                'title': board.title,
+                'card_ids': card_ids[:50],
+                'user_ids': user_ids[:50],
+                'cards_count': len(card_ids),
+            })
+            # Приватні картки стають видимими новим виконавцям: їхні індекси перебудуються
+            invalidate_board(board.id)
+            transaction.on_commit(lambda: broadcast_board_event(
+                board.id, BULK_ASSIGN_ACTION, summary, sender_id=user.id,
+            ))
+    return summary
@@ -0,0 +1,291 @@
+"""
+Дробові ключі порядку для списків і карток.
+
+Позиція зберігається рядком у base36 (0-9a-z) і читається як дріб 0.xxxx:
+між будь-якими двома різними ключами завжди можна вставити третій, тому
+переміщення - це оновлення одного рядка без перенумерації сусідів і без
+блокувань.
+
+Правила ключів: непорожні, без нулів у кінці (тоді рядкове порівняння
+збігається з числовим). Використовуються лише цифри та малі літери, щоб
+порядок не залежав від collation бази.
+
+API і далі віддає `order` як 1-based номер серед активних сусідів
+(with_order / assign_order) і приймає бажаний номер при записі (position_for_index).
+Номер рахується в Python одним запитом ключів активних сусідів на вибірку,
+а не підзапитом COUNT на кожен рядок (той квадратичний на довгих списках).
+
+Ключі довшають лише при вставці в одне й те саме місце; коли довжина
+перевищує ORDERING_KEY_REBALANCE_LENGTH, після коміту перебудовується
+лише один контейнер (список карток або дошка списків). Для періодичної
+перевірки всіх контейнерів - `python manage.py rebalance_positions`.
+
+Конкурентність: рядки не блокуються. Переміщення - умовний
+UPDATE ... WHERE id = ? AND version = ?; якщо елемент щойно змінив хтось
+інший, намір ("на місце N") застосовується ще раз до свіжого стану
+(core.services.versioning). Одночасні вставки різних елементів в один проміжок можуть
+дати однакові ключі - порядок між ними вирішує id, а rebalance їх розводить.
+"""
+from django.conf import settings
+from django.db import transaction
+from bisect import bisect_left
+
+from django.db.models import Q, QuerySet
+from django.db.models.query import ModelIterable
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+# Скільки разів переміщення повторюється на свіжому стані після конфлікту версій
+MAX_MOVE_ATTEMPTS = 3
+BASE = len(DIGITS)
+_VALUE = {digit: value for value, digit in enumerate(DIGITS)}
+
+
+def _midpoint(a, b):
+    """
+    Ключ строго між a та b (b=None - верхня межа 1.0, a='' - нижня 0.0).
+    """
+    if b is not None:
+        common = 0
+        while common < len(b) and (a[common] if common < len(a) else '0') == b[common]:
+            common += 1
+        if common:
+            return b[:common] + _midpoint(a[common:], b[common:])
+    digit_a = _VALUE[a[0]] if a else 0
+    digit_b = _VALUE[b[0]] if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment(key):
+    """
+    Найкоротший ключ, більший за key, отриманий кроком в одному з розрядів,
+    або None (ключ з самих "z"). Послідовні додавання в кінець не
+    подовжують ключ, поки є вільні розряди.
+    """
+    digits = [_VALUE[digit] for digit in key]
+    for at in range(len(digits) - 1, -1, -1):
+        if digits[at] < BASE - 1:
+            digits[at] += 1
+            return ''.join(DIGITS[value] for value in digits[:at + 1])
+    return None
+
+
+def _decrement(key):
+    last = _VALUE[key[-1]]
+    if last > 1:
+        return key[:-1] + DIGITS[last - 1]
+    return None
+
+
+def key_between(before=None, after=None):
+    """
+    Ключ між сусідами (None - початок/кінець контейнера).
+    Якщо сусіди мають однаковий ключ (одночасні вставки), повертає ключ
+    одразу після before - порядок між рівними вирішує id.
+    """
+    if before and after and before >= after:
+        return before + DIGITS[BASE // 2]
+    if before and after is None:
+        return _increment(before) or before + DIGITS[1]
+    if after and not before:
+        return _decrement(after) or _midpoint('', after)
+    return _midpoint(before or '', after)
+
+
+def keys_between(before, after, count):
+    """
+    count зростаючих ключів між сусідами (для вставки кількох елементів).
+    """
+    if count <= 0:
+        return []
+    if count == 1:
+        return [key_between(before, after)]
+    if before and after is None:
+        keys, current = [], before
+        for _ in range(count):
+            current = key_between(current, None)
+            keys.append(current)
+        return keys
+    middle = key_between(before, after)
+    left = count // 2
+    return keys_between(before, middle, left) + [middle] + keys_between(middle, after, count - left - 1)
+
+
+def spread_keys(count):
+    """
+    count рівномірно розподілених ключів однакової довжини в середній половині
+    діапазону, щоб лишався запас для вставок на початок і в кінець.
+    """
+    if count <= 0:
+        return []
+    length = 2
+    while BASE ** (length - 2) < count + 1:
+        length += 1
+    span = BASE ** length
+    step = span // (2 * (count + 1))
+    keys = []
+    for index in range(1, count + 1):
+        value = span // 4 + index * step
+        digits = []
+        for _ in range(length):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append(''.join(reversed(digits)).rstrip('0'))
+    return keys
+
+
+class PositionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The item is being moved concurrently, retry the move.'
+    default_code = 'position_conflict'
+
+
+# Контейнери: картки впорядковані в межах списку, списки - в межах дошки
+
+def container_field(model):
+    return 'list' if model.__name__ == 'Card' else 'board'
+
+
+def _container(obj):
+    field = container_field(type(obj))
+    return type(obj), {f'{field}_id': getattr(obj, f'{field}_id')}
+
+
+def siblings(model, container, exclude_id=None):
+    queryset = model.objects.filter(**container, is_archived=False)
+    if exclude_id is not None:
+        queryset = queryset.exclude(id=exclude_id)
+    return queryset
+
+
+def neighbours_at(model, container, index=None, exclude_id=None):
+    """
+    Ключі сусідів (before, after) для вставки на 1-based місце index серед
+    активних сусідів (None або більше за кількість - у кінець). Зазвичай один запит.
+    """
+    queryset = siblings(model, container, exclude_id).order_by('position', 'id').values_list('position', flat=True)
+    if index is not None and int(index) >= 1:
+        start = int(index) - 1
+        around = list(queryset[max(0, start - 1):start + 1])
+        if start == 0:
+            return None, around[0] if around else None
+        if len(around) == 2:
+            return around[0], around[1]
+    last = siblings(model, container, exclude_id).order_by('-position', '-id').values_list('position', flat=True).first()
+    return last, None
+
+
+def position_for_index(model, container, index=None, exclude_id=None):
+    """
+    Ключ для вставки на 1-based місце index серед активних сусідів.
+    """
+    return key_between(*neighbours_at(model, container, index, exclude_id))
+
+
+def needs_rebalance(key):
+    return len(key) > settings.ORDERING_KEY_REBALANCE_LENGTH
+
+
+def schedule_rebalance(model, container, key):
+    """
+    Перебудова одного контейнера після коміту, якщо ключ задовгий.
+    """
+    if needs_rebalance(key):
+        transaction.on_commit(lambda: rebalance(model, container))
+
+
+def new_position(model, container, index=None):
+    key = position_for_index(model, container, index)
+    schedule_rebalance(model, container, key)
+    return key
+
+
+def place(obj, index=None):
+    """
+    Виставляє obj.position для вставки на місце index (не зберігає).
+    """
+    model, container = _container(obj)
+    obj.position = position_for_index(model, container, index, exclude_id=obj.pk)
+    schedule_rebalance(model, container, obj.position)
+    # Анотований order (with_order) більше не актуальний
+    vars(obj).pop('order', None)
+    return obj.position
+
+
+def position_after(obj):
+    """
+    Ключ одразу після obj у його контейнері (копії списків і карток).
+    """
+    model, container = _container(obj)
+    following = (
+        model.objects.filter(**container)
+        .filter(Q(position__gt=obj.position) | Q(position=obj.position, id__gt=obj.id))
+        .order_by('position', 'id').values_list('position', flat=True).first()
+    )
+    key = key_between(obj.position, following)
+    schedule_rebalance(model, container, key)
+    return key
+
+
+def rebalance(model, container):
+    """
+    Рівномірно перерозподіляє ключі всіх елементів контейнера (разом з архівними).
+    Це єдине місце, що блокує рядки, і воно запускається рідко.
+    """
+    with transaction.atomic():
+        items = list(
+            model.objects.select_for_update().filter(**container)
+            .order_by('position', 'id').only('id', 'position')
+        )
+        for item, key in zip(items, spread_keys(len(items))):
+            item.position = key
+        model.objects.bulk_update(items, ['position'], batch_size=500)
+    return len(items)
+
+
+def assign_order(objects):
+    """
+    Виставляє obj.order - 1 + кількість активних сусідів перед obj - усім
+    objects (одна модель) одним запитом: ключі активних елементів їхніх
+    контейнерів сортуються в Python, місце кожного - bisect.
+    """
+    objects = list(objects)
+    if not objects:
+        return objects
+    field = f'{container_field(type(objects[0]))}_id'
+    rows = (
+        type(objects[0]).objects.filter(**{f'{field}__in': {getattr(obj, field) for obj in objects}}, is_archived=False)
+        .order_by().values_list(field, 'position', 'id')
+    )
+    keys = {}
+    for container_id, position, obj_id in rows:
+        keys.setdefault(container_id, []).append((position, obj_id))
+    for container_keys in keys.values():
+        container_keys.sort()
+    for obj in objects:
+        obj.order = bisect_left(keys.get(getattr(obj, field), ()), (obj.position, obj.id)) + 1
+    return objects
+
+
+class OrderedQuerySet(QuerySet):
+    """
+    QuerySet, що після завантаження моделей виставляє їм order (assign_order).
+    Клони (filter, Prefetch) лишаються OrderedQuerySet.
+    """
+
+    def _fetch_all(self):
+        loaded = self._result_cache is None
+        super()._fetch_all()
+        if loaded and self._iterable_class is ModelIterable:
+            assign_order(self._result_cache)
+
+
+def with_order(queryset):
+    queryset = queryset.all()
+    queryset.__class__ = OrderedQuerySet
+    return queryset
@@ -183,6 +183,60 @@ def ensure_comment_delete(user, comment, message='Only admins can delete comment
     raise PermissionDenied(message)
 
 
+class BoardPermissionResolver:
+    """
+    Права користувача на одній дошці для пакетних операцій: роль і
+    призначення на картки читаються один раз (2 запити), далі перевірки
+    повторюють правила can_edit_card / can_archive_card / can_move_card_to_list
+    без звернень до БД.
+    """
+
+    def __init__(self, user, board, card_ids=()):
+        self.user = user
+        self.board = board
+        self.role = get_board_role(user, board)
+        self.assigned_card_ids = set()
+        if self.role == 'developer' and card_ids:
+            self.assigned_card_ids = set(
+                CardMember.objects.filter(user=user, card_id__in=card_ids).values_list('card_id', flat=True)
+            )
+
+    @property
+    def is_admin(self):
+        return self.role in ('owner', 'admin')
+
+    @property
+    def is_developer(self):
+        return self.role == 'developer'
+
+    def can_edit(self, card):
+        if self.is_admin:
+            return True
+        return self.is_developer and self.board.dev_can_edit_assigned_cards and card.id in self.assigned_card_ids
+
+    def can_archive(self, card):
+        if self.is_admin:
+            return True
+        return self.is_developer and self.board.dev_can_archive_assigned_cards and card.id in self.assigned_card_ids
+
+    def can_move(self, card, target_list):
+        if target_list.board_id != self.board.id:
+            return False
+        if self.is_admin:
+            return True
+        if not self.is_developer:
+            return False
+        if not (self.board.dev_can_edit_assigned_cards and self.board.dev_can_create_cards):
+            return False
+        return card.id in self.assigned_card_ids and target_list.allow_dev_add_cards
+
+    def can_manage_card_members(self):
+        return self.is_admin
+
+    def can_manage_lists(self):
+        return self.is_admin
+
+
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
     Дозволяє редагування лише власнику об'єкта.
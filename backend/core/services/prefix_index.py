@@ -0,0 +1,297 @@
+"""
+Префіксний індекс для швидкого переходу до дошки/списку/картки (autocomplete).
+
+Індекс тримається в пам'яті процесу окремо для кожного користувача:
+  * будується ліниво при першому запиті (3 запити до БД);
+  * це відсортовані масиви (слово, вид, id, позиція слова): окремо перші
+    слова назв і всі слова. Пошук - bisect до префікса і короткий прохід
+    вперед, що зупиняється, щойно набрано достатньо кандидатів;
+  * оновлюється точково з місць запису (index_board/index_list/index_card/unindex);
+  * зміни доступу (учасники, архівування списків і дошок) просто скидають
+    індекси зачеплених користувачів - вони перебудуються при наступному запиті;
+  * кількість користувачів обмежена LRU, а вік індексу - TTL, що також
+    обмежує розбіжність між процесами.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+
+from core.models import Board, Card, List, Membership
+
+KINDS = ('board', 'list', 'card')
+KIND_RANK = {kind: rank for rank, kind in enumerate(KINDS)}
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Скільки кандидатів (на одиницю limit) набираємо перед ранжуванням
+CANDIDATES_PER_RESULT = 3
+# Верхня межа переглянутих записів, коли інші слова запиту відсіюють збіги
+MAX_SCAN = 2000
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_words(text):
+    return _WORD_RE.findall((text or '').casefold())
+
+
+class UserPrefixIndex:
+    """
+    Індекс одного користувача. Не потокобезпечний сам по собі -
+    усі звернення йдуть через PrefixIndexRegistry під його блокуванням.
+    """
+
+    def __init__(self, admin_board_ids=(), built_at=0.0):
+        self.built_at = built_at
+        self.board_ids = set()
+        self.admin_board_ids = set(admin_board_ids)
+        # (kind, id) -> {'title', 'board_id', 'list_id', 'words'}
+        self.items = {}
+        # Перші слова назв (збіг з початком назви ранжується вище) і всі слова
+        self.starts = []
+        self.entries = []
+
+    def __len__(self):
+        return len(self.items)
+
+    @classmethod
+    def from_rows(cls, boards, lists, cards, admin_board_ids=(), built_at=0.0):
+        """
+        boards: (id, title); lists: (id, title, board_id); cards: (id, title, list_id, board_id).
+        """
+        index = cls(admin_board_ids, built_at)
+        for board_id, title in boards:
+            index._add('board', board_id, title, board_id, None)
+        for list_id, title, board_id in lists:
+            index._add('list', list_id, title, board_id, None)
+        for card_id, title, list_id, board_id in cards:
+            index._add('card', card_id, title, board_id, list_id)
+        index.starts.sort()
+        index.entries.sort()
+        return index
+
+    def _add(self, kind, obj_id, title, board_id, list_id, keep_sorted=False):
+        words = normalize_words(title)
+        self.items[(kind, obj_id)] = {'title': title, 'board_id': board_id, 'list_id': list_id, 'words': words}
+        if kind == 'board':
+            self.board_ids.add(obj_id)
+        rank = KIND_RANK[kind]
+        for position, word in enumerate(words):
+            entry = (word, rank, obj_id, position)
+            for array in (self.entries, self.starts) if position == 0 else (self.entries,):
+                if keep_sorted:
+                    insort(array, entry)
+                else:
+                    array.append(entry)
+
+    def remove(self, kind, obj_id):
+        item = self.items.pop((kind, obj_id), None)
+        if item is None:
+            return
+        rank = KIND_RANK[kind]
+        for position, word in enumerate(item['words']):
+            entry = (word, rank, obj_id, position)
+            for array in (self.entries, self.starts) if position == 0 else (self.entries,):
+                at = bisect_left(array, entry)
+                if at < len(array) and array[at] == entry:
+                    del array[at]
+        if kind == 'board':
+            self.board_ids.discard(obj_id)
+
+    def upsert(self, kind, obj_id, title, board_id, list_id=None):
+        current = self.items.get((kind, obj_id))
+        if current is not None and current['title'] == title:
+            current['board_id'], current['list_id'] = board_id, list_id
+            return
+        self.remove(kind, obj_id)
+        self._add(kind, obj_id, title, board_id, list_id, keep_sorted=True)
+
+    def search(self, prefix, limit=DEFAULT_LIMIT):
+        tokens = normalize_words(prefix)
+        if not tokens:
+            return []
+        first, rest = tokens[0], tokens[1:]
+        wanted = limit * CANDIDATES_PER_RESULT
+        # (kind, id) -> позиція слова, з якого почався збіг
+        candidates = {}
+        for array in (self.starts, self.entries):
+            at = bisect_left(array, (first,))
+            end = min(len(array), at + MAX_SCAN)
+            while at < end and len(candidates) < wanted:
+                word, rank, obj_id, position = array[at]
+                if not word.startswith(first):
+                    break
+                at += 1
+                key = (KINDS[rank], obj_id)
+                if key in candidates:
+                    continue
+                words = self.items[key]['words']
+                if rest and not all(any(other.startswith(token) for other in words) for token in rest):
+                    continue
+                candidates[key] = position
+            if len(candidates) >= wanted:
+                break
+
+        scored = sorted(
+            candidates.items(),
+            key=lambda pair: (pair[1] != 0, KIND_RANK[pair[0][0]], len(self.items[pair[0]]['title']), pair[0][1]),
+        )
+        results = []
+        for (kind, obj_id), _ in scored[:limit]:
+            item = self.items[(kind, obj_id)]
+            results.append({
+                'type': kind,
+                'id': obj_id,
+                'title': item['title'],
+                'board_id': item['board_id'],
+                'list_id': item['list_id'],
+            })
+        return results
+
+
+def build_user_index(user):
+    admin_board_ids = set(Board.objects.filter(owner=user, pending_delete=False).values_list('id', flat=True))
+    admin_board_ids.update(Membership.objects.filter(user=user, role='admin').values_list('board_id', flat=True))
+    boards = list(
+        Board.objects.filter(Q(owner=user) | Q(members=user), is_archived=False, pending_delete=False)
+        .distinct().values_list('id', 'title')
+    )
+    board_ids = [board_id for board_id, _ in boards]
+    lists = List.objects.filter(board_id__in=board_ids, is_archived=False).values_list('id', 'title', 'board_id')
+    cards = (
+        Card.objects.filter(list__board_id__in=board_ids, is_archived=False, list__is_archived=False)
+        .filter(Q(is_public=True) | Q(list__board_id__in=admin_board_ids) | Q(members=user))
+        .distinct().values_list('id', 'title', 'list_id', 'list__board_id')
+    )
+    return UserPrefixIndex.from_rows(boards, lists, cards, admin_board_ids, built_at=time.monotonic())
+
+
+class PrefixIndexRegistry:
+    def __init__(self, max_users=None, ttl=None):
+        self.max_users = max_users if max_users is not None else settings.SEARCH_PREFIX_INDEX_MAX_USERS
+        self.ttl = ttl if ttl is not None else settings.SEARCH_PREFIX_INDEX_TTL_SECONDS
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        # Лічильник змін: індекс, під час побудови якого щось змінилось, не кешується
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def _fresh(self, index):
+        return index is not None and time.monotonic() - index.built_at < self.ttl
+
+    def suggest(self, user, prefix, limit=DEFAULT_LIMIT):
+        with self._lock:
+            index = self._indexes.get(user.id)
+            if self._fresh(index):
+                self._indexes.move_to_end(user.id)
+                return index.search(prefix, limit)
+            generation = self._generation
+        # Побудова поза блокуванням, щоб не тримати інші запити. Запис чи
+        # скидання за цей час могли не потрапити в прочитані рядки - тоді
+        # індекс відповідає лише на цей запит і не кешується.
+        index = build_user_index(user)
+        with self._lock:
+            if generation != self._generation:
+                return index.search(prefix, limit)
+            self._indexes[user.id] = index
+            self._indexes.move_to_end(user.id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+            return index.search(prefix, limit)
+
+    def upsert(self, kind, obj_id, title, board_id, list_id=None, is_public=True, member_ids=()):
+        with self._lock:
+            self._generation += 1
+            for user_id, index in self._indexes.items():
+                if board_id not in index.board_ids:
+                    # Об'єкт переїхав на дошку, якої користувач не бачить
+                    index.remove(kind, obj_id)
+                    continue
+                visible = (
+                    kind != 'card' or is_public
+                    or board_id in index.admin_board_ids or user_id in member_ids
+                )
+                if visible:
+                    index.upsert(kind, obj_id, title, board_id, list_id)
+                else:
+                    index.remove(kind, obj_id)
+
+    def remove(self, kind, obj_id):
+        with self._lock:
+            self._generation += 1
+            for index in self._indexes.values():
+                index.remove(kind, obj_id)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._generation += 1
+            self._indexes.pop(user_id, None)
+
+    def invalidate_board(self, board_id):
+        with self._lock:
+            self._generation += 1
+            for user_id in [user_id for user_id, index in self._indexes.items() if board_id in index.board_ids]:
+                del self._indexes[user_id]
+
+
+_registry = None
+
+
+def get_prefix_index_registry():
+    global _registry
+    if _registry is None:
+        _registry = PrefixIndexRegistry()
+    return _registry
+
+
+# Події запису, які викликають view
+
+def index_board(board, access_changed=False):
+    """
+    access_changed - дошку архівовано/розархівовано: індекси всіх її
+    учасників скидаються (розархівовану дошку ще не містить жоден індекс).
+    """
+    registry = get_prefix_index_registry()
+    if access_changed:
+        user_ids = set(Membership.objects.filter(board_id=board.id).values_list('user_id', flat=True))
+        user_ids.add(board.owner_id)
+        for user_id in user_ids:
+            registry.invalidate_user(user_id)
+    else:
+        registry.upsert('board', board.id, board.title, board.id)
+
+
+def index_list(list_obj):
+    registry = get_prefix_index_registry()
+    if list_obj.is_archived:
+        # Разом зі списком ховаються його картки - простіше перебудувати
+        registry.invalidate_board(list_obj.board_id)
+    else:
+        registry.upsert('list', list_obj.id, list_obj.title, list_obj.board_id)
+
+
+def index_card(card):
+    registry = get_prefix_index_registry()
+    if card.is_archived:
+        registry.remove('card', card.id)
+    else:
+        member_ids = () if card.is_public else set(card.members.values_list('id', flat=True))
+        registry.upsert('card', card.id, card.title, card.list.board_id, card.list_id, card.is_public, member_ids)
+
+
+def unindex(kind, obj_id):
+    get_prefix_index_registry().remove(kind, obj_id)
+
+
+def invalidate_board(board_id):
+    get_prefix_index_registry().invalidate_board(board_id)
+
+
+def invalidate_user(user_id):
+    get_prefix_index_registry().invalidate_user(user_id)
@@ -0,0 +1,298 @@
+"""
+Присутність користувачів на дошці (хто зараз дивиться дошку).
+
+Стан тримається в пам'яті процесу, без записів у БД:
+  * connect/heartbeat/disconnect - O(1) операції над OrderedDict;
+  * застарілі з'єднання видаляються ліниво (при наступному зверненні);
+  * зміни накопичуються і розсилаються одним diff раз на PRESENCE_COALESCE_SECONDS.
+
+Варіант 'channel_layer' реплікує зміни між процесами через групу
+presence_board_{id} channel layer, тож кожен процес бачить повний склад дошки.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+
+def presence_group(board_id):
+    return f'presence_board_{board_id}'
+
+
+class BoardPresence:
+    """
+    Присутність на одній дошці. Ключ - channel_name сокета, бо один
+    користувач може відкрити дошку в кількох вкладках.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        # channel_name -> (user_id, last_seen); порядок = давність останнього heartbeat
+        self._seen = OrderedDict()
+        self._connections = {}
+        self._joined = set()
+        self._left = set()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def touch(self, user_id, channel_name, now):
+        if channel_name in self._seen:
+            self._seen.move_to_end(channel_name)
+            self._seen[channel_name] = (user_id, now)
+            return
+        self._seen[channel_name] = (user_id, now)
+        count = self._connections.get(user_id, 0) + 1
+        self._connections[user_id] = count
+        if count == 1:
+            self._mark_joined(user_id)
+
+    def remove(self, channel_name):
+        entry = self._seen.pop(channel_name, None)
+        if entry is None:
+            return
+        user_id = entry[0]
+        count = self._connections.get(user_id, 0) - 1
+        if count > 0:
+            self._connections[user_id] = count
+            return
+        self._connections.pop(user_id, None)
+        self._mark_left(user_id)
+
+    def expire(self, now):
+        """
+        Видаляє з'єднання без heartbeat довше за ttl. Найстаріші записи
+        завжди на початку, тож перевіряємо лише голову черги.
+        """
+        cutoff = now - self.ttl
+        while self._seen:
+            channel_name, (_, last_seen) = next(iter(self._seen.items()))
+            if last_seen >= cutoff:
+                break
+            self.remove(channel_name)
+
+    def user_ids(self):
+        return sorted(self._connections)
+
+    def drain_diff(self):
+        joined, left = sorted(self._joined), sorted(self._left)
+        self._joined.clear()
+        self._left.clear()
+        return joined, left
+
+    def _mark_joined(self, user_id):
+        # join + leave в межах одного вікна взаємно скасовуються
+        if user_id in self._left:
+            self._left.discard(user_id)
+        else:
+            self._joined.add(user_id)
+
+    def _mark_left(self, user_id):
+        if user_id in self._joined:
+            self._joined.discard(user_id)
+        else:
+            self._left.add(user_id)
+
+
+class PresenceRegistry:
+    """
+    Реєстр присутності процесу. Diff-и відправляються напряму локальним
+    сокетам (consumer.send_presence), без проходу через channel layer.
+    """
+
+    def __init__(self, ttl=None, coalesce=None):
+        self.ttl = ttl if ttl is not None else settings.BOARD_PRESENCE_TTL_SECONDS
+        self.coalesce = coalesce if coalesce is not None else settings.BOARD_PRESENCE_COALESCE_SECONDS
+        self.boards = {}
+        # board_id -> {channel_name: consumer}
+        self.local = {}
+        self._pending = set()
+
+    def clock(self):
+        return time.monotonic()
+
+    def snapshot(self, board_id):
+        presence = self.boards.get(board_id)
+        if presence is None:
+            return []
+        presence.expire(self.clock())
+        return presence.user_ids()
+
+    async def join(self, board_id, user_id, consumer):
+        is_first_local = board_id not in self.local
+        self.local.setdefault(board_id, {})[consumer.channel_name] = consumer
+        self._presence(board_id).touch(user_id, consumer.channel_name, self.clock())
+        if is_first_local:
+            await self._on_board_opened(board_id)
+        self._record(board_id, 'touch', user_id, consumer.channel_name)
+
+    async def heartbeat(self, board_id, user_id, channel_name):
+        presence = self._presence(board_id)
+        now = self.clock()
+        presence.touch(user_id, channel_name, now)
+        presence.expire(now)
+        self._record(board_id, 'touch', user_id, channel_name)
+
+    async def leave(self, board_id, channel_name):
+        consumers = self.local.get(board_id)
+        if consumers is not None:
+            consumers.pop(channel_name, None)
+        presence = self.boards.get(board_id)
+        if presence is not None:
+            presence.remove(channel_name)
+        self._record(board_id, 'remove', None, channel_name)
+
+    def _presence(self, board_id):
+        presence = self.boards.get(board_id)
+        if presence is None:
+            presence = self.boards[board_id] = BoardPresence(self.ttl)
+        return presence
+
+    def _record(self, board_id, op, user_id, channel_name):
+        self._schedule_flush(board_id)
+
+    def _schedule_flush(self, board_id):
+        if board_id in self._pending:
+            return
+        self._pending.add(board_id)
+        loop = asyncio.get_running_loop()
+        loop.call_later(self.coalesce, lambda: loop.create_task(self.flush(board_id)))
+
+    async def flush(self, board_id):
+        self._pending.discard(board_id)
+        presence = self.boards.get(board_id)
+        if presence is None:
+            return
+        presence.expire(self.clock())
+        await self._replicate(board_id)
+        joined, left = presence.drain_diff()
+        consumers = list(self.local.get(board_id, {}).values())
+        if (joined or left) and consumers:
+            message = {
+                'type': 'presence_diff',
+                'board_id': board_id,
+                'joined': joined,
+                'left': left,
+            }
+            event_id = uuid.uuid4().hex
+            for consumer in consumers:
+                await consumer.send_presence(message, event_id)
+        if not consumers:
+            await self._on_board_closed(board_id)
+
+    async def _on_board_opened(self, board_id):
+        pass
+
+    async def _on_board_closed(self, board_id):
+        self.local.pop(board_id, None)
+        if board_id not in self._pending:
+            self.boards.pop(board_id, None)
+
+    async def _replicate(self, board_id):
+        pass
+
+
+class ChannelLayerPresenceRegistry(PresenceRegistry):
+    """
+    Варіант для кількох процесів: кожен процес підписує свій relay-канал
+    на presence_board_{id} і пересилає туди накопичені touch/remove раз на flush.
+    Інші процеси застосовують їх до своєї копії стану.
+    """
+
+    def __init__(self, ttl=None, coalesce=None):
+        super().__init__(ttl=ttl, coalesce=coalesce)
+        self.relay_channel = None
+        self._relay_task = None
+        # board_id -> {channel_name: user_id | None}; None означає remove
+        self._outbox = {}
+
+    def _record(self, board_id, op, user_id, channel_name):
+        self._outbox.setdefault(board_id, {})[channel_name] = user_id if op == 'touch' else None
+        super()._record(board_id, op, user_id, channel_name)
+
+    async def _ensure_relay(self):
+        if self._relay_task is not None and not self._relay_task.done():
+            return
+        layer = get_channel_layer()
+        self.relay_channel = await layer.new_channel('presence.')
+        self._relay_task = asyncio.get_running_loop().create_task(self._relay_loop(layer))
+
+    async def _relay_loop(self, layer):
+        while True:
+            message = await layer.receive(self.relay_channel)
+            if message.get('origin') == self.relay_channel:
+                continue
+            board_id = message.get('board_id')
+            if message.get('type') == 'presence.sync_request':
+                await self._send_local_state(board_id, message.get('origin'))
+                continue
+            if board_id not in self.boards:
+                continue
+            presence = self.boards[board_id]
+            now = self.clock()
+            for channel_name, user_id in message.get('entries', []):
+                if user_id is None:
+                    presence.remove(channel_name)
+                else:
+                    presence.touch(user_id, channel_name, now)
+            self._schedule_flush(board_id)
+
+    async def _send_local_state(self, board_id, reply_to):
+        presence = self.boards.get(board_id)
+        consumers = self.local.get(board_id)
+        if not reply_to or presence is None or not consumers:
+            return
+        entries = [
+            [channel_name, consumer.scope['user'].id]
+            for channel_name, consumer in consumers.items()
+        ]
+        await get_channel_layer().send(reply_to, {
+            'type': 'presence.event',
+            'board_id': board_id,
+            'origin': self.relay_channel,
+            'entries': entries,
+        })
+
+    async def _on_board_opened(self, board_id):
+        await self._ensure_relay()
+        layer = get_channel_layer()
+        await layer.group_add(presence_group(board_id), self.relay_channel)
+        await layer.group_send(presence_group(board_id), {
+            'type': 'presence.sync_request',
+            'board_id': board_id,
+            'origin': self.relay_channel,
+        })
+
+    async def _on_board_closed(self, board_id):
+        if self.relay_channel:
+            await get_channel_layer().group_discard(presence_group(board_id), self.relay_channel)
+        await super()._on_board_closed(board_id)
+
+    async def _replicate(self, board_id):
+        entries = self._outbox.pop(board_id, None)
+        if not entries or not self.relay_channel:
+            return
+        await get_channel_layer().group_send(presence_group(board_id), {
+            'type': 'presence.event',
+            'board_id': board_id,
+            'origin': self.relay_channel,
+            'entries': [[channel_name, user_id] for channel_name, user_id in entries.items()],
+        })
+
+
+PRESENCE_BACKENDS = {
+    'local': PresenceRegistry,
+    'channel_layer': ChannelLayerPresenceRegistry,
+}
+
+_registry = None
+
+
+def get_presence_registry():
+    global _registry
+    if _registry is None:
+        _registry = PRESENCE_BACKENDS[settings.BOARD_PRESENCE_BACKEND]()
+    return _registry
@@ -0,0 +1,184 @@
+"""
+Публікація подій дошки в WebSocket-групи.
+
+Кожен сокет дошки входить у три групи:
+  * board_{id}              - усі глядачі дошки;
+  * board_{id}_{role}       - глядачі з однаковою роллю (admin/developer/viewer);
+  * board_{id}_user_{uid}   - конкретний користувач (для службових подій).
+
+Публікатор надсилає подію один раз на аудиторію, тож фільтрація
+на кожному сокеті не потрібна.
+"""
+import uuid
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from core.models import Card, CardMember, Checklist, ChecklistItem, Comment, Membership
+
+
+ROLE_GROUPS = ('admin', 'developer', 'viewer')
+
+# Роль учасника -> рольова група. Власник дошки отримує події адмінів.
+ROLE_TO_GROUP = {
+    'owner': 'admin',
+    'admin': 'admin',
+    'developer': 'developer',
+    'viewer': 'viewer',
+}
+
+# Аудиторія події -> рольові групи (None означає загальну групу дошки).
+AUDIENCES = {
+    'all': None,
+    'admins': ('admin',),
+    'editors': ('admin', 'developer'),
+    'viewers': ('viewer',),
+}
+
+
+def board_group(board_id):
+    return f'board_{board_id}'
+
+
+def board_role_group(board_id, role):
+    return f'board_{board_id}_{ROLE_TO_GROUP.get(role, "viewer")}'
+
+
+def board_user_group(board_id, user_id):
+    return f'board_{board_id}_user_{user_id}'
+
+
+def audience_groups(board_id, audience='all'):
+    if audience not in AUDIENCES:
+        raise ValueError(f'Unknown audience: {audience}')
+    roles = AUDIENCES[audience]
+    if roles is None:
+        return [board_group(board_id)]
+    return [board_role_group(board_id, role) for role in roles]
+
+
+def card_audience(card):
+    """
+    Приватні картки бачать лише адміни та призначені на картку учасники.
+    Повертає (audience, user_ids) для broadcast_board_event.
+    """
+    if card.is_public:
+        return 'all', ()
+    board = card.list.board
+    admin_ids = Membership.objects.filter(board_id=board.id, role='admin').values('user_id')
+    user_ids = (
+        CardMember.objects.filter(card=card)
+        .exclude(user_id__in=admin_ids)
+        .exclude(user_id=board.owner_id)
+        .values_list('user_id', flat=True)
+    )
+    return 'admins', tuple(user_ids)
+
+
+# Події клієнта, де картка - сам payload або payload['card'] (або id для deleteCard)
+_CARD_ACTIONS = {
+    'addCard', 'updateCard', 'deleteCard', 'moveCard', 'copyCard',
+    'joinCard', 'leaveCard', 'removeCardMember', 'addCardMember',
+}
+
+
+def _int(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get(value, key):
+    return value.get(key) if isinstance(value, dict) else None
+
+
+def relayed_card_id(action_type, payload):
+    """
+    Картка, про яку подія клієнта (board/<name>/fulfilled): з самого payload,
+    з ws_meta/cardId або через чек-лист, пункт чи коментар. None - подія
+    не про картку (списки, мітки, дошка) або об'єкт уже видалено.
+    """
+    name = action_type.split('/')[1] if action_type.count('/') == 2 else ''
+    meta = _get(payload, 'ws_meta')
+    card_id = _int(_get(meta, 'cardId')) or _int(_get(payload, 'cardId'))
+    if card_id:
+        return card_id
+    if name in _CARD_ACTIONS:
+        card = _get(payload, 'card') or payload
+        return _int(_get(card, 'id')) if isinstance(card, dict) else _int(card)
+    if name == 'deleteChecklist':
+        checklist_id = _int(_get(payload, 'checklistId')) or _int(payload)
+        return Checklist.objects.filter(id=checklist_id).values_list('card_id', flat=True).first()
+    if name in ('addChecklistItem', 'deleteChecklistItem'):
+        checklist_id = _int(_get(meta, 'checklistId'))
+        return Checklist.objects.filter(id=checklist_id).values_list('card_id', flat=True).first()
+    if name == 'updateChecklistItem':
+        item_id = _int(_get(_get(payload, 'item') or payload, 'id'))
+        return ChecklistItem.objects.filter(id=item_id).values_list('checklist__card_id', flat=True).first()
+    if name in ('updateComment', 'deleteComment'):
+        comment = _get(payload, 'comment') or payload
+        comment_id = _int(_get(comment, 'id')) or _int(_get(payload, 'commentId')) or _int(comment)
+        return Comment.objects.filter(id=comment_id).values_list('card_id', flat=True).first()
+    return None
+
+
+def relay_audience(board_id, action_type, payload):
+    """
+    (audience, user_ids) для події, яку надіслав клієнт: події про приватну
+    картку дошки йдуть лише тим, хто її бачить (card_audience), решта - всім.
+    """
+    card_id = relayed_card_id(action_type, payload)
+    card = Card.objects.filter(id=card_id, list__board_id=board_id).select_related('list__board').first() if card_id else None
+    if card is None:
+        return 'all', ()
+    return card_audience(card)
+
+
+def _group_send(group, message):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(group, message)
+
+
+def broadcast_board_event(board_id, action_type, payload=None, sender_id=None, audience='all', user_ids=()):
+    """
+    Надсилає серверну подію board_updated один раз на кожну групу аудиторії
+    та додатково у персональні групи user_ids.
+    """
+    if not board_id:
+        return
+    message = {
+        'type': 'board.broadcast',
+        'event_id': uuid.uuid4().hex,
+        'action_type': action_type,
+        'payload': payload,
+        'sender_id': sender_id,
+        'board_id': board_id,
+    }
+    for group in audience_groups(board_id, audience):
+        _group_send(group, message)
+    for user_id in user_ids:
+        _group_send(board_user_group(board_id, user_id), message)
+
+
+def notify_role_changed(board_id, user_id, role):
+    """
+    Просить відкриті сокети користувача перейти в іншу рольову групу.
+    """
+    _group_send(board_user_group(board_id, user_id), {
+        'type': 'board.role_changed',
+        'role': role,
+    })
+
+
+def notify_member_removed(board_id, user_id):
+    """
+    Закриває сокети користувача, якого видалили з дошки.
+    """
+    _group_send(board_user_group(board_id, user_id), {
+        'type': 'board.member_removed',
+    })
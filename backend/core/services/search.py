@@ -0,0 +1,221 @@
+"""
+Повнотекстовий пошук карток.
+
+Текст картки (заголовок, опис, пункти чек-листів, коментарі) зберігається в
+CardSearchDocument. Індекс над ним створює міграція 0024:
+  * Postgres - tsvector search_vector (генерується з title/body) + GIN;
+  * SQLite   - FTS5 core_cardsearch_fts, синхронізується тригерами.
+
+Документ оновлюється явно з місць запису (reindex_cards), тому пошук не
+сканує картки і не залежить від їх загальної кількості. Для інших СУБД
+лишається старий icontains як запасний варіант.
+"""
+import html
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from core.models import Card, CardSearchDocument, ChecklistItem, Comment
+
+MAX_TERMS = 8
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+# Маркери підсвітки всередині SQL; у відповіді замінюються на <mark> після екранування тексту
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+_MARKERS_RE = re.compile(f'[{MARK_START}{MARK_END}]')
+
+
+def search_terms(query):
+    return _TERM_RE.findall((query or '').lower())[:MAX_TERMS]
+
+
+def index_available():
+    return connection.vendor in ('postgresql', 'sqlite')
+
+
+def _clean(text):
+    return _MARKERS_RE.sub('', text or '')
+
+
+def reindex_cards(card_ids):
+    """
+    Перебудовує пошукові документи вказаних карток (три запити на пачку).
+    """
+    ids = {card_id for card_id in card_ids if card_id}
+    if not ids:
+        return
+    cards = list(Card.objects.filter(id__in=ids).values('id', 'title', 'description'))
+    if not cards:
+        return
+    parts = {card['id']: [card['description']] for card in cards}
+    for card_id, text in ChecklistItem.objects.filter(checklist__card_id__in=ids).values_list('checklist__card_id', 'text'):
+        parts[card_id].append(text)
+    for card_id, text in Comment.objects.filter(card_id__in=ids).values_list('card_id', 'text'):
+        parts[card_id].append(text)
+    CardSearchDocument.objects.bulk_create(
+        [
+            CardSearchDocument(
+                card_id=card['id'],
+                title=_clean(card['title']),
+                body='\n'.join(_clean(text) for text in parts[card['id']] if text),
+            )
+            for card in cards
+        ],
+        update_conflicts=True,
+        unique_fields=['card'],
+        update_fields=['title', 'body', 'updated_at'],
+    )
+
+
+def reindex_card(card_id):
+    reindex_cards([card_id])
+
+
+def _match_expression(terms):
+    if connection.vendor == 'postgresql':
+        return ' & '.join(f'{term}:*' for term in terms)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def text_match_filter(query):
+    """
+    Q-фільтр для Card-запитів (?q= у CardViewSet): збіг за індексом,
+    або icontains, якщо індекс для цієї СУБД відсутній.
+    """
+    terms = search_terms(query)
+    if not terms or not index_available():
+        return Q(title__icontains=query) | Q(description__icontains=query)
+    if connection.vendor == 'postgresql':
+        sql = "SELECT card_id FROM core_cardsearchdocument WHERE search_vector @@ to_tsquery('simple', %s)"
+    else:
+        sql = 'SELECT rowid FROM core_cardsearch_fts WHERE core_cardsearch_fts MATCH %s'
+    return Q(id__in=RawSQL(sql, [_match_expression(terms)]))
+
+
+# Картки, доступні користувачу: дошка, де він власник або учасник (і яка не
+# чекає видалення); приватні картки - лише адмінам дошки та учасникам картки.
+_ACCESS_SQL = """
+    l.board_id IN (
+        SELECT id FROM core_board WHERE owner_id = %s
+        UNION SELECT board_id FROM core_membership WHERE user_id = %s
+    )
+    AND l.board_id NOT IN (SELECT id FROM core_board WHERE pending_delete)
+    AND (
+        c.is_public
+        OR l.board_id IN (
+            SELECT id FROM core_board WHERE owner_id = %s
+            UNION SELECT board_id FROM core_membership WHERE user_id = %s AND role = 'admin'
+        )
+        OR EXISTS (SELECT 1 FROM core_cardmember cm WHERE cm.card_id = c.id AND cm.user_id = %s)
+    )
+"""
+
+
+def _scope_sql(user, board_id, include_archived):
+    sql = _ACCESS_SQL
+    params = [user.id] * 5
+    if board_id:
+        sql += ' AND l.board_id = %s'
+        params.append(board_id)
+    if not include_archived:
+        sql += ' AND NOT c.is_archived AND NOT l.is_archived'
+    return sql, params
+
+
+def _search_postgres(user, terms, board_id, limit, include_archived):
+    scope, params = _scope_sql(user, board_id, include_archived)
+    sql = f"""
+        WITH q AS (SELECT to_tsquery('simple', %s) AS query),
+        ranked AS (
+            SELECT d.card_id, ts_rank(d.search_vector, q.query) AS rank
+            FROM core_cardsearchdocument d
+            JOIN core_card c ON c.id = d.card_id
+            JOIN core_list l ON l.id = c.list_id,
+            q
+            WHERE d.search_vector @@ q.query AND {scope}
+            ORDER BY rank DESC
+            LIMIT %s
+        )
+        SELECT c.id, c.title, c.list_id, l.board_id, c.is_archived,
+               ts_headline('simple', d.title || E'\\n' || d.body, q.query,
+                           'StartSel="{MARK_START}", StopSel="{MARK_END}", MaxWords=24, MinWords=8, MaxFragments=1'),
+               ranked.rank
+        FROM ranked
+        JOIN core_cardsearchdocument d ON d.card_id = ranked.card_id
+        JOIN core_card c ON c.id = d.card_id
+        JOIN core_list l ON l.id = c.list_id,
+        q
+        ORDER BY ranked.rank DESC, c.id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_match_expression(terms), *params, limit])
+        return [(*row[:6], float(row[6])) for row in cursor.fetchall()]
+
+
+def _search_sqlite(user, terms, board_id, limit, include_archived):
+    scope, params = _scope_sql(user, board_id, include_archived)
+    sql = f"""
+        SELECT c.id, c.title, c.list_id, l.board_id, c.is_archived,
+               snippet(core_cardsearch_fts, -1, '{MARK_START}', '{MARK_END}', '…', 16),
+               bm25(core_cardsearch_fts, 10.0, 1.0) AS rank
+        FROM core_cardsearch_fts
+        JOIN core_card c ON c.id = core_cardsearch_fts.rowid
+        JOIN core_list l ON l.id = c.list_id
+        WHERE core_cardsearch_fts MATCH %s AND {scope}
+        ORDER BY rank, c.id
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_match_expression(terms), *params, limit])
+        # bm25: менше - краще; перевертаємо, щоб score зростав з релевантністю
+        return [(*row[:6], -float(row[6])) for row in cursor.fetchall()]
+
+
+def _search_fallback(user, query, board_id, limit, include_archived):
+    queryset = Card.objects.filter(
+        Q(list__board__owner=user) | Q(list__board__members=user), list__board__pending_delete=False
+    ).filter(Q(title__icontains=query) | Q(description__icontains=query)).distinct()
+    if board_id:
+        queryset = queryset.filter(list__board_id=board_id)
+    if not include_archived:
+        queryset = queryset.filter(is_archived=False, list__is_archived=False)
+    rows = queryset.order_by('id').values_list('id', 'title', 'list_id', 'list__board_id', 'is_archived', 'description')[:limit]
+    return [(*row[:5], _clean(row[5])[:200], 0.0) for row in rows]
+
+
+def highlight(snippet):
+    return html.escape(snippet or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def search_cards(user, query, board_id=None, limit=DEFAULT_LIMIT, include_archived=False):
+    """
+    Ранжований пошук карток, доступних користувачу, з підсвіченими фрагментами.
+    """
+    terms = search_terms(query)
+    if not terms or not user or user.is_anonymous:
+        return []
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    if connection.vendor == 'postgresql':
+        rows = _search_postgres(user, terms, board_id, limit, include_archived)
+    elif connection.vendor == 'sqlite':
+        rows = _search_sqlite(user, terms, board_id, limit, include_archived)
+    else:
+        rows = _search_fallback(user, query.strip(), board_id, limit, include_archived)
+    return [
+        {
+            'card_id': card_id,
+            'title': title,
+            'list_id': list_id,
+            'board_id': row_board_id,
+            'is_archived': bool(is_archived),
+            'snippet': highlight(snippet),
+            'score': round(score, 6),
+        }
+        for card_id, title, list_id, row_board_id, is_archived, snippet, score in rows
+    ]
@@ -0,0 +1,51 @@
+"""
+Регістронезалежний пошук користувача за username/email.
+
+Порівняння йде як LOWER(колонка) = LOWER(%s), тобто по тих самих виразах,
+що й функціональні індекси core_user_lower_username_idx / core_user_lower_email_idx
+(міграції 0025/0026). username__iexact так не вміє: на Postgres він
+будується як UPPER(...) = UPPER(...), а на SQLite - як LIKE, і індекс не використовується.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+
+
+def users_with_lower_logins(queryset=None):
+    if queryset is None:
+        queryset = get_user_model().objects.all()
+    return queryset.alias(username_lower=Lower('username'), email_lower=Lower('email'))
+
+
+def username_matches(value):
+    return Q(username_lower=Lower(Value(value)))
+
+
+def email_matches(value):
+    return Q(email_lower=Lower(Value(value)))
+
+
+def find_user_by_login(login):
+    """
+    Користувач, у якого username або email збігається з login (без урахування регістру).
+    Якщо збігів кілька (старі дані з дублікатами email) - найстаріший.
+    """
+    return users_with_lower_logins().filter(username_matches(login) | email_matches(login)).order_by('id').first()
+
+
+def find_user_by_email(email):
+    return users_with_lower_logins().filter(email_matches(email)).order_by('id').first()
+
+
+def username_taken(value, exclude_pk=None):
+    queryset = users_with_lower_logins().filter(username_matches(value))
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset.exists()
+
+
+def email_taken(value, exclude_pk=None):
+    queryset = users_with_lower_logins().filter(email_matches(value))
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset.exists()
@@ -0,0 +1,63 @@
+"""
+Пошук користувачів для діалогу запрошення.
+
+Збіг шукається по lower(username/email/first_name/last_name) - саме над цими
+виразами міграція 0025 будує індекси:
+  * Postgres - pg_trgm GIN, тож працює підрядковий пошук LIKE '%q%';
+  * SQLite   - звичайні індекси по lower(...), тому пошук префіксний
+               (діапазон q <= lower(x) < q + U+10FFFF).
+Результат завжди обмежений, а вище стоять ті, з ким користувач уже
+ділить дошки (кількість спільних Membership рахується підзапитом).
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Lower
+
+from core.models import Membership
+
+SEARCH_FIELDS = ('username', 'email', 'first_name', 'last_name')
+MIN_QUERY_LENGTH = 2
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+
+_PREFIX_END = '\U0010ffff'
+
+
+def _match_filter(term):
+    if connection.vendor == 'postgresql':
+        return Q(*[Q(**{f'{field}_lower__contains': term}) for field in SEARCH_FIELDS], _connector=Q.OR)
+    return Q(
+        *[Q(**{f'{field}_lower__gte': term, f'{field}_lower__lt': term + _PREFIX_END}) for field in SEARCH_FIELDS],
+        _connector=Q.OR,
+    )
+
+
+def shared_boards_subquery(user):
+    caller_boards = Membership.objects.filter(user=user).values('board_id')
+    shared = (
+        Membership.objects.filter(user_id=OuterRef('pk'), board_id__in=caller_boards)
+        .order_by()
+        .values('user_id')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return Coalesce(Subquery(shared, output_field=IntegerField()), Value(0))
+
+
+def search_users(user, query, limit=DEFAULT_LIMIT):
+    term = (query or '').strip().lower()
+    if len(term) < MIN_QUERY_LENGTH:
+        return User.objects.none()
+    try:
+        limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    except (TypeError, ValueError):
+        limit = DEFAULT_LIMIT
+    return (
+        User.objects.filter(is_active=True)
+        .annotate(**{f'{field}_lower': Lower(field) for field in SEARCH_FIELDS})
+        .filter(_match_filter(term))
+        .annotate(shared_boards=shared_boards_subquery(user))
+        .select_related('profile')
+        .order_by('-shared_boards', 'username_lower', 'id')[:limit]
+    )
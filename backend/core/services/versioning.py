@@ -0,0 +1,126 @@
+"""
+Оптимістична конкурентність для карток і списків.
+
+Кожен рядок має version; детальний GET віддає її як ETag ("<version>").
+Клієнт повертає цей ETag у If-Match на PATCH/PUT, і зміна застосовується
+одним UPDATE ... WHERE id = ? AND version = ?. Якщо рядок тим часом змінив
+хтось інший - 412 з поточним компактним станом, без перезапису чужих змін
+і без додаткового GET з боку клієнта.
+
+Без If-Match записуються лише змінені поля: при конфлікті версія
+перечитується і запис повторюється (остання зміна поля перемагає).
+
+ETag описує власні поля рядка; вкладені дані (картки списку, коментарі
+картки) мають свої версії та свої ETag.
+"""
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from core.services import ordering
+from core.services.ordering import PositionConflict, container_field, place, with_order
+
+# Поля компактного стану у відповіді 412
+COMPACT_FIELDS = {
+    'Card': ('id', 'list', 'title', 'position', 'order', 'version', 'is_archived', 'is_completed', 'due_date'),
+    'List': ('id', 'board', 'title', 'position', 'order', 'version', 'is_archived', 'color'),
+}
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'version_mismatch'
+    default_code = 'version_mismatch'
+
+    def __init__(self, current):
+        # Як BatchError: detail - готовий dict, щоб значення лишались числами
+        self.detail = {'detail': self.default_detail, 'current': current}
+
+
+def etag(version):
+    return f'"{version}"'
+
+
+def parse_if_match(header):
+    """
+    Версія з If-Match або None (заголовка немає чи "*").
+    Приймає "5" і W/"5"; нерозбірне значення не збігається з жодною версією (-1).
+    """
+    if not header:
+        return None
+    value = header.split(',')[0].strip()
+    if value == '*':
+        return None
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        return -1
+
+
+def compact_state(model, pk):
+    obj = with_order(model.objects.filter(id=pk)).first()
+    if obj is None:
+        raise NotFound()
+    # serializable_value дає id для зовнішніх ключів (list, board), як values()
+    return {field: obj.serializable_value(field) for field in COMPACT_FIELDS[model.__name__]}
+
+
+def save_versioned(instance, values, if_match=None, prepare=None):
+    """
+    Записує values (поле -> значення) одним умовним UPDATE і збільшує version.
+
+    if_match - очікувана версія з заголовка: розбіжність одразу дає
+    PreconditionFailed. Без нього береться версія instance, а при конфлікті
+    читаються свіжі version і контейнер, prepare(instance, values) перераховує
+    залежні поля (position) і запис повторюється до MAX_MOVE_ATTEMPTS разів.
+    """
+    model = type(instance)
+    container_id = f'{container_field(model)}_id'
+    expected = instance.version if if_match is None else if_match
+    for _ in range(ordering.MAX_MOVE_ATTEMPTS):
+        if prepare is not None:
+            prepare(instance, values)
+        updated = model.objects.filter(id=instance.pk, version=expected).update(
+            **values, version=F('version') + 1, updated_at=timezone.now()
+        )
+        if updated:
+            for field, value in values.items():
+                setattr(instance, field, value)
+            instance.version = expected + 1
+            vars(instance).pop('order', None)
+            return instance
+        if if_match is not None:
+            raise PreconditionFailed(compact_state(model, instance.pk))
+        fresh = model.objects.filter(id=instance.pk).values('version', container_id).first()
+        if fresh is None:
+            raise NotFound()
+        expected = instance.version = fresh['version']
+        setattr(instance, container_id, fresh[container_id])
+    raise PositionConflict()
+
+
+def bump_versions(model, ids):
+    """
+    Збільшує version рядків ids, чий серіалізований стан змінився поза їхніми
+    власними полями (учасники картки): інакше If-Match зі старим ETag пройде.
+    """
+    if ids:
+        model.objects.filter(id__in=ids).update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def move_to_index(obj, index=None, container=None, if_match=None):
+    """
+    Переміщує obj на 1-based місце index (у контейнер container, якщо заданий).
+    """
+    field = container_field(type(obj))
+
+    def prepare(instance, values):
+        if container is not None:
+            setattr(instance, field, container)
+            values[field] = container
+        values['position'] = place(instance, index)
+
+    return save_versioned(obj, {}, if_match=if_match, prepare=prepare)
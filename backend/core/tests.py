@@ -1,9 +1,42 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import zlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+import msgpack
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.exceptions import ChannelFull
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
-from core.models import Board, Membership
+from core.api.serializers import CardSerializer
+from core.channel_layers import ChannelHub, UnixSocketChannelLayer
+from core.models import (
+    ActivityLog, ArchivedCard, Board, Card, CardLabel, CardMember, Checklist, ChecklistItem, Comment, DeletionJob, Label,
+    List, Membership,
+)
+from core.routing import websocket_urlpatterns
+from core.services import deletion, ordering, prefix_index, presence, versioning
+from core.services.frame_encoding import MAX_FRAME_BYTES, FrameTooLarge, InvalidFrame, decode_frame
+from core.services.realtime import board_role_group, broadcast_board_event, notify_role_changed
+from core.ws_auth import TokenAuthMiddleware
 
 
 class ApiSmokeTests(APITestCase):
@@ -51,6 +84,15 @@ class ApiSmokeTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data.get('auth_token'))
 
+    def test_token_login_is_case_insensitive(self):
+        for login in ('SMOKE_USER', 'Smoke@Example.COM'):
+            response = self.client.post(
+                '/api/auth/token/login/',
+                {'username': login, 'password': self.password},
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_token_logout_revokes_token(self):
         token = self._login_and_authenticate(self.user.username)
 
@@ -74,5 +116,1336 @@ class ApiSmokeTests(APITestCase):
             Membership.objects.filter(board=board, user=self.user, role='admin').exists()
         )
 
-        default_titles = list(board.lists.order_by('order').values_list('title', flat=True))
+        default_titles = list(board.lists.order_by('position').values_list('title', flat=True))
         self.assertEqual(default_titles, ['To Do', 'In Progress', 'Done'])
+
+
+@override_settings(BOARD_PRESENCE_COALESCE_SECONDS=0.01)
+class BoardConsumerGroupTests(TransactionTestCase):
+    def setUp(self):
+        presence._registry = None
+        self.owner = User.objects.create_user(username='ws_owner', password='WsPass123!')
+        self.viewer = User.objects.create_user(username='ws_viewer', password='WsPass123!')
+        self.board = Board.objects.create(title='WS Board', owner=self.owner)
+        Membership.objects.create(user=self.owner, board=self.board, role='admin')
+        Membership.objects.create(user=self.viewer, board=self.board, role='viewer')
+        self.token = Token.objects.create(user=self.viewer)
+
+    def _communicator(self, query=''):
+        return WebsocketCommunicator(
+            TokenAuthMiddleware(URLRouter(websocket_urlpatterns)),
+            f'/ws/board/{self.board.id}/?token={self.token.key}{query}',
+        )
+
+    def test_msgpack_encoding_is_negotiated_by_query_param(self):
+        async def scenario():
+            communicator = self._communicator('&encoding=msgpack')
+            await communicator.connect()
+            frame = await communicator.receive_from()
+            self.assertIsInstance(frame, bytes)
+            self.assertEqual(msgpack.unpackb(frame)['type'], 'presence_state')
+
+            await communicator.send_to(bytes_data=msgpack.packb({
+                'type': 'board_updated',
+                'action_type': 'board/ws_heartbeat/fulfilled',
+                'payload': {'ts': 1},
+            }))
+            frames = [msgpack.unpackb(await communicator.receive_from(timeout=1)) for _ in range(2)]
+            self.assertIn('board/ws_heartbeat/fulfilled', [frame.get('action_type') for frame in frames])
+            await communicator.disconnect()
+
+        async_to_sync(scenario)()
+
+    def test_socket_follows_role_group_changes(self):
+        async def scenario():
+            layer = get_channel_layer()
+            communicator = self._communicator()
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await communicator.receive_json_from()
+            await communicator.receive_json_from(timeout=1)
+            viewer_group = board_role_group(self.board.id, 'viewer')
+            developer_group = board_role_group(self.board.id, 'developer')
+            self.assertEqual(len(layer.groups.get(viewer_group, {})), 1)
+
+            await sync_to_async(notify_role_changed)(self.board.id, self.viewer.id, 'developer')
+            await communicator.receive_nothing()
+            self.assertNotIn(viewer_group, layer.groups)
+            self.assertEqual(len(layer.groups.get(developer_group, {})), 1)
+
+            await sync_to_async(broadcast_board_event)(self.board.id, 'board/updateCard/fulfilled', {'id': 1}, audience='admins')
+            self.assertTrue(await communicator.receive_nothing())
+            await sync_to_async(broadcast_board_event)(self.board.id, 'board/updateCard/fulfilled', {'id': 1}, audience='editors')
+            message = await communicator.receive_json_from()
+            self.assertEqual(message['payload'], {'id': 1})
+            await communicator.disconnect()
+
+        async_to_sync(scenario)()
+
+    def test_heartbeat_is_echoed_to_sender_and_presence_diff_reaches_others(self):
+        owner_token = Token.objects.create(user=self.owner)
+
+        async def scenario():
+            viewer = self._communicator()
+            await viewer.connect()
+            state = await viewer.receive_json_from()
+            self.assertEqual(state['user_ids'], [self.viewer.id])
+            diff = await viewer.receive_json_from(timeout=1)
+            self.assertEqual(diff['joined'], [self.viewer.id])
+
+            owner = WebsocketCommunicator(
+                TokenAuthMiddleware(URLRouter(websocket_urlpatterns)),
+                f'/ws/board/{self.board.id}/?token={owner_token.key}',
+            )
+            await owner.connect()
+            state = await owner.receive_json_from()
+            self.assertEqual(state['user_ids'], sorted([self.owner.id, self.viewer.id]))
+
+            diff = await viewer.receive_json_from(timeout=1)
+            self.assertEqual(diff['type'], 'presence_diff')
+            self.assertEqual(diff['joined'], [self.owner.id])
+            await owner.receive_json_from(timeout=1)
+
+            await owner.send_json_to({
+                'type': 'board_updated',
+                'action_type': 'board/ws_heartbeat/fulfilled',
+                'payload': {'ts': 1},
+            })
+            ack = await owner.receive_json_from()
+            self.assertEqual(ack['sender_id'], self.owner.id)
+            self.assertTrue(await viewer.receive_nothing())
+
+            await owner.disconnect()
+            diff = await viewer.receive_json_from(timeout=1)
+            self.assertEqual(diff['left'], [self.owner.id])
+            await viewer.disconnect()
+
+        async_to_sync(scenario)()
+
+    def test_binary_msgpack_values_are_rejected_before_reaching_json_sockets(self):
+        owner_token = Token.objects.create(user=self.owner)
+
+        async def scenario():
+            viewer = self._communicator()
+            await viewer.connect()
+            await viewer.receive_json_from()
+            await viewer.receive_json_from(timeout=1)
+            owner = WebsocketCommunicator(
+                TokenAuthMiddleware(URLRouter(websocket_urlpatterns)),
+                f'/ws/board/{self.board.id}/?token={owner_token.key}&encoding=msgpack',
+            )
+            await owner.connect()
+            await owner.receive_from()
+            await owner.receive_from(timeout=1)
+            await viewer.receive_json_from(timeout=1)
+
+            await owner.send_to(bytes_data=msgpack.packb({
+                'type': 'board_updated',
+                'action_type': 'board/updateList/fulfilled',
+                'payload': {'id': 1, 'title': b'\xff'},
+            }, use_bin_type=True))
+            self.assertEqual(await owner.receive_output(timeout=1), {'type': 'websocket.close', 'code': 1007})
+            self.assertTrue(await viewer.receive_nothing())
+            await owner.disconnect()
+            diff = await viewer.receive_json_from(timeout=1)
+            self.assertEqual(diff['left'], [self.owner.id])
+
+            other = WebsocketCommunicator(
+                TokenAuthMiddleware(URLRouter(websocket_urlpatterns)),
+                f'/ws/board/{self.board.id}/?token={owner_token.key}&encoding=msgpack',
+            )
+            await other.connect()
+            await other.receive_from()
+            await other.receive_from(timeout=1)
+            await viewer.receive_json_from(timeout=1)
+            await other.send_to(bytes_data=msgpack.packb({
+                'type': 'board_updated',
+                'action_type': 'board/updateList/fulfilled',
+                'payload': {'id': 1, 'title': 'Done'},
+            }))
+            message = await viewer.receive_json_from()
+            self.assertEqual(message['payload'], {'id': 1, 'title': 'Done'})
+            await other.disconnect()
+            await viewer.disconnect()
+
+        async_to_sync(scenario)()
+
+    def test_relayed_events_about_private_cards_skip_viewers(self):
+        owner_token = Token.objects.create(user=self.owner)
+        board_list = List.objects.create(board=self.board, title='Todo', position='a0')
+        private = Card.objects.create(list=board_list, title='Secret', position='a0', is_public=False)
+        public = Card.objects.create(list=board_list, title='Open', position='a1')
+
+        async def scenario():
+            viewer = self._communicator()
+            await viewer.connect()
+            await viewer.receive_json_from()
+            await viewer.receive_json_from(timeout=1)
+            owner = WebsocketCommunicator(
+                TokenAuthMiddleware(URLRouter(websocket_urlpatterns)),
+                f'/ws/board/{self.board.id}/?token={owner_token.key}',
+            )
+            await owner.connect()
+            await owner.receive_json_from()
+            await owner.receive_json_from(timeout=1)
+            await viewer.receive_json_from(timeout=1)
+
+            for card in (private, public):
+                await owner.send_json_to({
+                    'type': 'board_updated',
+                    'action_type': 'board/updateCard/fulfilled',
+                    'payload': {'id': card.id, 'title': card.title},
+                })
+                message = await owner.receive_json_from()
+                self.assertEqual(message['payload']['id'], card.id)
+            message = await viewer.receive_json_from()
+            self.assertEqual(message['payload']['id'], public.id)
+            self.assertTrue(await viewer.receive_nothing())
+            await owner.disconnect()
+            await viewer.disconnect()
+
+        async_to_sync(scenario)()
+
+
+class FrameEncodingTests(SimpleTestCase):
+    def test_deflate_frames_are_inflated_up_to_the_limit(self):
+        frame = zlib.compress(json.dumps({'action_type': 'board/x/fulfilled'}).encode())
+        self.assertEqual(decode_frame(None, frame, 'deflate'), {'action_type': 'board/x/fulfilled'})
+        bomb = zlib.compress(b' ' * (MAX_FRAME_BYTES * 4))
+        self.assertLess(len(bomb), 10000)
+        with self.assertRaises(FrameTooLarge):
+            decode_frame(None, bomb, 'deflate')
+
+    def test_frames_that_json_recipients_cannot_encode_are_invalid(self):
+        for frame in (
+            msgpack.packb({'payload': {'blob': b'raw'}}, use_bin_type=True),
+            msgpack.packb({'payload': msgpack.ExtType(5, b'x')}),
+            msgpack.packb({'payload': [msgpack.Timestamp(1)]}),
+            msgpack.packb({1: 'int key'}, strict_types=True),
+            msgpack.packb({'a': 1}) + b'trailing',
+        ):
+            with self.assertRaises(InvalidFrame):
+                decode_frame(None, frame, 'msgpack')
+        with self.assertRaises(InvalidFrame):
+            decode_frame(None, b'not zlib', 'deflate')
+        self.assertEqual(decode_frame(None, msgpack.packb({'a': [1, None, 'x']}), 'msgpack'), {'a': [1, None, 'x']})
+
+
+class BoardPresenceTests(SimpleTestCase):
+    def test_diffs_coalesce_and_stale_connections_expire_lazily(self):
+        board = presence.BoardPresence(ttl=30)
+        board.touch(1, 'a', now=0)
+        board.touch(2, 'b', now=0)
+        board.touch(2, 'b2', now=5)
+        board.remove('b')
+        self.assertEqual(board.drain_diff(), ([1, 2], []))
+
+        board.touch(3, 'c', now=10)
+        board.remove('c')
+        self.assertEqual(board.drain_diff(), ([], []))
+
+        board.touch(1, 'a', now=20)
+        board.expire(now=40)
+        self.assertEqual(board.user_ids(), [1])
+        self.assertEqual(board.drain_diff(), ([], [2]))
+
+
+class UnixSocketChannelLayerTests(SimpleTestCase):
+    def test_messages_and_groups_cross_layer_instances(self):
+        path = os.path.join(tempfile.mkdtemp(), 'channels.sock')
+
+        async def scenario():
+            hub = ChannelHub(path, capacity=2)
+            await hub.start()
+            worker_a = UnixSocketChannelLayer(path=path, capacity=2, embedded_hub=False)
+            worker_b = UnixSocketChannelLayer(path=path, capacity=2, embedded_hub=False)
+            try:
+                channel = await worker_b.new_channel()
+                await worker_a.send(channel, {'type': 'hello', 'body': b'raw'})
+                self.assertEqual(await worker_b.receive(channel), {'type': 'hello', 'body': b'raw'})
+
+                await worker_b.group_add('board_1', channel)
+                await worker_a.group_send('board_1', {'type': 'board.broadcast'})
+                self.assertEqual((await worker_b.receive(channel))['type'], 'board.broadcast')
+
+                await worker_a.send(channel, {'type': 'one'})
+                await worker_a.send(channel, {'type': 'two'})
+                with self.assertRaises(ChannelFull):
+                    await worker_a.send(channel, {'type': 'three'})
+                await worker_b.receive(channel)
+                await worker_b.receive(channel)
+
+                await worker_b.group_discard('board_1', channel)
+                self.assertNotIn('board_1', hub.groups)
+            finally:
+                await worker_a.close()
+                await worker_b.close()
+                await hub.stop()
+
+        async_to_sync(scenario)()
+
+    def test_embedded_hub_starts_without_blocking_the_event_loop(self):
+        path = os.path.join(tempfile.mkdtemp(), 'channels.sock')
+        start = ChannelHub.start
+
+        async def slow_start(hub):
+            await asyncio.sleep(0.3)
+            return await start(hub)
+
+        async def scenario():
+            worker = UnixSocketChannelLayer(path=path, embedded_hub=True)
+            ticks = []
+
+            async def ticker():
+                while True:
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.ensure_future(ticker())
+            await asyncio.sleep(0.02)
+            try:
+                channel = await worker.new_channel()
+                await worker.send(channel, {'type': 'hello'})
+                self.assertEqual(await worker.receive(channel), {'type': 'hello'})
+                self.assertTrue(worker._hub_thread.is_alive())
+                # Hub піднімався 0.3 с, а цикл подій не стояв
+                self.assertLess(max(b - a for a, b in zip(ticks, ticks[1:])), 0.2)
+            finally:
+                task.cancel()
+                await worker.close()
+                os.close(worker._hub_lock_fd)
+
+        with mock.patch.object(ChannelHub, 'start', slow_start):
+            async_to_sync(scenario)()
+
+
+class CardSearchTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='search_owner', password='SearchPass123!')
+        self.viewer = User.objects.create_user(username='search_viewer', password='SearchPass123!')
+        self.outsider = User.objects.create_user(username='search_outsider', password='SearchPass123!')
+        self.board = Board.objects.create(title='Search board', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        Membership.objects.create(board=self.board, user=self.viewer, role='viewer')
+        self.list = List.objects.create(board=self.board, title='Backlog')
+        self.client.force_authenticate(self.owner)
+
+    def _create_card(self, title, **extra):
+        response = self.client.post('/api/cards/', {'list': self.list.id, 'title': title, **extra}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def test_search_covers_comments_and_checklists_with_snippets(self):
+        card_id = self._create_card('Release notes', description='Prepare the <b>mobile</b> changelog')
+        other_id = self._create_card('Landing page')
+        # Стандартний чек-лист віртуальний: перший пункт створює його рядок
+        self.client.post('/api/checklist-items/', {'checklist': -other_id, 'text': 'Перевірити переклади'}, format='json')
+        self.client.post('/api/comments/', {'card': card_id, 'text': 'Screenshots from QA attached'}, format='json')
+
+        response = self.client.get('/api/search/', {'q': 'screensh'})
+        self.assertEqual([row['card_id'] for row in response.data['results']], [card_id])
+        self.assertIn('<mark>Screenshots</mark>', response.data['results'][0]['snippet'])
+
+        response = self.client.get('/api/search/', {'q': 'переклад'})
+        self.assertEqual([row['card_id'] for row in response.data['results']], [other_id])
+
+        response = self.client.get('/api/search/', {'q': 'mobile'})
+        self.assertIn('&lt;b&gt;<mark>mobile</mark>&lt;/b&gt;', response.data['results'][0]['snippet'])
+
+        response = self.client.get('/api/cards/', {'q': 'landing'})
+        self.assertEqual([row['id'] for row in response.data], [other_id])
+
+        self.client.patch(f'/api/cards/{card_id}/', {'title': 'Store listing'}, format='json')
+        self.assertEqual(self.client.get('/api/search/', {'q': 'release'}).data['results'], [])
+
+    def test_search_respects_board_access_and_private_cards(self):
+        public_id = self._create_card('Quarterly budget')
+        private_id = self._create_card('Quarterly salaries')
+        Card.objects.filter(id=private_id).update(is_public=False)
+
+        self.client.force_authenticate(self.viewer)
+        response = self.client.get('/api/search/', {'q': 'quarterly'})
+        self.assertEqual([row['card_id'] for row in response.data['results']], [public_id])
+
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'quarterly'}).data['results'], [])
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def test_title_starts_rank_first_and_updates_are_incremental(self):
+        index = prefix_index.UserPrefixIndex.from_rows(
+            boards=[(1, 'Release train')],
+            lists=[(10, 'Backlog', 1)],
+            cards=[(100, 'Prepare release notes', 10, 1), (101, 'Release checklist', 10, 1)],
+        )
+        self.assertEqual(
+            [(row['type'], row['id']) for row in index.search('rel')],
+            [('board', 1), ('card', 101), ('card', 100)],
+        )
+        self.assertEqual([row['id'] for row in index.search('rel no')], [100])
+
+        index.upsert('card', 101, 'Смоук тести', 1, 10)
+        self.assertEqual([row['id'] for row in index.search('release')], [1, 100])
+        self.assertEqual([row['id'] for row in index.search('СМОУК')], [101])
+        index.remove('card', 100)
+        self.assertEqual([row['id'] for row in index.search('notes')], [])
+
+
+class SuggestApiTests(APITestCase):
+    def setUp(self):
+        prefix_index._registry = None
+        self.owner = User.objects.create_user(username='suggest_owner', password='SuggestPass123!')
+        self.viewer = User.objects.create_user(username='suggest_viewer', password='SuggestPass123!')
+        self.board = Board.objects.create(title='Roadmap', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        Membership.objects.create(board=self.board, user=self.viewer, role='viewer')
+        self.list = List.objects.create(board=self.board, title='Research')
+
+    def test_suggest_follows_writes_without_rebuilding(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/search/suggest/', {'prefix': 'r'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['Roadmap', 'Research'])
+
+        card_id = self.client.post('/api/cards/', {'list': self.list.id, 'title': 'Risk review'}, format='json').data['id']
+        with self.assertNumQueries(0):
+            index_results = prefix_index.get_prefix_index_registry().suggest(self.owner, 'risk')
+        self.assertEqual([row['id'] for row in index_results], [card_id])
+
+        self.client.force_authenticate(self.viewer)
+        self.assertEqual(len(self.client.get('/api/search/suggest/', {'prefix': 'risk'}).data['results']), 1)
+
+        self.client.force_authenticate(self.owner)
+        self.client.post(f'/api/cards/{card_id}/toggle_public/')
+        self.client.force_authenticate(self.viewer)
+        self.assertEqual(self.client.get('/api/search/suggest/', {'prefix': 'risk'}).data['results'], [])
+
+    def test_index_built_during_a_write_is_not_cached(self):
+        registry = prefix_index.get_prefix_index_registry()
+        build = prefix_index.build_user_index
+
+        def build_racing_a_write(user):
+            index = build(user)
+            List.objects.create(board=self.board, title='Retro')
+            registry.invalidate_board(self.board.id)
+            return index
+
+        with mock.patch.object(prefix_index, 'build_user_index', build_racing_a_write):
+            self.assertEqual([row['title'] for row in registry.suggest(self.owner, 'r')], ['Roadmap', 'Research'])
+        self.assertEqual(len(registry), 0)
+        self.assertEqual([row['title'] for row in registry.suggest(self.owner, 're')], ['Retro', 'Research'])
+        self.assertEqual(len(registry), 1)
+
+
+class UserSearchTests(APITestCase):
+    def test_co_members_rank_first_and_results_are_capped(self):
+        caller = User.objects.create_user(username='caller', password='CallerPass123!')
+        stranger = User.objects.create_user(username='anna_stranger', email='anna.s@example.com')
+        teammate = User.objects.create_user(username='zed', first_name='Anna', email='zed@example.com')
+        for index in range(25):
+            User.objects.create_user(username=f'anna_{index:02d}')
+        board = Board.objects.create(title='Team', owner=caller)
+        Membership.objects.create(board=board, user=caller, role='admin')
+        Membership.objects.create(board=board, user=teammate, role='developer')
+
+        self.client.force_authenticate(caller)
+        response = self.client.get('/api/users/', {'search': 'ANN'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(response.data[0]['id'], teammate.id)
+
+        response = self.client.get('/api/users/', {'search': 'anna_s', 'limit': 500})
+        self.assertEqual([row['id'] for row in response.data], [stranger.id])
+        self.assertEqual(len(self.client.get('/api/users/', {'search': 'anna', 'limit': 500}).data), 20)
+        self.assertEqual(self.client.get('/api/users/', {'search': 'a'}).data, [])
+
+
+class BoardBatchTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='batch_owner', password='BatchPass123!')
+        self.viewer = User.objects.create_user(username='batch_viewer', password='BatchPass123!')
+        self.dev = User.objects.create_user(username='batch_dev', password='BatchPass123!')
+        self.board = Board.objects.create(title='Batch', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        Membership.objects.create(board=self.board, user=self.viewer, role='viewer')
+        Membership.objects.create(board=self.board, user=self.dev, role='developer')
+        self.todo = List.objects.create(board=self.board, title='Todo', position='a')
+        self.done = List.objects.create(board=self.board, title='Done', position='b')
+        self.cards = [Card.objects.create(list=self.todo, title=f'Card {i}', position=str(i)) for i in range(1, 5)]
+        self.label = Label.objects.create(board=self.board, name='Bug', color='#ff0000')
+        self.url = f'/api/boards/{self.board.id}/batch/'
+
+    def test_batch_applies_operations_atomically_with_one_activity_entry(self):
+        first, second, third, fourth = self.cards
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'move', 'cards': [second.id, fourth.id], 'list': self.done.id, 'order': 1},
+            {'op': 'archive', 'cards': [third.id]},
+            {'op': 'set_labels', 'cards': [first.id, second.id], 'label_ids': [self.label.id]},
+            {'op': 'assign', 'cards': [first.id], 'user_ids': [self.dev.id]},
+            {'op': 'set_due_date', 'cards': [first.id], 'due_date': '2026-01-15'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        changes = {entry['id']: entry for entry in response.data['cards']}
+        self.assertEqual((changes[second.id]['list'], changes[second.id]['order']), (self.done.id, 1))
+        self.assertEqual((changes[fourth.id]['list'], changes[fourth.id]['order']), (self.done.id, 2))
+        self.assertTrue(changes[third.id]['is_archived'])
+        self.assertEqual(changes[first.id]['member_ids'], [self.dev.id])
+        self.assertEqual(changes[first.id]['label_ids'], [self.label.id])
+
+        self.assertEqual(list(Card.objects.filter(list=self.done).values_list('id', flat=True)), [second.id, fourth.id])
+        # Сусіди не переписуються - змінюються лише ключі переміщених карток
+        self.assertEqual(Card.objects.get(id=first.id).position, '1')
+        self.assertTrue(Card.objects.get(id=third.id).is_archived)
+        self.assertEqual(CardLabel.objects.filter(label=self.label).count(), 2)
+        self.assertTrue(CardMember.objects.filter(card=first, user=self.dev).exists())
+        self.assertEqual(ActivityLog.objects.filter(action='batch_update').count(), 1)
+
+    def test_batch_is_rejected_as_a_whole(self):
+        first = self.cards[0]
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'archive', 'cards': [first.id]},
+            {'op': 'assign', 'cards': [first.id], 'user_ids': [self.viewer.id]},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['index'], 1)
+        self.assertFalse(Card.objects.get(id=first.id).is_archived)
+
+        self.client.force_authenticate(self.viewer)
+        response = self.client.post(self.url, {'operations': [{'op': 'complete', 'cards': [first.id]}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Card.objects.get(id=first.id).is_completed)
+
+    def test_batch_query_count_does_not_grow_with_list_size(self):
+        backlog = List.objects.create(board=self.board, title='Backlog', position='c')
+        cards = Card.objects.bulk_create([
+            Card(list=backlog, title=f'Bulk {i}', position=key, is_public=i % 2 == 0)
+            for i, key in enumerate(ordering.spread_keys(300))
+        ])
+        self.client.force_authenticate(self.owner)
+        # Приватні сусіди в списку на 300 карток не дочитуються по одній (broadcast після коміту теж рахується)
+        with self.assertNumQueries(13), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'operations': [
+                {'op': 'move', 'cards': [cards[0].id, cards[1].id], 'list': self.done.id, 'order': 1},
+            ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class OrderingKeyTests(SimpleTestCase):
+    def test_keys_stay_between_neighbours(self):
+        keys = []
+        for step in range(300):
+            at = (step * 7) % (len(keys) + 1)
+            key = ordering.key_between(keys[at - 1] if at else None, keys[at] if at < len(keys) else None)
+            self.assertTrue((not at or keys[at - 1] < key) and (at == len(keys) or key < keys[at]))
+            self.assertFalse(key.endswith('0'))
+            keys.insert(at, key)
+        spread = ordering.spread_keys(1000)
+        self.assertEqual(spread, sorted(set(spread)))
+        between = ordering.keys_between('a', 'b', 20)
+        self.assertEqual(between, sorted(set(between)))
+        self.assertTrue('a' < between[0] and between[-1] < 'b')
+
+
+class PositionApiTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='position_owner', password='PositionPass123!')
+        self.board = Board.objects.create(title='Positions', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        self.lists = [List.objects.create(board=self.board, title=title, position=key)
+                      for title, key in zip(('A', 'B', 'C'), ordering.spread_keys(3))]
+        self.cards = [Card.objects.create(list=self.lists[0], title=f'Card {i}', position=key)
+                      for i, key in enumerate(ordering.spread_keys(4))]
+        self.client.force_authenticate(self.owner)
+
+    def test_moves_update_a_single_row_and_api_keeps_1_based_order(self):
+        moved = self.cards[3]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/cards/{moved.id}/', {'order': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['order'], 2)
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE "core_card"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            list(Card.objects.filter(list=self.lists[0]).values_list('id', flat=True)),
+            [self.cards[0].id, moved.id, self.cards[1].id, self.cards[2].id],
+        )
+
+        response = self.client.patch(f'/api/lists/{self.lists[2].id}/', {'order': 1}, format='json')
+        self.assertEqual(response.data['order'], 1)
+        board = self.client.get(f'/api/boards/{self.board.id}/').data
+        self.assertEqual([(item['title'], item['order']) for item in board['lists']], [('C', 1), ('A', 2), ('B', 3)])
+        self.assertEqual([card['order'] for card in board['lists'][1]['cards']], [1, 2, 3, 4])
+
+        created = self.client.post('/api/cards/', {'list': self.lists[0].id, 'title': 'Top', 'order': 1}, format='json')
+        self.assertEqual(created.data['order'], 1)
+
+    def test_order_is_computed_once_per_queryset_not_per_row(self):
+        Card.objects.filter(id=self.cards[1].id).update(is_archived=True)
+        Card.objects.bulk_create([
+            Card(list=self.lists[0], title=f'Extra {i}', position=f'z{i:03d}') for i in range(40)
+        ])
+        with self.assertNumQueries(2):
+            cards = list(ordering.with_order(Card.objects.filter(list=self.lists[0])))
+        active = [card.order for card in cards if not card.is_archived]
+        self.assertEqual(active, list(range(1, 44)))
+        self.assertEqual(next(card.order for card in cards if card.is_archived), 2)
+
+        # Без with_order серіалізатор теж рахує order одним запитом на всю вибірку
+        plain = list(Card.objects.filter(list=self.lists[0]))
+        with CaptureQueriesContext(connection) as queries:
+            data = CardSerializer(plain, many=True).data
+        ranks = [query for query in queries.captured_queries if query['sql'].startswith('SELECT "core_card"."list_id"')]
+        self.assertEqual(len(ranks), 1)
+        self.assertEqual([card['order'] for card in data][:3], [1, 2, 2])
+
+    @override_settings(ORDERING_KEY_REBALANCE_LENGTH=4)
+    def test_long_keys_are_rebalanced_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(12):
+                self.client.patch(f'/api/cards/{self.cards[3].id}/', {'order': 2}, format='json')
+                self.client.patch(f'/api/cards/{self.cards[2].id}/', {'order': 2}, format='json')
+        positions = list(Card.objects.filter(list=self.lists[0]).values_list('position', flat=True))
+        self.assertLessEqual(max(len(key) for key in positions), 4)
+        self.assertEqual(positions, sorted(positions))
+
+    def test_stale_version_is_retried_on_fresh_state(self):
+        stale = Card.objects.get(id=self.cards[3].id)
+        Card.objects.filter(id=stale.id).update(list=self.lists[1], version=F('version') + 1)
+        versioning.move_to_index(stale, 1)
+        stale.refresh_from_db()
+        self.assertEqual((stale.list_id, stale.version), (self.lists[1].id, 3))
+
+        with mock.patch.object(ordering, 'MAX_MOVE_ATTEMPTS', 0):
+            response = self.client.patch(f'/api/lists/{self.lists[2].id}/', {'order': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_if_match_is_a_single_conditional_update_and_stale_writes_get_412(self):
+        card = self.cards[0]
+        url = f'/api/cards/{card.id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(etag, '"1"')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'title': 'Renamed'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"2"')
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE "core_card"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"version" = 1', updates[0])
+
+        response = self.client.patch(url, {'title': 'Lost update', 'order': 3}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(response.data['current']['title'], 'Renamed')
+        self.assertEqual((response.data['current']['version'], response.data['current']['order']), (2, 1))
+        card.refresh_from_db()
+        self.assertEqual((card.title, card.version), ('Renamed', 2))
+
+        list_url = f'/api/lists/{self.lists[1].id}/'
+        response = self.client.put(
+            list_url, {'title': 'B2', 'board': self.board.id}, format='json', HTTP_IF_MATCH='W/"1"'
+        )
+        self.assertEqual((response.status_code, response['ETag']), (status.HTTP_200_OK, '"2"'))
+        response = self.client.patch(list_url, {'order': 1}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(response.data['current']['title'], 'B2')
+
+    def test_visibility_and_member_changes_bump_the_card_version(self):
+        card = self.cards[1]
+        url = f'/api/cards/{card.id}/'
+        etag = self.client.get(url)['ETag']
+        for action in ('toggle_public', 'join', 'leave'):
+            response = self.client.post(f'{url}{action}/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.client.patch(url, {'title': 'Stale'}, format='json', HTTP_IF_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+            etag = self.client.get(url)['ETag']
+        self.assertEqual(etag, '"4"')
+
+
+class CardMoveApiTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='move_owner', password='MovePass123!')
+        self.dev = User.objects.create_user(username='move_dev', password='MovePass123!')
+        self.board = Board.objects.create(title='Moves', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        Membership.objects.create(board=self.board, user=self.dev, role='developer')
+        self.todo = List.objects.create(board=self.board, title='Todo', position='a')
+        self.done = List.objects.create(board=self.board, title='Done', position='b')
+        self.cards = [Card.objects.create(list=self.todo, title=f'Card {i}', position=key)
+                      for i, key in enumerate(ordering.spread_keys(3))]
+        self.done_card = Card.objects.create(list=self.done, title='Shipped', position='i')
+
+    def test_move_is_one_select_and_one_update(self):
+        first, second, third = self.cards
+        self.client.force_authenticate(self.owner)
+        url = f'/api/cards/{third.id}/move/'
+        self.client.post(url, {'list': self.todo.id, 'before_id': first.id}, format='json')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'list': self.todo.id, 'after_id': first.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'id': third.id, 'list': self.todo.id, 'order': 1, 'version': 3})
+        statements = [query['sql'].split()[0] for query in queries.captured_queries]
+        self.assertEqual(statements.count('SELECT'), 1)
+        self.assertEqual(statements.count('UPDATE'), 1)
+        self.assertEqual(list(Card.objects.filter(list=self.todo).values_list('id', flat=True)), [third.id, first.id, second.id])
+
+        response = self.client.post(
+            f'/api/cards/{first.id}/move/', {'list': self.done.id, 'before_id': self.done_card.id}, format='json'
+        )
+        self.assertEqual(response.data['order'], 2)
+        self.assertEqual(list(Card.objects.filter(list=self.done).values_list('id', flat=True)), [self.done_card.id, first.id])
+
+    def test_move_checks_permissions_and_neighbours(self):
+        self.client.force_authenticate(self.dev)
+        response = self.client.post(f'/api/cards/{self.cards[0].id}/move/', {'list': self.done.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(
+            f'/api/cards/{self.cards[0].id}/move/', {'list': self.todo.id, 'before_id': self.done_card.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        other = Board.objects.create(title='Other', owner=self.owner)
+        foreign = List.objects.create(board=other, title='Foreign')
+        response = self.client.post(f'/api/cards/{self.cards[0].id}/move/', {'list': foreign.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_boards_queued_for_deletion_reject_moves_and_copies(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(f'/api/cards/{self.cards[0].id}/copy/', {'list_id': 999999}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        other = Board.objects.create(title='Queued', owner=self.owner, pending_delete=True)
+        queued_list = List.objects.create(board=other, title='Queued')
+        response = self.client.post(f'/api/cards/{self.cards[0].id}/copy/', {'list_id': queued_list.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        Board.objects.filter(id=self.board.id).update(pending_delete=True)
+        response = self.client.post(f'/api/cards/{self.cards[2].id}/move/', {'list': self.done.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Card.objects.get(id=self.cards[2].id).list_id, self.todo.id)
+
+
+class BulkCopyTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='copy_owner', password='CopyPass123!')
+        self.board = Board.objects.create(title='Copies', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        self.label = Label.objects.create(board=self.board, name='Bug', color='#ff0000')
+        self.source = List.objects.create(board=self.board, title='Source')
+        self.client.force_authenticate(self.owner)
+
+    def _fill(self, count):
+        cards = Card.objects.bulk_create([
+            Card(list=self.source, title=f'Card {i}', position=key) for i, key in enumerate(ordering.spread_keys(count))
+        ])
+        CardLabel.objects.bulk_create([CardLabel(card=card, label=self.label) for card in cards])
+        checklists = Checklist.objects.bulk_create([Checklist(card=card, title='Steps') for card in cards])
+        ChecklistItem.objects.bulk_create([
+            ChecklistItem(checklist=checklist, text=f'Step {i}', order=i) for checklist in checklists for i in range(3)
+        ])
+        return cards
+
+    def _copy_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/lists/{self.source.id}/copy/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [query['sql'] for query in queries.captured_queries]
+
+    def test_list_copy_statement_count_does_not_grow_with_cards(self):
+        self._fill(5)
+        _, small = self._copy_queries()
+        self._fill(45)
+        response, large = self._copy_queries()
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(len(response.data['cards']), 50)
+        copied = response.data['cards'][0]
+        self.assertEqual([label['name'] for label in copied['labels']], ['Bug'])
+        self.assertEqual([item['text'] for item in copied['checklists'][0]['items']], ['Step 0', 'Step 1', 'Step 2'])
+
+    def test_card_copy_keeps_labels_and_checklists(self):
+        card = self._fill(1)[0]
+        response = self.client.post(f'/api/cards/{card.id}/copy/', {}, format='json')
+        self.assertEqual(response.data['order'], 2)
+        self.assertEqual(len(response.data['checklists'][0]['items']), 3)
+        self.assertEqual(CardLabel.objects.filter(label=self.label).count(), 2)
+
+    def test_template_clone_remaps_labels_and_is_set_based(self):
+        developer = User.objects.create_user(username='copy_dev', password='CopyPass123!')
+        Membership.objects.create(board=self.board, user=developer, role='developer')
+        self._fill(3)
+        Card.objects.create(list=self.source, title='Archived', is_archived=True)
+        List.objects.create(board=self.board, title='Old', is_archived=True)
+        self.client.force_authenticate(developer)
+        url = f'/api/boards/{self.board.id}/clone/'
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+        Board.objects.filter(id=self.board.id).update(is_template=True)
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post(url, {'title': 'Client A'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            {key: response.data[key] for key in ('title', 'members', 'labels', 'lists', 'cards')},
+            {'title': 'Client A', 'members': 1, 'labels': 1, 'lists': 1, 'cards': 3},
+        )
+        clone = Board.objects.get(id=response.data['id'])
+        self.assertEqual((clone.owner, clone.is_template), (developer, False))
+        new_label = clone.labels.get()
+        self.assertEqual(CardLabel.objects.filter(label=new_label).count(), 3)
+        self.assertEqual(ChecklistItem.objects.filter(checklist__card__list__board=clone).count(), 9)
+
+        self._fill(20)
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(url, {}, format='json')
+        self.assertEqual(len(large), len(small))
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(url, {'include_members': True}, format='json')
+        self.assertEqual(response.data['members'], 2)
+        templates = self.client.get('/api/boards/?template=true').data
+        self.assertEqual([board['id'] for board in templates], [self.board.id])
+
+
+class DefaultChecklistTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='checklist_owner', password='ChecklistPass123!')
+        self.board = Board.objects.create(title='Checklists', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        self.list = List.objects.create(board=self.board, title='Todo')
+        self.client.force_authenticate(self.owner)
+
+    def test_default_checklist_is_virtual_until_first_item(self):
+        card = self.client.post('/api/cards/', {'list': self.list.id, 'title': 'Task'}, format='json').data
+        self.assertEqual(card['checklists'], [{'id': -card['id'], 'title': 'Чек-лист', 'items': []}])
+        self.assertFalse(Checklist.objects.filter(card_id=card['id']).exists())
+
+        for text in ('Step 1', 'Step 2'):
+            response = self.client.post('/api/checklist-items/', {'checklist': -card['id'], 'text': text}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        checklist = Checklist.objects.get(card_id=card['id'])
+        self.assertEqual(checklist.items.count(), 2)
+        data = self.client.get(f"/api/cards/{card['id']}/").data
+        self.assertEqual([(item['id'], len(item['items'])) for item in data['checklists']], [(checklist.id, 2)])
+
+        response = self.client.post('/api/checklist-items/', {'checklist': -999999, 'text': 'Nope'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Після видалення останнього справжнього чек-листа картка лишається без чек-листів
+        self.assertEqual(self.client.delete(f'/api/checklists/{checklist.id}/').status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(f"/api/cards/{card['id']}/").data['checklists'], [])
+
+    def test_virtual_checklist_can_be_deleted(self):
+        card = self.client.post('/api/cards/', {'list': self.list.id, 'title': 'Task'}, format='json').data
+        viewer = User.objects.create_user(username='checklist_viewer', password='ChecklistPass123!')
+        Membership.objects.create(board=self.board, user=viewer, role='viewer')
+        self.client.force_authenticate(viewer)
+        self.assertEqual(self.client.delete(f"/api/checklists/-{card['id']}/").status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.delete(f"/api/checklists/-{card['id']}/").status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(f"/api/cards/{card['id']}/").data['checklists'], [])
+        self.assertEqual(self.client.delete(f"/api/checklists/-{card['id']}/").status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post('/api/checklist-items/', {'checklist': -card['id'], 'text': 'Late'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_item_can_move_to_a_virtual_checklist(self):
+        source = self.client.post('/api/cards/', {'list': self.list.id, 'title': 'Source'}, format='json').data
+        target = self.client.post('/api/cards/', {'list': self.list.id, 'title': 'Target'}, format='json').data
+        item = self.client.post('/api/checklist-items/', {'checklist': -source['id'], 'text': 'Move me'}, format='json').data
+
+        response = self.client.patch(f"/api/checklist-items/{item['id']}/", {'checklist': -target['id']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        checklist = Checklist.objects.get(card_id=target['id'])
+        self.assertEqual(list(checklist.items.values_list('text', flat=True)), ['Move me'])
+        self.assertEqual(self.client.get(f"/api/cards/{target['id']}/").data['checklists'][0]['id'], checklist.id)
+
+        # На чужу дошку без прав пункт не переноситься
+        other = Board.objects.create(title='Other', owner=User.objects.create_user(username='other_owner'))
+        foreign = Card.objects.create(list=List.objects.create(board=other, title='X'), title='Foreign')
+        response = self.client.patch(f"/api/checklist-items/{item['id']}/", {'checklist': -foreign.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Checklist.objects.filter(card=foreign).exists())
+
+
+class BulkCardCreateTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='bulk_owner', password='BulkPass123!')
+        self.board = Board.objects.create(title='Backlog', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        self.list = List.objects.create(board=self.board, title='Inbox')
+        self.first, self.last = [
+            Card.objects.create(list=self.list, title=title, position=key)
+            for title, key in zip(('First', 'Last'), ordering.spread_keys(2))
+        ]
+        self.url = f'/api/lists/{self.list.id}/cards/bulk/'
+        self.client.force_authenticate(self.owner)
+
+    def test_pasted_lines_become_cards_with_constant_statements(self):
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post(self.url, {'text': 'One\n\n  Two  \nThree', 'order': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([(card['title'], card['order']) for card in response.data['cards']],
+                         [('One', 2), ('Two', 3), ('Three', 4)])
+        self.assertEqual(
+            list(Card.objects.filter(list=self.list).values_list('title', flat=True)),
+            ['First', 'One', 'Two', 'Three', 'Last'],
+        )
+        self.assertEqual(CardMember.objects.filter(user=self.owner).count(), 3)
+        self.assertFalse(Checklist.objects.filter(card__list=self.list).exists())
+        self.assertEqual(ActivityLog.objects.filter(user=self.owner, action='bulk_create_cards').count(), 1)
+
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(self.url, {'titles': [f'Task {i}' for i in range(30)]}, format='json')
+        self.assertEqual(len(large), len(small))
+
+    def test_bulk_create_is_validated_once(self):
+        viewer = User.objects.create_user(username='bulk_viewer', password='BulkPass123!')
+        Membership.objects.create(board=self.board, user=viewer, role='viewer')
+        self.client.force_authenticate(viewer)
+        self.assertEqual(self.client.post(self.url, {'titles': ['A']}, format='json').status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.post(self.url, {'text': ' \n '}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Card.objects.filter(list=self.list).count(), 2)
+
+
+class ListBulkActionTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='column_owner', password='ColumnPass123!')
+        self.board = Board.objects.create(title='Columns', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        self.todo = List.objects.create(board=self.board, title='Todo', position='a')
+        self.done = List.objects.create(board=self.board, title='Done', position='b')
+        self.done_card = Card.objects.create(list=self.done, title='Shipped', position='i')
+        self.client.force_authenticate(self.owner)
+
+    def _fill(self, count):
+        today = timezone.now()
+        return Card.objects.bulk_create([
+            Card(list=self.todo, title=f'Card {i}', position=key,
+                 due_date=None if i % 3 == 0 else today + timedelta(days=count - i))
+            for i, key in enumerate(ordering.spread_keys(count))
+        ])
+
+    def _card_writes(self, queries):
+        return [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE "core_card"')]
+
+    def test_move_all_is_one_update_and_keeps_order(self):
+        cards = self._fill(40)
+        Card.objects.create(list=self.todo, title='Old', is_archived=True)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/lists/{self.todo.id}/move-all/', {'list': self.done.id}, format='json')
+        self.assertEqual(response.data, {
+            'action': 'move_all', 'list': self.todo.id, 'count': 40, 'to_list': self.done.id, 'to_list_title': 'Done',
+        })
+        self.assertEqual(len(self._card_writes(queries)), 1)
+        self.assertEqual(
+            list(Card.objects.filter(list=self.done, is_archived=False).values_list('id', flat=True)),
+            [self.done_card.id] + [card.id for card in cards],
+        )
+        self.assertEqual(Card.objects.filter(list=self.todo).count(), 1)
+        self.assertEqual(ActivityLog.objects.filter(action='move_all_cards').count(), 1)
+
+    def test_archive_all_and_sort_by_due(self):
+        cards = self._fill(9)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/lists/{self.todo.id}/sort/', {'by': 'due_date'}, format='json')
+        self.assertEqual(response.data['count'], 9)
+        # bulk_update ключів + один UPDATE версій
+        self.assertEqual(len(self._card_writes(queries)), 2)
+        ordered = list(Card.objects.filter(list=self.todo).values_list('id', flat=True))
+        dated = sorted((card for card in cards if card.due_date), key=lambda card: card.due_date)
+        undated = [card for card in cards if card.due_date is None]
+        self.assertEqual(ordered, [card.id for card in dated + undated])
+
+        response = self.client.post(f'/api/lists/{self.todo.id}/archive-all/', {}, format='json')
+        self.assertEqual(response.data['count'], 9)
+        self.assertFalse(Card.objects.filter(list=self.todo, is_archived=False).exists())
+
+        viewer = User.objects.create_user(username='column_viewer', password='ColumnPass123!')
+        Membership.objects.create(board=self.board, user=viewer, role='viewer')
+        self.client.force_authenticate(viewer)
+        response = self.client.post(f'/api/lists/{self.done.id}/archive-all/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BulkMembershipTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='team_owner', password='TeamPass123!')
+        self.board = Board.objects.create(title='Onboarding', owner=self.owner)
+        Membership.objects.create(board=self.board, user=self.owner, role='admin')
+        self.todo = List.objects.create(board=self.board, title='Todo', position='a')
+        self.client.force_authenticate(self.owner)
+
+    def test_bulk_invite_is_one_insert_and_idempotent(self):
+        team = User.objects.bulk_create([User(username=f'teammate{i}') for i in range(40)])
+        Membership.objects.create(board=self.board, user=team[0], role='admin')
+        payload = {'board_id': self.board.id, 'user_ids': [user.id for user in team], 'role': 'developer'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/board-members/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['added']), 39)
+        self.assertEqual(response.data['already_members'], [team[0].id])
+        inserts = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('INSERT') and '"core_membership"' in query['sql']]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Membership.objects.get(board=self.board, user=team[0]).role, 'admin')
+        self.assertEqual(Membership.objects.filter(board=self.board, role='developer').count(), 39)
+
+        response = self.client.post('/api/board-members/bulk/', payload, format='json')
+        self.assertEqual(response.data['added'], [])
+        response = self.client.post('/api/board-members/bulk/', {**payload, 'role': 'owner'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/api/board-members/bulk/', {**payload, 'user_ids': [10 ** 6]}, format='json')
+        self.assertEqual(response.data['detail'], 'users_not_found')
+
+    def test_bulk_assign_validates_roles_once_and_skips_existing(self):
+        developers = User.objects.bulk_create([User(username=f'dev{i}') for i in range(5)])
+        viewer = User.objects.create(username='watcher')
+        Membership.objects.bulk_create(
+            [Membership(board=self.board, user=user, role='developer') for user in developers]
+            + [Membership(board=self.board, user=viewer, role='viewer')]
+        )
+        cards = Card.objects.bulk_create([
+            Card(list=self.todo, title=f'Task {i}', position=key) for i, key in enumerate(ordering.spread_keys(30))
+        ])
+        CardMember.objects.create(card=cards[0], user=developers[0])
+        payload = {'cards': [card.id for card in cards], 'user_ids': [user.id for user in developers]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/cards/members/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['assigned'], 149)
+        self.assertEqual(CardMember.objects.filter(card__in=cards).count(), 150)
+        self.assertLess(len(queries.captured_queries), 15)
+
+        response = self.client.post('/api/cards/members/bulk/', {**payload, 'user_ids': [viewer.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'viewer_cannot_be_assigned')
+
+        self.client.force_authenticate(developers[1])
+        response = self.client.post('/api/cards/members/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class DeferredDeletionTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='leaving_owner', password='LeavingPass123!')
+        self.other = User.objects.create_user(username='staying_user', password='StayingPass123!')
+        self.board = Board.objects.create(title='Huge', owner=self.owner)
+        Membership.objects.bulk_create([
+            Membership(board=self.board, user=self.owner, role='admin'),
+            Membership(board=self.board, user=self.other, role='developer'),
+        ])
+        todo = List.objects.create(board=self.board, title='Todo', position='a')
+        self.cards = Card.objects.bulk_create([
+            Card(list=todo, title=f'Card {i}', position=key) for i, key in enumerate(ordering.spread_keys(7))
+        ])
+        checklist = Checklist.objects.create(card=self.cards[0], title='Steps')
+        ChecklistItem.objects.bulk_create([ChecklistItem(checklist=checklist, text=f'Step {i}') for i in range(5)])
+        CardMember.objects.create(card=self.cards[1], user=self.other)
+
+    def test_board_is_hidden_at_once_and_deleted_in_resumable_batches(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.delete(f'/api/boards/{self.board.id}/')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertTrue(Card.objects.filter(list__board=self.board).exists())
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get('/api/boards/').data, [])
+        self.assertEqual(self.client.get(f'/api/cards/{self.cards[1].id}/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/my-cards/').data, [])
+
+        real_delete = deletion.delete_in_batches
+
+        def crash_on_cards(model, *args, **kwargs):
+            if model is Card:
+                raise RuntimeError('worker killed')
+            return real_delete(model, *args, **kwargs)
+
+        with mock.patch.object(deletion, 'delete_in_batches', crash_on_cards), self.assertLogs(deletion.logger, 'ERROR'):
+            call_command('process_deletions', batch_size=2, stdout=StringIO(), stderr=StringIO())
+        job = DeletionJob.objects.get()
+        self.assertEqual((job.status, job.step), ('failed', 'cards'))
+        self.assertEqual(job.progress['checklist_items'], 5)
+        self.assertFalse(ChecklistItem.objects.exists())
+
+        call_command('process_deletions', batch_size=2, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.progress['cards'], 7)
+        self.assertFalse(Board.objects.filter(id=self.board.id).exists())
+        self.assertFalse(Card.objects.exists())
+
+    def test_account_deletion_deactivates_then_removes_owned_boards(self):
+        token = Token.objects.create(user=self.owner)
+        other_board = Board.objects.create(title='Shared', owner=self.other)
+        Membership.objects.create(board=other_board, user=self.owner, role='viewer')
+        self.client.force_authenticate(self.owner)
+        response = self.client.delete('/api/users/me/')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.owner.refresh_from_db()
+        self.assertFalse(self.owner.is_active)
+        self.assertFalse(Token.objects.filter(key=token.key).exists())
+        self.assertTrue(Board.objects.get(id=self.board.id).pending_delete)
+
+        call_command('process_deletions', stdout=StringIO())
+        self.assertFalse(User.objects.filter(id=self.owner.id).exists())
+        self.assertFalse(Board.objects.filter(id=self.board.id).exists())
+        self.assertEqual(list(Board.objects.values_list('id', flat=True)), [other_board.id])
+        self.assertFalse(Membership.objects.filter(board=other_board).exclude(user=self.other).exists())
+
+
+class ColdStorageTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='archivist', password='ArchivistPass123!')
+        self.dev = User.objects.create_user(username='archive_dev', password='ArchiveDevPass123!')
+        self.board = Board.objects.create(title='Old board', owner=self.owner)
+        Membership.objects.bulk_create([
+            Membership(board=self.board, user=self.owner, role='admin'),
+            Membership(board=self.board, user=self.dev, role='developer'),
+        ])
+        self.todo = List.objects.create(board=self.board, title='Todo', position='a')
+        self.label = Label.objects.create(board=self.board, name='Bug', color='#f00')
+        self.card = Card.objects.create(list=self.todo, title='Legacy payment flow', position='b')
+        checklist = Checklist.objects.create(card=self.card, title='Steps')
+        ChecklistItem.objects.bulk_create([ChecklistItem(checklist=checklist, text=f'Step {i}', order=i) for i in range(3)])
+        CardLabel.objects.create(card=self.card, label=self.label)
+        CardMember.objects.create(card=self.card, user=self.dev)
+        self.comment = Comment.objects.create(card=self.card, author=self.dev, text='Done long ago')
+        Comment.objects.filter(id=self.comment.id).update(created_at=timezone.now() - timedelta(days=400))
+        self.secret = Card.objects.create(list=self.todo, title='Legacy secret', position='c', is_public=False)
+        self.live = Card.objects.create(list=self.todo, title='Live', position='d')
+        self.client.force_authenticate(self.owner)
+
+    def _archive(self, card, days_ago):
+        response = self.client.patch(f'/api/cards/{card.id}/', {'is_archived': True}, format='json')
+        self.assertIsNotNone(response.data and Card.objects.get(id=card.id).archived_at)
+        Card.objects.filter(id=card.id).update(archived_at=timezone.now() - timedelta(days=days_ago))
+
+    def test_old_archived_cards_leave_hot_tables_and_come_back_intact(self):
+        self._archive(self.card, 90)
+        self._archive(self.secret, 90)
+        recent = Card.objects.create(list=self.todo, title='Legacy but recent', position='e')
+        self._archive(recent, 1)
+
+        call_command('archive_cold_cards', stdout=StringIO())
+        self.assertEqual(set(Card.objects.values_list('id', flat=True)), {self.live.id, recent.id})
+        self.assertFalse(ChecklistItem.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(ArchivedCard.objects.count(), 2)
+
+        response = self.client.get(f'/api/boards/{self.board.id}/archived-cards/', {'q': 'legacy'})
+        self.assertEqual({entry['id'] for entry in response.data['results']}, {self.card.id, self.secret.id})
+        self.client.force_authenticate(self.dev)
+        response = self.client.get(f'/api/boards/{self.board.id}/archived-cards/', {'q': 'legacy'})
+        self.assertEqual([entry['id'] for entry in response.data['results']], [self.card.id])
+
+        # Права перевіряються до відновлення: чужа приватна картка лишається в архіві
+        response = self.client.patch(f'/api/cards/{self.secret.id}/', {'is_archived': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        viewer = User.objects.create_user(username='archive_viewer', password='ArchiveViewerPass123!')
+        Membership.objects.create(board=self.board, user=viewer, role='viewer')
+        self.client.force_authenticate(viewer)
+        response = self.client.patch(f'/api/cards/{self.card.id}/', {'title': 'Hijacked'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(ArchivedCard.objects.count(), 2)
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(f'/api/cards/{self.card.id}/', {'is_archived': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        card = Card.objects.get(id=self.card.id)
+        self.assertFalse(card.is_archived)
+        self.assertIsNone(card.archived_at)
+        self.assertEqual(
+            list(ChecklistItem.objects.filter(checklist__card=card).values_list('text', flat=True)),
+            ['Step 0', 'Step 1', 'Step 2'],
+        )
+        self.assertEqual(list(card.cardlabel_set.values_list('label_id', flat=True)), [self.label.id])
+        self.assertEqual(list(card.members.values_list('id', flat=True)), [self.dev.id])
+        restored_comment = Comment.objects.get(id=self.comment.id)
+        self.assertLess(restored_comment.created_at, timezone.now() - timedelta(days=399))
+        self.assertFalse(ArchivedCard.objects.filter(id=self.card.id).exists())
+
+        response = self.client.post(
+            f'/api/boards/{self.board.id}/archived-cards/restore/', {'cards': [self.secret.id]}, format='json',
+        )
+        self.assertEqual(response.data['restored'], [self.secret.id])
+        self.assertFalse(Card.objects.get(id=self.secret.id).is_archived)
+        self.assertFalse(ArchivedCard.objects.exists())
+
+
+class CalendarTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='planner', password='PlannerPass123!')
+        self.dev = User.objects.create_user(username='planner_dev', password='PlannerDevPass123!')
+        self.board = Board.objects.create(title='Release', owner=self.owner)
+        self.other = Board.objects.create(title='Ops', owner=self.owner)
+        Membership.objects.bulk_create([
+            Membership(board=self.board, user=self.owner, role='admin'),
+            Membership(board=self.board, user=self.dev, role='developer'),
+            Membership(board=self.other, user=self.owner, role='admin'),
+        ])
+        todo = List.objects.create(board=self.board, title='Todo', position='a')
+        ops = List.objects.create(board=self.other, title='Ops', position='a')
+
+        def utc(day, hour):
+            return datetime(2026, 10, day, hour, 30, tzinfo=dt_timezone.utc)
+
+        # 23:30 UTC 1 жовтня - вже 2 жовтня за Києвом
+        self.late = Card.objects.create(list=todo, title='Late', position='b', due_date=utc(1, 23))
+        self.early = Card.objects.create(list=todo, title='Early', position='c', due_date=utc(2, 6))
+        self.secret = Card.objects.create(list=todo, title='Secret', position='d', due_date=utc(3, 9), is_public=False)
+        self.assigned = Card.objects.create(list=todo, title='Mine', position='e', due_date=utc(3, 10), is_public=False)
+        CardMember.objects.create(card=self.assigned, user=self.dev)
+        Card.objects.create(list=todo, title='Archived', position='f', due_date=utc(2, 8), is_archived=True)
+        Card.objects.create(list=todo, title='Later', position='g', due_date=utc(20, 8))
+        self.ops = Card.objects.create(list=ops, title='Ops', position='b', due_date=utc(2, 12))
+
+    def _ids(self, response):
+        return {day['date']: [card['id'] for card in day['cards']] for day in response.data['days']}
+
+    def test_groups_cards_by_local_day_across_boards(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/calendar/', {'from': '2026-10-01', 'to': '2026-10-03'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(response), {
+            '2026-10-02': [self.late.id, self.early.id, self.ops.id],
+            '2026-10-03': [self.secret.id, self.assigned.id],
+        })
+        self.assertEqual(set(response.data['days'][0]['cards'][0]), {
+            'id', 'title', 'due_date', 'is_completed', 'card_color', 'board', 'list',
+        })
+
+        response = self.client.get('/api/calendar/', {
+            'from': '2026-10-01', 'to': '2026-10-01', 'tz': 'UTC', 'boards': str(self.board.id),
+        })
+        self.assertEqual(self._ids(response), {'2026-10-01': [self.late.id]})
+
+    def test_private_cards_and_assigned_filter(self):
+        self.client.force_authenticate(self.dev)
+        params = {'from': '2026-10-01', 'to': '2026-10-31'}
+        response = self.client.get('/api/calendar/', params)
+        ids = [card_id for day in self._ids(response).values() for card_id in day]
+        self.assertNotIn(self.secret.id, ids)
+        self.assertNotIn(self.ops.id, ids)
+        self.assertIn(self.assigned.id, ids)
+        self.assertEqual([board['id'] for board in response.data['boards']], [self.board.id])
+
+        response = self.client.get('/api/calendar/', {**params, 'assigned': 'me'})
+        self.assertEqual(self._ids(response), {'2026-10-03': [self.assigned.id]})
+
+    def test_invalid_parameters(self):
+        self.client.force_authenticate(self.owner)
+        cases = [
+            ({'from': '2026-10-01'}, 'from_to_required'),
+            ({'from': '2026-10-05', 'to': '2026-10-01'}, 'invalid_range'),
+            ({'from': '2026-01-01', 'to': '2026-12-31'}, 'range_too_long'),
+            ({'from': '2026-02-30', 'to': '2026-03-01'}, 'invalid_date'),
+            ({'from': '2026-10-01', 'to': '2026-10-02', 'tz': 'Mars/Base'}, 'invalid_tz'),
+            ({'from': '2026-10-01', 'to': '2026-10-02', 'boards': 'x'}, 'invalid_boards'),
+        ]
+        for params, detail in cases:
+            response = self.client.get('/api/calendar/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data['detail'], detail)
+
+
+class CalendarFeedTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='feed_owner', password='FeedOwnerPass123!')
+        self.dev = User.objects.create_user(username='feed_dev', password='FeedDevPass123!')
+        self.board = Board.objects.create(title='Launch, phase 1', owner=self.owner)
+        Membership.objects.bulk_create([
+            Membership(board=self.board, user=self.owner, role='admin'),
+            Membership(board=self.board, user=self.dev, role='developer'),
+        ])
+        todo = List.objects.create(board=self.board, title='Todo', position='a')
+        soon = timezone.now() + timedelta(days=2)
+        self.mine = Card.objects.create(list=todo, title='Ship; ' + 'дуже довга назва ' * 6, position='b', due_date=soon)
+        CardMember.objects.create(card=self.mine, user=self.dev)
+        self.public = Card.objects.create(list=todo, title='Team review', position='c', due_date=soon)
+        Card.objects.create(list=todo, title='Secret', position='d', due_date=soon, is_public=False)
+        Card.objects.create(list=todo, title='Far away', position='e', due_date=soon + timedelta(days=400))
+        self.client.force_authenticate(self.dev)
+        self.token = self.client.get('/api/calendar/feed/').data['token']
+        self.client.force_authenticate(None)
+
+    def _body(self, response):
+        async def collect():
+            return b''.join([chunk async for chunk in response.streaming_content])
+        return async_to_sync(collect)().decode('utf-8')
+
+    def _get(self, scope='assigned', **headers):
+        return self.client.get(f'/api/calendar/feed/{self.token}.ics', {'scope': scope}, HTTP_ACCEPT='text/calendar', **headers)
+
+    def test_streams_ics_and_answers_304_until_a_card_changes(self):
+        response = self._get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = self._body(response)
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+        self.assertIn(f'UID:card-{self.mine.id}@boardly', body)
+        self.assertIn('DESCRIPTION:Launch\\, phase 1 / Todo', body)
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in body.split('\r\n')))
+        self.assertIn('SUMMARY:Ship\\; дуже', body.replace('\r\n ', ''))
+        self.assertNotIn('DTEND', body)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        card = Card.objects.get(id=self.mine.id)
+        card.title = 'Renamed'
+        card.save()
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('SUMMARY:Renamed', self._body(response))
+
+        # Назва списку є в DESCRIPTION: перейменування теж змінює ETag
+        etag = response['ETag']
+        todo = List.objects.get(board=self.board)
+        todo.title = 'Doing'
+        todo.save()
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('DESCRIPTION:Launch\\, phase 1 / Doing', self._body(response))
+
+    def test_deleted_card_leaves_the_feed_for_conditional_clients(self):
+        response = self._get()
+        etag = response['ETag']
+        self._body(response)
+        Card.objects.filter(id=self.mine.id).delete()
+        # If-Modified-Since без Last-Modified ігнорується - клієнт отримує нову стрічку
+        for headers in ({'HTTP_IF_NONE_MATCH': etag}, {'HTTP_IF_MODIFIED_SINCE': http_date(time.time() + 60)}):
+            response = self._get(**headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn(f'UID:card-{self.mine.id}@boardly', self._body(response))
+
+    def test_feed_is_read_in_chunks(self):
+        todo = List.objects.get(board=self.board)
+        due = timezone.now() + timedelta(days=3)
+        Card.objects.bulk_create([Card(list=todo, title=f'Bulk {i}', position=f'x{i}', due_date=due) for i in range(5)])
+        with mock.patch('core.services.calendar.FEED_CHUNK_SIZE', 2), CaptureQueriesContext(connection) as queries:
+            body = self._body(self._get('all'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 7)
+        self.assertEqual(len([query for query in queries if '"core_card"."title"' in query['sql']]), 4)
+
+    def test_board_wide_scope_and_token_rotation(self):
+        body = self._body(self._get('all'))
+        self.assertIn(f'UID:card-{self.public.id}@boardly', body)
+        self.assertIn(f'UID:card-{self.mine.id}@boardly', body)
+        self.assertNotIn('Secret', body)
+        self.assertNotIn('Far away', body)
+
+        self.client.force_authenticate(self.dev)
+        response = self.client.post('/api/calendar/feed/')
+        self.assertNotEqual(response.data['token'], self.token)
+        self.assertTrue(response.data['urls']['all'].endswith(f"/api/calendar/feed/{response.data['token']}.ics?scope=all"))
+        self.assertEqual(self._get().status_code, status.HTTP_404_NOT_FOUND)
+
+        self.token = response.data['token']
+        User.objects.filter(id=self.dev.id).update(is_active=False)
+        self.assertEqual(self._get().status_code, status.HTTP_404_NOT_FOUND)